@@ -0,0 +1,206 @@
+"""
+Асинхронный интерфейс криптосистемы
+
+Методы EnhancedCryptoSystem работают синхронно и на длинном тексте
+надолго занимают цикл событий. AsyncCryptoSystem даёт для каждого режима
+async-версию с тем же результатом:
+
+- короткий текст (до inline_limit символов) обрабатывается сразу;
+- длинный режется на куски по chunk_size и проходит через поток режима
+  (streams.open_stream), который переносит состояние между кусками.
+  Без исполнителя куски обрабатываются в цикле событий с передачей
+  управления после каждого куска, с исполнителем - отправляются в него.
+
+С исполнителем одновременно обрабатывается не больше max_in_flight
+кусков, так что длинные сообщения не занимают весь пул. Без исполнителя
+куски и так обрабатываются по одному (в цикле событий), и предел не
+применяется.
+
+Если у системы есть регистр метрик, длинный текст учитывается в нём
+одним вызовом (вместе с разбиением на куски).
+
+    crypto = AsyncCryptoSystem(executor=ThreadPoolExecutor(4))
+    cipher_text = await crypto.encrypt_polyalphabetic(text, key)
+"""
+
+import asyncio
+import os
+import weakref
+
+from alphabet import get_standard_alphabet
+from metrics import call_unmeasured
+from sblocks import EnhancedCryptoSystem, enhanced_key_valid
+from streams import open_stream
+
+# Текст не длиннее этого обрабатывается без разбиения (символов)
+INLINE_LIMIT = 8192
+
+# Размер куска длинного текста (символов)
+CHUNK_SIZE = 8192
+
+
+def _update(stream, chunk: str):
+    """
+    Обработка куска в исполнителе
+
+    Поток возвращается вместе с результатом: в пуле процессов обновлённое
+    состояние есть только у копии потока в процессе-исполнителе.
+    """
+    return stream, stream.update(chunk)
+
+
+class AsyncCryptoSystem:
+    """Асинхронные версии методов EnhancedCryptoSystem"""
+
+    def __init__(self, system: EnhancedCryptoSystem = None, executor=None,
+                 inline_limit: int = INLINE_LIMIT, chunk_size: int = CHUNK_SIZE,
+                 max_in_flight: int = None):
+        """
+        Args:
+            system: криптосистема (по умолчанию новая со сдвигом 8)
+            executor: исполнитель для кусков (ThreadPoolExecutor или
+                ProcessPoolExecutor); None - куски обрабатываются в цикле событий
+            inline_limit: длина текста, до которой он обрабатывается сразу
+            chunk_size: длина куска
+            max_in_flight: предел кусков, одновременно отправленных в исполнитель
+                (по умолчанию по числу ядер; без исполнителя не используется)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size должен быть положительным")
+
+        self.system = system or EnhancedCryptoSystem()
+        self.executor = executor
+        self.inline_limit = inline_limit
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or os.cpu_count() or 1
+        # Семафор на цикл событий: до Python 3.10 он привязывается к циклу,
+        # текущему при создании, поэтому создаётся внутри работающего цикла
+        self._slots = weakref.WeakKeyDictionary()
+        # Потоки режимов работают только с телеграфным алфавитом
+        self._chunked = self.system.alphabet.symbols == get_standard_alphabet().symbols
+
+    # Простые методы шифрования (моноалфавитные)
+    async def encrypt_simple(self, text: str, key: str) -> str:
+        """Асинхронное простое шифрование Тритемиуса"""
+        return await self._run(self.system.encrypt_simple, (text, key),
+                               'simple', False, shift=self.system.cipher.shift)
+
+    async def decrypt_simple(self, text: str, key: str) -> str:
+        """Асинхронное простое дешифрование Тритемиуса"""
+        return await self._run(self.system.decrypt_simple, (text, key),
+                               'simple', True, shift=self.system.cipher.shift)
+
+    # Полиалфавитные методы
+    async def encrypt_polyalphabetic(self, text: str, key: str, shift: int = None) -> str:
+        """Асинхронное полиалфавитное шифрование (сдвиг по умолчанию из системы)"""
+        shift = self.system.poly_cipher.shift if shift is None else shift
+        return await self._run(self.system.encrypt_polyalphabetic, (text, key, shift),
+                               'poly', False, shift=shift)
+
+    async def decrypt_polyalphabetic(self, text: str, key: str, shift: int = None) -> str:
+        """Асинхронная расшифровка полиалфавитного шифра"""
+        shift = self.system.poly_cipher.shift if shift is None else shift
+        return await self._run(self.system.decrypt_polyalphabetic, (text, key, shift),
+                               'poly', True, shift=shift)
+
+    # Методы для S-блоков
+    async def encrypt_s_blocks(self, text: str, key: str) -> str:
+        """Асинхронное шифрование S-блоками"""
+        if len(key) != 16 or len(self.system.normalize(text)) % 4 != 0:
+            # Сообщение об ошибке от синхронного метода
+            return self.system.encrypt_s_blocks(text, key)
+        return await self._run(self.system.encrypt_s_blocks, (text, key), 'sblocks', False)
+
+    async def decrypt_s_blocks(self, text: str, key: str) -> str:
+        """Асинхронная расшифровка S-блоков"""
+        if len(key) != 16 or len(text) % 4 != 0:
+            return self.system.decrypt_s_blocks(text, key)
+        return await self._run(self.system.decrypt_s_blocks, (text, key), 'sblocks', True)
+
+    # Счётчиковый режим S-блоков
+    async def encrypt_ctr(self, text: str, key: str, nonce: int = 0, offset: int = 0) -> str:
+        """Асинхронное шифрование в счётчиковом режиме"""
+        if len(key) != 16:
+            return self.system.encrypt_ctr(text, key, nonce, offset)
+        return await self._run(self.system.encrypt_ctr, (text, key, nonce, offset),
+                               'ctr', False, nonce=nonce, offset=offset)
+
+    async def decrypt_ctr(self, text: str, key: str, nonce: int = 0, offset: int = 0) -> str:
+        """Асинхронная расшифровка в счётчиковом режиме"""
+        if len(key) != 16:
+            return self.system.decrypt_ctr(text, key, nonce, offset)
+        return await self._run(self.system.decrypt_ctr, (text, key, nonce, offset),
+                               'ctr', True, nonce=nonce, offset=offset)
+
+    # Методы для усиленных S-блоков
+    async def encrypt_enhanced_sblocks(self, text: str, key: str, rounds: int = 4) -> str:
+        """Асинхронное шифрование усиленными S-блоками"""
+        if not enhanced_key_valid(key, rounds, self.system.alphabet):
+            return self.system.encrypt_enhanced_sblocks(text, key, rounds)
+        return await self._run(self.system.encrypt_enhanced_sblocks, (text, key, rounds),
+                               'enhanced', False, rounds=rounds)
+
+    async def decrypt_enhanced_sblocks(self, text: str, key: str, rounds: int = 4) -> str:
+        """Асинхронная расшифровка усиленных S-блоков"""
+        if not enhanced_key_valid(key, rounds, self.system.alphabet):
+            return self.system.decrypt_enhanced_sblocks(text, key, rounds)
+        return await self._run(self.system.decrypt_enhanced_sblocks, (text, key, rounds),
+                               'enhanced', True, rounds=rounds)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Семафор max_in_flight для работающего цикла событий"""
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_in_flight)
+        return slots
+
+    async def _run(self, call, args: tuple, mode: str, decrypt: bool, **params) -> str:
+        """
+        Общая схема: сразу, целиком в исполнителе или по кускам
+
+        Args:
+            call: синхронный метод системы
+            args: аргументы call, первые два - текст и ключ
+            mode: режим потока (streams.MODES)
+            decrypt: расшифровка
+            params: параметры потока (shift, nonce, offset, rounds)
+        """
+        text, key = args[0], args[1]
+        if len(text) <= self.inline_limit:
+            # Метод системы сам учитывается в её метриках
+            return call(*args)
+
+        metrics = self.system.metrics
+        if metrics is None:
+            return await self._run_long(call, args, mode, decrypt, **params)
+        with metrics.measure(mode, 'decrypt' if decrypt else 'encrypt', len(text)):
+            return await self._run_long(call, args, mode, decrypt, **params)
+
+    async def _run_long(self, call, args: tuple, mode: str, decrypt: bool, **params) -> str:
+        """Длинный текст: целиком в исполнителе или по кускам (без замеров внутри)"""
+        text, key = args[0], args[1]
+        loop = asyncio.get_running_loop()
+        if not self._chunked:
+            # Нестандартный алфавит: весь вызов уходит в исполнитель
+            async with self._semaphore():
+                return await loop.run_in_executor(self.executor, call_unmeasured,
+                                                  call.__self__, call.__name__, *args)
+
+        stream = open_stream(mode, key, decrypt=decrypt, normalizer=self.system.normalizer,
+                             **params)
+        parts = []
+        for start in range(0, len(text), self.chunk_size):
+            chunk = text[start:start + self.chunk_size]
+            if self.executor is None:
+                part = stream.update(chunk)
+                # Даём циклу событий обработать другие задачи
+                await asyncio.sleep(0)
+            else:
+                async with self._semaphore():
+                    stream, part = await loop.run_in_executor(self.executor, _update,
+                                                              stream, chunk)
+            parts.append(part)
+
+        parts.append(stream.finalize())
+        return ''.join(parts)
@@ -1,41 +1,119 @@
 import re
+from collections.abc import Mapping
+from functools import lru_cache
+
+from metrics import register_cache
+
+# Алфавит из методички: 31 буква + '_'
+TELEGRAPH_SYMBOLS = 'АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЫЬЭЮЯ_'
+
+# Латинский алфавит: 26 букв + '_'
+LATIN_SYMBOLS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+
+# Расширенный русский алфавит: 33 буквы, '_' и цифры
+EXTENDED_SYMBOLS = 'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ_0123456789'
+
+
+class Modulus:
+    """
+    Арифметика по модулю размера алфавита
+
+    Для размеров - степеней двойки остаток берётся битовой маской,
+    для остальных - обычным делением; сдвиги на фиксированную величину
+    заранее сводятся к таблицам, чтобы во внутренних циклах вместо
+    (pos + shift) % size стояло обращение table[pos].
+    """
+
+    __slots__ = ('size', 'mask', '_shifts')
+
+    def __init__(self, size: int):
+        """
+        Args:
+            size: размер алфавита (от 2 до 256)
+        """
+        if not 2 <= size <= 256:
+            raise ValueError("размер алфавита должен быть от 2 до 256")
+
+        self.size = size
+        # Маска для степеней двойки, иначе None
+        self.mask = size - 1 if size & (size - 1) == 0 else None
+        self._shifts = {}
+
+    def reduce(self, value: int) -> int:
+        """Остаток от деления на размер алфавита"""
+        if self.mask is not None:
+            return value & self.mask
+        return value % self.size
+
+    def add(self, a: int, b: int) -> int:
+        """Сложение по модулю"""
+        return self.reduce(a + b)
+
+    def sub(self, a: int, b: int) -> int:
+        """Вычитание по модулю"""
+        return self.reduce(a - b)
+
+    def shift_table(self, shift: int) -> bytes:
+        """
+        Таблица сдвига: shift_table(shift)[v] = (v + shift) mod size
+
+        Таблицы строятся один раз на сдвиг.
+        """
+        shift = self.reduce(shift)
+        table = self._shifts.get(shift)
+        if table is None:
+            size = self.size
+            table = bytes(range(shift, size)) + bytes(range(shift))
+            self._shifts[shift] = table
+        return table
+
+
+@lru_cache(maxsize=None)
+def get_modulus(size: int) -> Modulus:
+    """Получить (общий) объект арифметики для размера алфавита"""
+    return Modulus(size)
 
 
 class TelegraphAlphabet:
 
-    def __init__(self):
-        # Алфавит из методички: 31 буква + '_'
-        self.symbols = [
-            'А', 'Б', 'В', 'Г', 'Д', 'Е', 'Ж', 'З',
-            'И', 'Й', 'К', 'Л', 'М', 'Н', 'О', 'П',
-            'Р', 'С', 'Т', 'У', 'Ф', 'Х', 'Ц', 'Ч',
-            'Ш', 'Щ', 'Ы', 'Ь', 'Э', 'Ю', 'Я', '_'
-        ]
+    def __init__(self, symbols=None):
+        """
+        Args:
+            symbols: символы алфавита (по умолчанию телеграфный алфавит из 32 символов)
+        """
+        if symbols is None:
+            symbols = TELEGRAPH_SYMBOLS
+        self.symbols = list(symbols)
+        if len(set(self.symbols)) != len(self.symbols):
+            raise ValueError("символы алфавита не должны повторяться")
+
+        self.size = len(self.symbols)
+        self.modulus = get_modulus(self.size)
 
         # Создаем словари для быстрого доступа
         self.char_to_val = {char: idx for idx, char in enumerate(self.symbols)}
         self.val_to_char = {idx: char for idx, char in enumerate(self.symbols)}
 
     def get_char(self, value: int) -> str:
-        """Получить символ по значению (0-31)"""
-        return self.val_to_char.get(value % 32, '?')
+        """Получить символ по значению (0 - size-1)"""
+        return self.val_to_char.get(self.modulus.reduce(value), '?')
 
     def get_value(self, char: str) -> int:
         """Получить значение по символу"""
         return self.char_to_val.get(char.upper(), 0)
 
     def add(self, char1: str, char2: str) -> str:
-        """Суммирование символов по модулю 32"""
+        """Суммирование символов по модулю размера алфавита"""
         val1 = self.get_value(char1)
         val2 = self.get_value(char2)
-        result = (val1 + val2) % 32
+        result = self.modulus.add(val1, val2)
         return self.get_char(result)
 
     def subtract(self, char1: str, char2: str) -> str:
-        """Вычитание символов по модулю 32"""
+        """Вычитание символов по модулю размера алфавита"""
         val1 = self.get_value(char1)
         val2 = self.get_value(char2)
-        result = (val1 - val2) % 32
+        result = self.modulus.sub(val1, val2)
         return self.get_char(result)
 
     def is_valid_char(self, char: str) -> bool:
@@ -46,19 +124,25 @@ class TelegraphAlphabet:
         """Получить все символы алфавита"""
         return self.symbols
 
+    def compact(self):
+        """Компактная неизменяемая копия алфавита"""
+        return CompactAlphabet.from_symbols(self.symbols, standard_alphabet=self)
+
 
 class CustomAlphabet:
     """Класс для создания пользовательского алфавита на основе ключа"""
 
-    def __init__(self, key):
+    def __init__(self, key, standard_alphabet=None):
         """
         Инициализация пользовательского алфавита
 
         Args:
             key (str): Ключевое слово для построения алфавита
+            standard_alphabet: Базовый алфавит (по умолчанию TelegraphAlphabet)
         """
         self.key = key.upper()
-        self.standard_alphabet = TelegraphAlphabet()
+        self.standard_alphabet = standard_alphabet or TelegraphAlphabet()
+        self.size = self.standard_alphabet.size
         self.custom_symbols = self._build_custom_alphabet()
         self.char_to_val = {char: idx for idx, char in enumerate(self.custom_symbols)}
         self.val_to_char = {idx: char for idx, char in enumerate(self.custom_symbols)}
@@ -85,6 +169,10 @@ class CustomAlphabet:
 
         return custom_alpha
 
+    def compact(self):
+        """Компактная неизменяемая копия алфавита"""
+        return CompactAlphabet.from_symbols(self.custom_symbols, self.key, self.standard_alphabet)
+
 
 class PolyAlphabet:
     """Алфавит для полиалфавитного шифра Тритемиуса (с заменой дубликатов)"""
@@ -101,6 +189,7 @@ class PolyAlphabet:
             standard_alphabet = TelegraphAlphabet()
 
         self.standard_alphabet = standard_alphabet
+        self.size = standard_alphabet.size
         self.key = key.upper()
         self.custom_symbols = self._build_poly_alphabet()
         self.char_to_val = {char: idx for idx, char in enumerate(self.custom_symbols)}
@@ -109,28 +198,43 @@ class PolyAlphabet:
     def _build_poly_alphabet(self):
         """Построение алфавита по алгоритму Thrithemus_table"""
         out = []
+        size = self.size
 
         for i in range(len(self.key)):
+            # Алфавит заполнен: остальные символы ключа ничего не добавят,
+            # а поиск свободного символа ниже не завершился бы
+            if len(out) >= size:
+                break
+
             tmp = self.key[i]
             # Пока символ уже есть в out, увеличиваем его на 1
             while self._char_in_list(tmp, out):
                 # Получаем следующий символ по стандартному алфавиту
                 val = self.standard_alphabet.get_value(tmp)
-                next_val = (val + 1) % 32
+                next_val = self.standard_alphabet.modulus.add(val, 1)
                 tmp = self.standard_alphabet.get_char(next_val)
 
             # Добавляем символ, только если алфавит ещё не заполнен
-            if len(out) < 32:
+            if len(out) < size:
                 out.append(tmp)
 
         # Добавляем остальные символы стандартного алфавита
-        for i in range(32):
+        for i in range(size):
             char = self.standard_alphabet.get_char(i)
             if not self._char_in_list(char, out):
                 out.append(char)
 
         return out
 
+    def compact(self):
+        """
+        Компактная неизменяемая копия алфавита
+
+        Raises:
+            ValueError: если ключ содержит символы вне телеграфного алфавита
+        """
+        return CompactAlphabet.from_symbols(self.custom_symbols, self.key, self.standard_alphabet)
+
     def _char_in_list(self, char, char_list):
         """Проверка, есть ли символ в списке"""
         return char in char_list
@@ -154,7 +258,7 @@ class PolyAlphabet:
         # Пока s находится в rem_part, увеличиваем s
         while s in rem_part:
             val = self.standard_alphabet.get_value(s)
-            next_val = (val + 1) % 32
+            next_val = self.standard_alphabet.modulus.add(val, 1)
             s = self.standard_alphabet.get_char(next_val)
 
         # Находим позицию s в str_part
@@ -172,4 +276,199 @@ class PolyAlphabet:
 
         # Собираем новую таблицу
         new_table = [s] + rem_part + str_part
-        return new_table
\ No newline at end of file
+        return new_table
+
+
+@lru_cache(maxsize=None)
+def get_standard_alphabet(symbols: str = TELEGRAPH_SYMBOLS) -> TelegraphAlphabet:
+    """Получить (общий) базовый алфавит по строке его символов"""
+    return TelegraphAlphabet(symbols)
+
+
+# Стандартный алфавит для компактных алфавитов (общий, не хранится в экземплярах)
+_STANDARD = get_standard_alphabet()
+
+
+class CompactAlphabet:
+    """
+    Компактный неизменяемый алфавит
+
+    Хранит только перестановку (позиция -> код символа в стандартном
+    алфавите) и обратную ей (код -> позиция) в двух объектах bytes по size байт,
+    и ссылку на общий базовый алфавит.
+    Атрибуты symbols/custom_symbols, char_to_val и val_to_char доступны
+    как представления, которые строятся при обращении и ничего не копируют.
+    """
+
+    __slots__ = ('key', '_perm', '_inv', '_standard')
+
+    def __init__(self, perm: bytes, key: str = '', standard_alphabet=None):
+        """
+        Args:
+            perm: коды символов стандартного алфавита по позициям (size байт)
+            key: ключевое слово, по которому построен алфавит
+            standard_alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        # Ссылка на общий экземпляр базового алфавита, а не на переданный
+        if standard_alphabet is None:
+            standard = _STANDARD
+        else:
+            standard = get_standard_alphabet(''.join(standard_alphabet.symbols))
+        size = standard.size
+        perm = bytes(perm)
+        if sorted(perm) != list(range(size)):
+            raise ValueError(f"перестановка должна содержать коды 0-{size - 1} "
+                             f"ровно по одному разу")
+
+        inv = bytearray(size)
+        for pos, code in enumerate(perm):
+            inv[code] = pos
+
+        object.__setattr__(self, 'key', key)
+        object.__setattr__(self, '_perm', perm)
+        object.__setattr__(self, '_inv', bytes(inv))
+        object.__setattr__(self, '_standard', standard)
+
+    @classmethod
+    def from_symbols(cls, symbols, key: str = '', standard_alphabet=None):
+        """Построение по списку символов алфавита"""
+        standard = standard_alphabet or _STANDARD
+        codes = standard.char_to_val
+        try:
+            perm = bytes(codes[char] for char in symbols)
+        except KeyError as e:
+            raise ValueError(f"символ {e} не входит в базовый алфавит") from None
+        return cls(perm, key, standard)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactAlphabet неизменяем")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompactAlphabet неизменяем")
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactAlphabet):
+            return NotImplemented
+        return self._perm == other._perm and self._standard.symbols == other._standard.symbols
+
+    def __hash__(self):
+        return hash(self._perm)
+
+    def __reduce__(self):
+        symbols = ''.join(self._standard.symbols)
+        if symbols == TELEGRAPH_SYMBOLS:
+            return CompactAlphabet, (self._perm, self.key)
+        return _compact_alphabet, (self._perm, self.key, symbols)
+
+    @property
+    def perm(self) -> bytes:
+        """Перестановка: позиция -> код символа"""
+        return self._perm
+
+    @property
+    def inverse(self) -> bytes:
+        """Обратная перестановка: код символа -> позиция"""
+        return self._inv
+
+    @property
+    def standard_alphabet(self):
+        """Базовый алфавит"""
+        return self._standard
+
+    @property
+    def size(self) -> int:
+        """Размер алфавита"""
+        return len(self._perm)
+
+    @property
+    def symbols(self):
+        """Символы алфавита по позициям"""
+        symbols = self._standard.symbols
+        return [symbols[code] for code in self._perm]
+
+    custom_symbols = symbols
+
+    @property
+    def char_to_val(self):
+        """Представление символ -> позиция"""
+        return _CharToVal(self)
+
+    @property
+    def val_to_char(self):
+        """Представление позиция -> символ"""
+        return _ValToChar(self)
+
+    def get_char(self, value: int) -> str:
+        """Получить символ по значению (0 - size-1)"""
+        return self._standard.symbols[self._perm[self._standard.modulus.reduce(value)]]
+
+    def get_value(self, char: str) -> int:
+        """Получить значение по символу"""
+        code = self._standard.char_to_val.get(char.upper())
+        return 0 if code is None else self._inv[code]
+
+    def is_valid_char(self, char: str) -> bool:
+        """Проверка, является ли символ допустимым"""
+        return self._standard.is_valid_char(char)
+
+    def get_all_symbols(self):
+        """Получить все символы алфавита"""
+        return self.symbols
+
+
+def _compact_alphabet(perm: bytes, key: str, symbols: str) -> CompactAlphabet:
+    """Восстановление компактного алфавита над нестандартным базовым (для pickle)"""
+    return CompactAlphabet(perm, key, get_standard_alphabet(symbols))
+
+
+class _CharToVal(Mapping):
+    """Отображение символ -> позиция поверх CompactAlphabet"""
+
+    __slots__ = ('_alphabet',)
+
+    def __init__(self, alphabet):
+        self._alphabet = alphabet
+
+    def __getitem__(self, char):
+        code = self._alphabet._standard.char_to_val[char]
+        return self._alphabet._inv[code]
+
+    def __iter__(self):
+        return iter(self._alphabet.symbols)
+
+    def __len__(self):
+        return len(self._alphabet._perm)
+
+
+class _ValToChar(Mapping):
+    """Отображение позиция -> символ поверх CompactAlphabet"""
+
+    __slots__ = ('_alphabet',)
+
+    def __init__(self, alphabet):
+        self._alphabet = alphabet
+
+    def __getitem__(self, value):
+        if not isinstance(value, int) or not 0 <= value < len(self._alphabet._perm):
+            raise KeyError(value)
+        return self._alphabet._standard.symbols[self._alphabet._perm[value]]
+
+    def __iter__(self):
+        return iter(range(len(self._alphabet._perm)))
+
+    def __len__(self):
+        return len(self._alphabet._perm)
+
+
+@lru_cache(maxsize=65536)
+def _cached_custom_alphabet(key: str, symbols: str) -> CompactAlphabet:
+    return CustomAlphabet(key, get_standard_alphabet(symbols)).compact()
+
+
+register_cache('custom_alphabet', _cached_custom_alphabet)
+
+
+def get_custom_alphabet(key: str, standard_alphabet=None) -> CompactAlphabet:
+    """Получить (кэшированный) компактный пользовательский алфавит для ключа"""
+    symbols = TELEGRAPH_SYMBOLS if standard_alphabet is None else ''.join(standard_alphabet.symbols)
+    return _cached_custom_alphabet(key.upper(), symbols)
@@ -0,0 +1,171 @@
+"""
+Замер масштабирования шифров на пуле потоков
+
+Одна общая EnhancedCryptoSystem обрабатывает набор сообщений в пуле
+потоков с разным числом потоков. Результаты сверяются с однопоточными,
+так что замер заодно проверяет, что объект безопасен для потоков.
+На CPython с GIL ускорения ожидать не следует; на сборке без GIL
+(3.13t, sys._is_gil_enabled() == False) потоки выполняются параллельно.
+
+Отдельно замеряется параллельный полиалфавитный режим на пуле процессов
+(PolyTritemiusCipher.encrypt_parallel): время последовательного шифрования,
+расчёта контрольных точек в родительском процессе и параллельного
+шифрования.
+
+Запуск из командной строки:
+    python concurrency.py --mode poly --threads 1 2 4 8
+    python concurrency.py --parallel 4 --length 2000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from alphabet import TelegraphAlphabet
+from sblocks import EnhancedCryptoSystem
+
+_SYMBOLS = ''.join(TelegraphAlphabet().symbols)
+
+# Режим -> (шифрование, ключ по умолчанию)
+MODES = {
+    'simple': (lambda system, text, key: system.encrypt_simple(text, key), 'КЛЮЧ'),
+    'poly': (lambda system, text, key: system.encrypt_polyalphabetic(text, key), 'КЛЮЧ'),
+    'ctr': (lambda system, text, key: system.encrypt_ctr(text, key), 'АБВГДЕЖЗИЙКЛМНОП'),
+    'enhanced': (lambda system, text, key: system.encrypt_enhanced_sblocks(text, key), 'КЛЮЧ'),
+}
+
+
+def gil_enabled() -> bool:
+    """Включён ли GIL (на версиях до 3.13 - всегда)"""
+    check = getattr(sys, '_is_gil_enabled', None)
+    return True if check is None else check()
+
+
+def make_messages(count: int, length: int, seed: int = 0) -> list:
+    """Случайные сообщения из символов телеграфного алфавита"""
+    rng = random.Random(seed)
+    return [''.join(rng.choices(_SYMBOLS, k=length)) for _ in range(count)]
+
+
+def run_benchmark(mode: str = 'poly', key: str = None, threads=(1, 2, 4),
+                  messages: int = 64, length: int = 20000, repeat: int = 3) -> list:
+    """
+    Замер пропускной способности при разном числе потоков
+
+    Args:
+        mode: режим шифрования (ключ MODES)
+        key: ключ (по умолчанию свой для режима)
+        threads: числа потоков
+        messages: число сообщений
+        length: длина сообщения
+        repeat: число повторов (берётся лучшее время)
+
+    Returns:
+        Список словарей с полями threads, seconds, chars_per_second, speedup
+    """
+    if mode not in MODES:
+        raise ValueError(f"неизвестный режим: {mode}")
+    encrypt, default_key = MODES[mode]
+    key = key or default_key
+
+    system = EnhancedCryptoSystem()
+    texts = make_messages(messages, length)
+    # Эталон и прогрев кэшей ключа
+    expected = [encrypt(system, text, key) for text in texts]
+    total = messages * length
+
+    report = []
+    for workers in threads:
+        best = None
+        for _ in range(repeat):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                started = time.perf_counter()
+                results = list(pool.map(lambda text: encrypt(system, text, key), texts))
+                seconds = time.perf_counter() - started
+            if results != expected:
+                raise RuntimeError(f"результат в {workers} потоках не совпал с однопоточным")
+            best = seconds if best is None else min(best, seconds)
+
+        report.append({
+            'threads': workers,
+            'seconds': best,
+            'chars_per_second': total / best if best else float('inf'),
+            'speedup': report[0]['seconds'] / best if report and best else 1.0,
+        })
+    return report
+
+
+def run_parallel_benchmark(key: str = 'КЛЮЧ', workers: int = None, length: int = 2000000,
+                           chunk_size: int = 65536, repeat: int = 3) -> dict:
+    """
+    Замер параллельного полиалфавитного шифрования против последовательного
+
+    Args:
+        key: ключ
+        workers: число процессов (по умолчанию по числу ядер)
+        length: длина текста
+        chunk_size: длина блока
+        repeat: число повторов (берётся лучшее время)
+
+    Returns:
+        Словарь с полями serial_seconds, checkpoint_seconds,
+        parallel_seconds, speedup
+    """
+    cipher = EnhancedCryptoSystem().poly_cipher
+    text = make_messages(1, length)[0]
+
+    def best(call):
+        seconds = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = call()
+            seconds = min(seconds, time.perf_counter() - started)
+        return seconds, result
+
+    serial, expected = best(lambda: cipher.encrypt(text, key))
+    checkpoints, _ = best(lambda: cipher.checkpoints(text, key, chunk_size))
+    parallel, result = best(lambda: cipher.encrypt_parallel(text, key, workers, chunk_size))
+    if result != expected:
+        raise RuntimeError("параллельный результат не совпал с последовательным")
+
+    return {
+        'serial_seconds': serial,
+        'checkpoint_seconds': checkpoints,
+        'parallel_seconds': parallel,
+        'speedup': serial / parallel if parallel else float('inf'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер шифров на пуле потоков")
+    parser.add_argument('--mode', default='poly', choices=sorted(MODES))
+    parser.add_argument('--key', default=None)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--messages', type=int, default=64)
+    parser.add_argument('--length', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--parallel', type=int, default=0, metavar='PROCESSES',
+                        help="замер параллельного полиалфавитного режима на пуле процессов")
+    args = parser.parse_args()
+
+    if args.parallel:
+        row = run_parallel_benchmark(args.key or 'КЛЮЧ', args.parallel, args.length,
+                                     repeat=args.repeat)
+        print(f"последовательно: {row['serial_seconds']:.3f} с, "
+              f"контрольные точки: {row['checkpoint_seconds']:.3f} с, "
+              f"{args.parallel} процессов: {row['parallel_seconds']:.3f} с, "
+              f"ускорение {row['speedup']:.2f}")
+        return
+
+    print(f"Python {sys.version.split()[0]}, GIL {'включён' if gil_enabled() else 'выключен'}")
+    report = run_benchmark(args.mode, args.key, args.threads, args.messages,
+                           args.length, args.repeat)
+    for row in report:
+        print(f"{row['threads']:3d} потоков: {row['seconds']:8.3f} с, "
+              f"{row['chars_per_second'] / 1e6:6.2f} Мсимв/с, ускорение {row['speedup']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
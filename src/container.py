@@ -0,0 +1,309 @@
+"""
+Контейнер множества коротких шифротекстов в одном файле
+
+Сообщения, зашифрованные независимо разными ключами (encrypt_simple,
+encrypt_s_blocks и т.п.), дописываются в один файл. Индекс с позицией
+каждого сообщения и таблица идентификаторов ключей позволяют читать
+любое сообщение за O(1) через mmap, не просматривая файл. Сами ключи
+в контейнере не хранятся: при расшифровке они передаются словарём
+{идентификатор ключа: ключ}.
+
+Формат:
+    заголовок <4sBxxxQ: метка, версия, позиция последнего сегмента оглавления
+    данные    тексты сообщений в UTF-8
+    сегменты  оглавления, по одному на сброс (flush), вперемешку с данными:
+              <QII: позиция предыдущего сегмента (0 - первый), число новых
+              сообщений, число новых ключей;
+              новые ключи: <H (длина в байтах UTF-8) и идентификатор;
+              индекс новых сообщений: <QIIIB на сообщение (позиция, длина
+              в байтах, длина в символах, номер ключа, режим)
+
+Сброс дописывает только ключи и записи индекса, появившиеся после
+предыдущего сброса, поэтому оглавление занимает O(N) на весь файл, а не
+O(N) на каждый сброс. Читатель проходит цепочку сегментов один раз при
+открытии и находит запись сообщения двоичным поиском по сегментам.
+Новый сегмент пишется в конец файла, и только затем заголовок
+переключается на него, поэтому при сбое во время дозаписи файл остаётся
+читаемым в прежнем состоянии.
+
+    with ContainerWriter('messages.trc') as writer:
+        message_id = writer.append(system.encrypt_simple(text, key), 'user-42')
+
+    with ContainerReader('messages.trc') as reader:
+        texts = reader.decrypt([3, 17, 4096], {'user-42': key, ...})
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+
+from sblocks import EnhancedCryptoSystem
+
+# Режимы сообщений и их коды в индексе
+MODES = {
+    'simple': 1,
+    'poly': 2,
+    'sblocks': 3,
+    'enhanced': 4,
+}
+_MODE_NAMES = {code: name for name, code in MODES.items()}
+
+# Моноалфавитные и блочные режимы: сообщения одного ключа можно
+# расшифровать одним вызовом над их склейкой
+_CONCATENABLE = ('simple', 'sblocks')
+
+_MAGIC = b'TRCX'
+_VERSION = 2
+_HEADER = struct.Struct('<4sBxxxQ')
+_SEGMENT = struct.Struct('<QII')
+_KEY = struct.Struct('<H')
+_ENTRY = struct.Struct('<QIIIB')
+
+Message = namedtuple('Message', 'text key_id mode')
+
+
+class ContainerWriter:
+    """Дозапись сообщений в контейнер (создаётся, если файла нет)"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: путь к файлу контейнера
+        """
+        self.path = path
+        self._key_ids = []
+        self._key_index = {}
+        self._new_keys = 0
+        self._entries = bytearray()
+        self._new_entries = 0
+        self._count = 0
+        self._segment = 0
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with ContainerReader(path) as reader:
+                for key_id in reader.key_ids:
+                    self._add_key(key_id)
+                self._count = len(reader)
+                self._segment = reader.last_segment
+            self._new_keys = 0
+            self._file = open(path, 'r+b')
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, 'w+b')
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION, 0))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _add_key(self, key_id: str) -> int:
+        self._key_index[key_id] = len(self._key_ids)
+        self._key_ids.append(key_id)
+        self._new_keys += 1
+        return self._key_index[key_id]
+
+    def append(self, text: str, key_id: str, mode: str = 'simple') -> int:
+        """
+        Дописать сообщение
+
+        Args:
+            text: шифротекст
+            key_id: идентификатор ключа, которым зашифровано сообщение
+            mode: режим шифрования из MODES
+
+        Returns:
+            Номер сообщения в контейнере
+        """
+        if mode not in MODES:
+            raise ValueError(f"неизвестный режим: {mode}")
+        if mode == 'sblocks' and len(text) % 4 != 0:
+            raise ValueError("текст должен быть кратен 4 символам")
+
+        key = self._key_index.get(key_id)
+        if key is None:
+            key = self._add_key(key_id)
+
+        data = text.encode('utf-8')
+        offset = self._file.tell()
+        self._file.write(data)
+        self._entries += _ENTRY.pack(offset, len(data), len(text), key, MODES[mode])
+        self._new_entries += 1
+        self._count += 1
+        return self._count - 1
+
+    def flush(self):
+        """Записать сегмент оглавления с новыми сообщениями и переключить на него заголовок"""
+        if not self._new_entries and not self._new_keys:
+            return
+
+        segment = self._file.seek(0, os.SEEK_END)
+        parts = [_SEGMENT.pack(self._segment, self._new_entries, self._new_keys)]
+        for key_id in self._key_ids[len(self._key_ids) - self._new_keys:]:
+            data = key_id.encode('utf-8')
+            parts.append(_KEY.pack(len(data)))
+            parts.append(data)
+        parts.append(self._entries)
+        self._file.write(b''.join(parts))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, segment))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._segment = segment
+        self._entries = bytearray()
+        self._new_entries = 0
+        self._new_keys = 0
+        # Следующие сообщения пишутся после сегмента
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ContainerReader:
+    """Чтение сообщений контейнера через mmap"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: путь к файлу контейнера
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, segment = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic, version, segment = None, None, 0
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError("файл не является контейнером сообщений")
+        if version != _VERSION:
+            self._map.close()
+            raise ValueError(f"неподдерживаемая версия контейнера: {version}")
+        self.last_segment = segment
+
+        # Цепочка сегментов от последнего к первому
+        chain = []
+        while segment:
+            previous, count, keys = _SEGMENT.unpack_from(self._map, segment)
+            chain.append((segment, count, keys))
+            segment = previous
+
+        self.key_ids = []
+        # Номер первого сообщения сегмента и позиция его индекса
+        self._firsts = []
+        self._indexes = []
+        self._count = 0
+        for segment, count, keys in reversed(chain):
+            position = segment + _SEGMENT.size
+            for _ in range(keys):
+                (length,) = _KEY.unpack_from(self._map, position)
+                position += _KEY.size
+                self.key_ids.append(self._map[position:position + length].decode('utf-8'))
+                position += length
+            if count:
+                self._firsts.append(self._count)
+                self._indexes.append(position)
+                self._count += count
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, message_id: int):
+        if not 0 <= message_id < self._count:
+            raise IndexError(f"нет сообщения с номером {message_id}")
+        n = bisect_right(self._firsts, message_id) - 1
+        position = self._indexes[n] + (message_id - self._firsts[n]) * _ENTRY.size
+        return _ENTRY.unpack_from(self._map, position)
+
+    def message(self, message_id: int) -> Message:
+        """
+        Сообщение по номеру
+
+        Returns:
+            Message(шифротекст, идентификатор ключа, режим)
+        """
+        offset, size, _, key, mode = self._entry(message_id)
+        text = self._map[offset:offset + size].decode('utf-8')
+        return Message(text, self.key_ids[key], _MODE_NAMES[mode])
+
+    def decrypt(self, message_ids, keys: dict, system: EnhancedCryptoSystem = None) -> dict:
+        """
+        Пакетная расшифровка выбранных сообщений
+
+        Сообщения группируются по ключу и режиму; читаются только их
+        участки файла, в порядке расположения. Сообщения simple и sblocks
+        одного ключа расшифровываются одним вызовом над склейкой (оба
+        режима обрабатывают символы или блоки независимо), затем результат
+        режется по длинам сообщений.
+
+        Args:
+            message_ids: номера сообщений
+            keys: {идентификатор ключа: ключ}
+            system: криптосистема (по умолчанию новая со сдвигом 8)
+
+        Returns:
+            {номер сообщения: открытый текст}
+        """
+        system = system or EnhancedCryptoSystem()
+        groups = {}
+        for message_id in set(message_ids):
+            offset, size, chars, key, mode = self._entry(message_id)
+            groups.setdefault((key, mode), []).append((offset, size, chars, message_id))
+
+        result = {}
+        for (key, mode), members in groups.items():
+            key_id = self.key_ids[key]
+            if key_id not in keys:
+                raise KeyError(f"нет ключа для идентификатора {key_id!r}")
+            mode = _MODE_NAMES[mode]
+            members.sort()
+            texts = [self._map[offset:offset + size].decode('utf-8')
+                     for offset, size, _, _ in members]
+
+            if mode in _CONCATENABLE:
+                plain = _decrypt_text(system, mode, ''.join(texts), keys[key_id])
+                start = 0
+                for _, _, chars, message_id in members:
+                    result[message_id] = plain[start:start + chars]
+                    start += chars
+            else:
+                for text, (_, _, _, message_id) in zip(texts, members):
+                    result[message_id] = _decrypt_text(system, mode, text, keys[key_id])
+
+        return result
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _decrypt_text(system: EnhancedCryptoSystem, mode: str, text: str, key: str) -> str:
+    if mode == 'simple':
+        return system.decrypt_simple(text, key)
+    if mode == 'poly':
+        return system.decrypt_polyalphabetic(text, key)
+    if mode == 'sblocks':
+        if len(key) != 16:
+            raise ValueError("ключ должен содержать ровно 16 символов")
+        return system.decrypt_s_blocks(text, key)
+    return system.decrypt_enhanced_sblocks(text, key)
@@ -0,0 +1,351 @@
+"""
+Адаптивный выбор реализации по длине текста
+
+Один и тот же режим можно выполнить несколькими способами:
+
+    inline   - метод EnhancedCryptoSystem (кэшированные алфавиты и таблицы)
+    codes    - одноэтапный Pipeline над буфером кодов (bytes.translate и т.п.)
+    executor - куски с известной позицией в исполнителе (simple, sblocks, ctr)
+
+Какой из них быстрее, зависит от режима, длины текста и машины.
+AdaptiveCryptoSystem при первом вызове режима коротко замеряет доступные
+реализации на нескольких длинах, находит границы переключения и дальше
+направляет каждый вызов к самой быстрой. Профиль (границы и замеры)
+можно сохранить в файл и загрузить при следующем запуске; профиль чужой
+машины или другой конфигурации игнорируется и строится заново.
+
+    crypto = AdaptiveCryptoSystem(profile_path='cipher-profile.json')
+    cipher_text = crypto.encrypt_s_blocks(text, key)
+    crypto.route('sblocks', len(text))  # 'codes'
+    crypto.decisions()                  # {'sblocks': {'codes': 1}}
+
+Запуск из командной строки (калибровка и вывод границ):
+    python dispatch.py --profile cipher-profile.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from alphabet import get_standard_alphabet
+from filepipe import PARALLEL_MODES, process_chunk
+from metrics import call_unmeasured, register_cache
+from pipeline import Pipeline, Stage
+from sblocks import EnhancedCryptoSystem, enhanced_key_valid
+
+MODES = ('simple', 'poly', 'sblocks', 'ctr', 'enhanced')
+
+# Длины текста для калибровки (кратны 4 для S-блоков)
+CALIBRATION_SIZES = (64, 1024, 16384, 65536)
+
+_PROFILE_VERSION = 1
+
+# Режим -> (метод шифрования, метод расшифровки) EnhancedCryptoSystem
+_METHODS = {
+    'simple': ('encrypt_simple', 'decrypt_simple'),
+    'poly': ('encrypt_polyalphabetic', 'decrypt_polyalphabetic'),
+    'sblocks': ('encrypt_s_blocks', 'decrypt_s_blocks'),
+    'ctr': ('encrypt_ctr', 'decrypt_ctr'),
+    'enhanced': ('encrypt_enhanced_sblocks', 'decrypt_enhanced_sblocks'),
+}
+
+
+@lru_cache(maxsize=256)
+def _cached_pipeline(stage: Stage, symbols: str) -> Pipeline:
+    return Pipeline([stage], get_standard_alphabet(symbols))
+
+
+register_cache('pipeline', _cached_pipeline)
+
+
+class AdaptiveCryptoSystem:
+    """Методы EnhancedCryptoSystem с выбором реализации по длине текста"""
+
+    def __init__(self, system: EnhancedCryptoSystem = None, executor=None, workers: int = None,
+                 profile_path=None):
+        """
+        Args:
+            system: криптосистема (по умолчанию новая со сдвигом 8)
+            executor: исполнитель для кусков (например, ProcessPoolExecutor);
+                None - реализация executor недоступна
+            workers: на сколько кусков делить текст для исполнителя
+                (по умолчанию по числу ядер)
+            profile_path: файл профиля; загружается, если подходит к этой
+                машине, и перезаписывается после каждой калибровки
+        """
+        self.system = system or EnhancedCryptoSystem()
+        self.executor = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.profile_path = profile_path
+        self._symbols = ''.join(self.system.alphabet.symbols)
+        # Потоки режимов (реализация executor) работают только с телеграфным алфавитом
+        self._chunked = (executor is not None
+                         and self.system.alphabet.symbols == get_standard_alphabet().symbols)
+        self._lock = threading.Lock()
+        self._decisions = {}
+
+        self.profile = {'version': _PROFILE_VERSION, 'fingerprint': self._fingerprint(),
+                        'modes': {}}
+        if profile_path is not None and os.path.exists(profile_path):
+            with open(profile_path, encoding='utf-8') as file:
+                saved = json.load(file)
+            if (saved.get('version') == _PROFILE_VERSION
+                    and saved.get('fingerprint') == self.profile['fingerprint']):
+                self.profile = saved
+
+    def _fingerprint(self) -> dict:
+        """Условия, при которых профиль остаётся верным"""
+        return {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'executor': type(self.executor).__name__ if self._chunked else None,
+            'workers': self.workers if self._chunked else None,
+            'alphabet': self._symbols,
+            'shift': self.system.cipher.shift,
+        }
+
+    def backends(self, mode: str) -> list:
+        """Реализации, доступные для режима"""
+        if mode not in MODES:
+            raise ValueError(f"неизвестный режим: {mode}")
+        backends = ['inline', 'codes']
+        if self._chunked and mode in PARALLEL_MODES:
+            backends.append('executor')
+        return backends
+
+    def route(self, mode: str, length: int) -> str:
+        """
+        Реализация, выбранная для текста длины length (с калибровкой при первом вызове)
+
+        Returns:
+            'inline', 'codes' или 'executor'
+        """
+        routes = self.profile['modes'].get(mode)
+        if routes is None:
+            routes = self.calibrate(mode)
+        for limit, backend in routes['routes']:
+            if limit is None or length < limit:
+                return backend
+        return 'inline'
+
+    def decisions(self) -> dict:
+        """Сколько вызовов каждого режима ушло в каждую реализацию"""
+        with self._lock:
+            return {mode: dict(counts) for mode, counts in self._decisions.items()}
+
+    def calibrate(self, mode: str, sizes=CALIBRATION_SIZES) -> dict:
+        """
+        Замер реализаций режима и построение границ переключения
+
+        На каждой длине берётся лучшее время из нескольких прогонов на
+        случайном тексте (символы алфавита с пробелами). Граница между
+        соседними длинами с разными победителями - их среднее
+        геометрическое.
+
+        Returns:
+            {'routes': [[граница или None, реализация], ...],
+             'timings': {длина: {реализация: секунд на вызов}}}
+        """
+        with self._lock:
+            routes = self.profile['modes'].get(mode)
+            if routes is not None:
+                return routes
+
+            rng = random.Random(0)
+            symbols = self._symbols
+            sample = symbols + '  '
+            key_length = 16 if mode in ('sblocks', 'ctr') else 8
+            key = ''.join(rng.choice(symbols) for _ in range(key_length))
+            backends = self.backends(mode)
+
+            timings = {}
+            winners = []
+            for size in sizes:
+                text = ''.join(rng.choice(sample) for _ in range(size))
+                repeat = max(1, min(20, 16384 // size))
+                best = {}
+                for backend in backends:
+                    # Первый прогон строит таблицы ключа и не учитывается
+                    self._execute(backend, mode, False, text, key, {})
+                    seconds = float('inf')
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        self._execute(backend, mode, False, text, key, {})
+                        seconds = min(seconds, time.perf_counter() - started)
+                    best[backend] = seconds
+                timings[str(size)] = best
+                winners.append(min(best, key=best.get))
+
+            table = []
+            for i, winner in enumerate(winners):
+                limit = None if i + 1 == len(sizes) else round((sizes[i] * sizes[i + 1]) ** 0.5)
+                if table and table[-1][1] == winner:
+                    table[-1][0] = limit
+                else:
+                    table.append([limit, winner])
+
+            routes = {'routes': table, 'timings': timings}
+            self.profile['modes'][mode] = routes
+            if self.profile_path is not None:
+                self.save_profile(self.profile_path)
+        return routes
+
+    def save_profile(self, path):
+        """Запись профиля в файл (через временный файл, атомарно)"""
+        temp = f"{path}.tmp"
+        with open(temp, 'w', encoding='utf-8') as file:
+            json.dump(self.profile, file, ensure_ascii=False, indent=2)
+        os.replace(temp, path)
+
+    def _eligible(self, backend: str, mode: str, text: str, key: str, params: dict) -> bool:
+        """
+        Даёт ли реализация тот же результат, что и метод системы
+
+        Ошибки параметров (длина ключа, текст не кратен 4, ключ без
+        символов алфавита) и пустые ключи
+        всегда обрабатываются методом системы, чтобы вернуть его результат.
+        """
+        if backend == 'inline':
+            return True
+        if not key:
+            return False
+        if mode in ('sblocks', 'ctr') and len(key) != 16:
+            return False
+        if mode == 'sblocks' and len(text) % 4 != 0:
+            return False
+        if mode == 'enhanced' and not enhanced_key_valid(key, params.get('rounds', 4),
+                                                         self.system.alphabet):
+            return False
+        if backend == 'codes':
+            # Pipeline начинает гамму счётчикового режима с позиции 0
+            return not params.get('offset')
+        return backend in self.backends(mode)
+
+    def _execute(self, backend: str, mode: str, decrypt: bool, text: str, key: str,
+                 params: dict) -> str:
+        """Вызов выбранной реализации"""
+        if backend == 'inline':
+            # Замер делает _call для всех реализаций одинаково, калибровка не учитывается
+            return call_unmeasured(self.system, _METHODS[mode][decrypt], text, key, **params)
+
+        shift = params.get('shift')
+        if shift is None:
+            shift = self.system.cipher.shift if mode == 'simple' else self.system.poly_cipher.shift
+
+        if backend == 'codes':
+            stage = Stage(mode, key, decrypt, shift, params.get('nonce', 0),
+                          params.get('rounds', 4))
+            return _cached_pipeline(stage, self._symbols).run(text)
+
+        # Куски кратны 4 символам, чтобы блоки S-блоков не разрывались
+        size = -(-len(text) // self.workers)
+        size += -size % 4
+        offset = params.get('offset', 0)
+        futures = [self.executor.submit(process_chunk, mode, key, shift, decrypt,
+                                        params.get('nonce', 0), offset + start,
+                                        text[start:start + size])
+                   for start in range(0, len(text), size or 4)]
+        return ''.join(future.result() for future in futures)
+
+    def _call(self, mode: str, decrypt: bool, text: str, key: str, **params) -> str:
+        # Метод системы нормализует текст сам, остальным реализациям он
+        # передаётся уже нормализованным
+        prepared = text if decrypt else self.system.normalize(text)
+        backend = self.route(mode, len(prepared))
+        if not self._eligible(backend, mode, prepared, key, params):
+            backend = 'inline'
+        if backend != 'inline':
+            text = prepared
+        with self._lock:
+            counts = self._decisions.setdefault(mode, {})
+            counts[backend] = counts.get(backend, 0) + 1
+
+        metrics = self.system.metrics
+        if metrics is None:
+            return self._execute(backend, mode, decrypt, text, key, params)
+        with metrics.measure(mode, 'decrypt' if decrypt else 'encrypt', len(text)):
+            return self._execute(backend, mode, decrypt, text, key, params)
+
+    # Простые методы шифрования (моноалфавитные)
+    def encrypt_simple(self, text: str, key: str) -> str:
+        """Простое шифрование Тритемиуса"""
+        return self._call('simple', False, text, key)
+
+    def decrypt_simple(self, text: str, key: str) -> str:
+        """Простое дешифрование Тритемиуса"""
+        return self._call('simple', True, text, key)
+
+    # Полиалфавитные методы
+    def encrypt_polyalphabetic(self, text: str, key: str, shift: int = None) -> str:
+        """Полиалфавитное шифрование (сдвиг по умолчанию из системы)"""
+        return self._call('poly', False, text, key, shift=shift)
+
+    def decrypt_polyalphabetic(self, text: str, key: str, shift: int = None) -> str:
+        """Расшифровка полиалфавитного шифра"""
+        return self._call('poly', True, text, key, shift=shift)
+
+    # Методы для S-блоков
+    def encrypt_s_blocks(self, text: str, key: str) -> str:
+        """Шифрование S-блоками"""
+        return self._call('sblocks', False, text, key)
+
+    def decrypt_s_blocks(self, text: str, key: str) -> str:
+        """Расшифровка S-блоков"""
+        return self._call('sblocks', True, text, key)
+
+    # Счётчиковый режим S-блоков
+    def encrypt_ctr(self, text: str, key: str, nonce: int = 0, offset: int = 0) -> str:
+        """Шифрование в счётчиковом режиме"""
+        return self._call('ctr', False, text, key, nonce=nonce, offset=offset)
+
+    def decrypt_ctr(self, text: str, key: str, nonce: int = 0, offset: int = 0) -> str:
+        """Расшифровка в счётчиковом режиме"""
+        return self._call('ctr', True, text, key, nonce=nonce, offset=offset)
+
+    # Методы для усиленных S-блоков
+    def encrypt_enhanced_sblocks(self, text: str, key: str, rounds: int = 4) -> str:
+        """Шифрование усиленными S-блоками"""
+        return self._call('enhanced', False, text, key, rounds=rounds)
+
+    def decrypt_enhanced_sblocks(self, text: str, key: str, rounds: int = 4) -> str:
+        """Расшифровка усиленных S-блоков"""
+        return self._call('enhanced', True, text, key, rounds=rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Калибровка выбора реализации шифров")
+    parser.add_argument('--profile', help="файл профиля (загружается и сохраняется)")
+    parser.add_argument('--mode', action='append', choices=MODES,
+                        help="режим (можно несколько; по умолчанию все)")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="число процессов исполнителя (0 - без исполнителя)")
+    args = parser.parse_args()
+
+    executor = None
+    if args.processes:
+        executor = ProcessPoolExecutor(args.processes)
+
+    crypto = AdaptiveCryptoSystem(executor=executor, workers=args.processes or None,
+                                  profile_path=args.profile)
+    for mode in args.mode or MODES:
+        routes = crypto.calibrate(mode)
+        start = 0
+        for limit, backend in routes['routes']:
+            bound = '...' if limit is None else limit - 1
+            print(f"{mode:<9} {start:>7} - {bound:<7} {backend}")
+            start = limit
+
+    if executor is not None:
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
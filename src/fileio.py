@@ -0,0 +1,268 @@
+"""
+Шифрование однобайтовых кириллических файлов (cp1251, KOI8-R) через mmap
+
+В однобайтовой кодировке каждая буква телеграфного алфавита - один байт,
+поэтому файл можно обрабатывать прямо в отображении mmap окно за окном
+с помощью bytes.translate и таблиц на 256 байт, без декодирования в str,
+копирования всего файла и обратного кодирования.
+
+Поддерживаются режимы:
+    simple  - моноалфавитный TextCipher (одна таблица translate)
+    sblocks - S-блоки по 4 символа (таблица на каждую позицию блока)
+    ctr     - счётчиковый режим S-блоков
+
+Результат совпадает с шифрованием декодированного текста, если все символы
+результата представимы в кодировке; непредставимые символы оставляются
+исходными байтами.
+"""
+
+import mmap
+import os
+import re
+
+from alphabet import TelegraphAlphabet
+from sblocks import SBlock, CounterMode, get_block_tables
+from schedule import KeySchedule
+from tritemius import TritemiusCipher, TextCipher
+
+_ALPHABET = TelegraphAlphabet()
+
+# Размер окна по умолчанию (кратен 4 для S-блоков)
+WINDOW = 1 << 20
+
+
+class ByteTables:
+    """Таблицы перевода байтов однобайтовой кодировки в коды алфавита и обратно"""
+
+    def __init__(self, encoding: str = 'cp1251'):
+        self.encoding = encoding
+
+        # to_code[b] - код символа алфавита (0-31) или 255 для прочих байтов
+        to_code = bytearray(b'\xff' * 256)
+        # upper[b] - байт символа в верхнем регистре (как text.upper())
+        upper = bytearray(range(256))
+
+        for b in range(256):
+            char = self.decode(bytes((b,)))
+            upper_char = char.upper()
+            code = _ALPHABET.char_to_val.get(upper_char)
+            if code is not None:
+                to_code[b] = code
+            upper[b] = self._single_byte(upper_char, b)
+
+        # from_code[c] - байт символа алфавита с кодом c
+        from_code = bytearray(range(256))
+        for code, char in enumerate(_ALPHABET.symbols):
+            from_code[code] = self._single_byte(char, None)
+
+        self.to_code = bytes(to_code)
+        self.upper = bytes(upper)
+        self.from_code = bytes(from_code)
+
+        # Байты, не являющиеся буквами алфавита
+        other = bytes(b for b in range(256) if to_code[b] == 255)
+        self.other = re.compile(b'[' + re.escape(other) + b']')
+
+    def decode(self, data: bytes) -> str:
+        return data.decode(self.encoding, errors='surrogateescape')
+
+    def encode(self, text: str) -> bytes:
+        return text.encode(self.encoding, errors='surrogateescape')
+
+    def encode_chars(self, text: str, original: bytes) -> bytes:
+        """Посимвольное кодирование; непредставимые символы - исходными байтами original"""
+        return bytes(self._single_byte(char, b) for char, b in zip(text, original))
+
+    def _single_byte(self, char: str, default):
+        """Байт символа в кодировке или default, если символ не однобайтовый"""
+        try:
+            data = self.encode(char)
+        except UnicodeEncodeError:
+            data = b''
+        if len(data) == 1:
+            return data[0]
+        if default is None:
+            raise ValueError(f"символ {char!r} не представим в кодировке {self.encoding}")
+        return default
+
+    def translation(self, transform) -> bytes:
+        """
+        Таблица translate: байт -> байт результата transform(символ)
+
+        Байты, результат для которых не представим одним байтом, не меняются.
+        """
+        table = bytearray(256)
+        for b in range(256):
+            result = transform(self.decode(bytes((b,))))
+            table[b] = self._single_byte(result, b)
+        return bytes(table)
+
+
+def encrypt_file(path, key: str, mode: str = 'simple', shift: int = 8,
+                 encoding: str = 'cp1251', output=None, nonce: int = 0,
+                 window: int = WINDOW):
+    """
+    Шифрование файла на месте (или в output) через mmap
+
+    Args:
+        path: путь к файлу
+        key: ключ (для sblocks и ctr - ровно 16 символов)
+        mode: 'simple', 'sblocks' или 'ctr'
+        shift: сдвиг моноалфавитного шифра
+        encoding: однобайтовая кодировка файла
+        output: путь к файлу результата (по умолчанию - на месте)
+        nonce: начальное значение счётчика (режим ctr)
+        window: размер окна обработки
+    """
+    _process_file(path, key, mode, shift, encoding, output, nonce, window, decrypt=False)
+
+
+def decrypt_file(path, key: str, mode: str = 'simple', shift: int = 8,
+                 encoding: str = 'cp1251', output=None, nonce: int = 0,
+                 window: int = WINDOW):
+    """
+    Расшифровка файла на месте (или в output) через mmap
+
+    Параметры такие же, как у encrypt_file.
+    """
+    _process_file(path, key, mode, shift, encoding, output, nonce, window, decrypt=True)
+
+
+def _process_file(path, key, mode, shift, encoding, output, nonce, window, decrypt):
+    tables = ByteTables(encoding)
+
+    if mode == 'simple':
+        process = _simple_window(tables, key, shift, decrypt)
+    elif mode == 'sblocks':
+        process = _sblocks_window(tables, key, decrypt)
+    elif mode == 'ctr':
+        process = _ctr_window(tables, key, nonce, decrypt)
+    else:
+        raise ValueError(f"неизвестный режим: {mode}")
+
+    size = os.path.getsize(path)
+    if mode == 'sblocks' and size % 4 != 0:
+        raise ValueError("длина файла должна быть кратна 4 символам")
+
+    window = max(4, window - window % 4)
+
+    if output is not None:
+        # Заранее выделяем файл результата того же размера
+        with open(output, 'wb') as dst:
+            dst.truncate(size)
+
+    if size == 0:
+        return
+
+    with open(path, 'r+b' if output is None else 'rb') as src_file:
+        access = mmap.ACCESS_WRITE if output is None else mmap.ACCESS_READ
+        with mmap.mmap(src_file.fileno(), 0, access=access) as src:
+            if output is None:
+                _run_windows(src, src, size, window, process)
+            else:
+                with open(output, 'r+b') as dst_file:
+                    with mmap.mmap(dst_file.fileno(), 0) as dst:
+                        _run_windows(src, dst, size, window, process)
+                        dst.flush()
+            if output is None:
+                src.flush()
+
+
+def _run_windows(src, dst, size, window, process):
+    """Обработка отображения окно за окном"""
+    for start in range(0, size, window):
+        end = min(start + window, size)
+        dst[start:end] = process(src[start:end], start)
+
+
+def _simple_window(tables, key, shift, decrypt):
+    """Моноалфавитный режим: одна таблица translate на весь файл"""
+    text_cipher = TextCipher(TritemiusCipher(shift=shift))
+    if decrypt:
+        table = tables.translation(lambda char: text_cipher.decrypt_text(char, key))
+    else:
+        table = tables.translation(lambda char: text_cipher.encrypt_text(char, key))
+
+    def process(data, offset):
+        return data.translate(table)
+
+    return process
+
+
+def _sblocks_window(tables, key, decrypt):
+    """
+    Режим S-блоков: своя таблица translate для каждой позиции блока
+
+    Блоки с символами вне алфавита (пробел, цифры и т.п.) меняют состояние
+    таблицы внутри блока, поэтому они пересчитываются эталонным S-блоком.
+    Ключ с символами вне алфавита целиком обрабатывается эталонным S-блоком.
+    """
+    if len(key) != 16:
+        raise ValueError("ключ должен содержать ровно 16 символов")
+
+    sblock = SBlock()
+    transform = sblock.decrypt_s_block if decrypt else sblock.encrypt_s_block
+
+    if not KeySchedule.supports(key):
+        # Таблицы для ключа с посторонними символами выходят за алфавит:
+        # каждый блок обрабатывается эталонным S-блоком
+        def process(data, offset):
+            return b''.join(
+                tables.encode_chars(transform(tables.decode(data[i:i + 4]), key), data[i:i + 4])
+                for i in range(0, len(data), 4))
+
+        return process
+
+    position_tables = []
+    for table in get_block_tables(key):
+        if decrypt:
+            inverse = bytearray(32)
+            for code, value in enumerate(table):
+                inverse[value] = code
+            table = bytes(inverse)
+        byte_table = bytearray(tables.upper)
+        for b in range(256):
+            code = tables.to_code[b]
+            if code != 255:
+                byte_table[b] = tables.from_code[table[code]]
+        position_tables.append(bytes(byte_table))
+
+    def process(data, offset):
+        out = bytearray(len(data))
+        for q in range(4):
+            out[q::4] = data[q::4].translate(position_tables[q])
+
+        fixed = set()
+        for match in tables.other.finditer(data):
+            start = match.start() - match.start() % 4
+            if start not in fixed:
+                fixed.add(start)
+                block = data[start:start + 4]
+                out[start:start + 4] = tables.encode_chars(transform(tables.decode(block), key),
+                                                           block)
+
+        return bytes(out)
+
+    return process
+
+
+def _ctr_window(tables, key, nonce, decrypt):
+    """Счётчиковый режим: гамма по абсолютной позиции байта в файле"""
+    if len(key) != 16:
+        raise ValueError("ключ должен содержать ровно 16 символов")
+
+    counter = CounterMode(key, nonce)
+    to_code = tables.to_code
+    from_code = tables.from_code
+    sign = -1 if decrypt else 1
+
+    def process(data, offset):
+        codes = data.translate(to_code)
+        upper = data.translate(tables.upper)
+        stream = counter.keystream(offset, len(data))
+        return bytes(
+            from_code[(c + sign * k) & 31] if c != 255 else b
+            for b, c, k in zip(upper, codes, stream)
+        )
+
+    return process
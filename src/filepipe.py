@@ -0,0 +1,251 @@
+"""
+Шифрование файла с перекрытием чтения, вычислений и записи
+
+stream_file читает кусок, шифрует его и записывает результат строго по
+очереди, так что процессор простаивает во время ввода-вывода, а диск -
+во время шифрования. FilePipeline разносит этапы:
+
+    поток чтения  -> очередь -> шифрование -> очередь -> поток записи
+
+Чтение идёт через readinto в заранее выделенные буферы, которые
+возвращаются читателю после декодирования, поэтому память ограничена
+depth буферами по chunk_size байт. Очереди ограничены, так что медленный
+этап притормаживает остальные. Чтение и запись освобождают GIL, и время
+обработки приближается к времени самого медленного этапа, а не к сумме.
+
+С исполнителем (ProcessPoolExecutor) куски режимов simple, sblocks и ctr
+шифруются параллельно: они не зависят друг от друга при известной
+позиции. Режимы poly и enhanced переносят состояние между кусками,
+поэтому шифруются по порядку в вызывающем потоке. Результат совпадает
+с stream_file байт в байт.
+
+    pipeline = FilePipeline('ctr', key, executor=ProcessPoolExecutor(4))
+    stats = pipeline.run('log.txt', 'log.enc')
+"""
+
+import codecs
+import queue
+import threading
+import time
+from collections import deque
+
+from streams import open_stream
+
+# Размер буфера чтения по умолчанию (байт)
+CHUNK_SIZE = 1 << 20
+
+# Режимы, куски которых обрабатываются независимо
+PARALLEL_MODES = ('simple', 'sblocks', 'ctr')
+
+# Период проверки флага остановки в очередях (секунды)
+_POLL = 0.1
+
+
+def process_chunk(mode: str, key: str, shift: int, decrypt: bool, nonce: int, offset: int,
+                  text: str) -> str:
+    """Шифрование независимого куска с известной позицией offset (для пула процессов)"""
+    stream = open_stream(mode, key, shift, decrypt, nonce=nonce, offset=offset)
+    return stream.update(text) + stream.finalize()
+
+
+class _Stopped(Exception):
+    """Другой этап завершился с ошибкой"""
+
+
+class FilePipeline:
+    """Конвейер чтение / шифрование / запись для одного режима и ключа"""
+
+    def __init__(self, mode: str, key: str, shift: int = 8, decrypt: bool = False,
+                 encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE, depth: int = 4,
+                 executor=None, nonce: int = 0, rounds: int = 4, metrics=None):
+        """
+        Args:
+            mode, key, shift, decrypt: параметры шифра (см. streams.open_stream)
+            encoding: кодировка файлов
+            chunk_size: размер буфера чтения в байтах
+            depth: число буферов чтения и предел кусков в каждой очереди
+            executor: исполнитель для независимых кусков (None - в вызывающем потоке)
+            nonce: начальное значение счётчика (ctr)
+            rounds: число раундов (enhanced)
+            metrics: регистр MetricsRegistry; файл учитывается одним вызовом
+        """
+        if chunk_size < 4:
+            raise ValueError("chunk_size должен быть не меньше 4")
+        if depth < 1:
+            raise ValueError("depth должен быть положительным")
+        # Проверка режима и ключа до запуска потоков
+        open_stream(mode, key, shift, decrypt, nonce, rounds)
+
+        self.mode = mode
+        self.key = key
+        self.shift = shift
+        self.decrypt = decrypt
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.depth = depth
+        self.executor = executor if mode in PARALLEL_MODES else None
+        self.nonce = nonce
+        self.rounds = rounds
+        self.metrics = metrics
+
+    def run(self, source, target, progress=None) -> dict:
+        """
+        Обработка файла в файл
+
+        Args:
+            source: путь к исходному файлу
+            target: путь к файлу результата
+            progress: функция progress(символов обработано, секунд прошло)
+
+        Returns:
+            Словарь: chars, seconds, chars_per_second и время занятости
+            этапов read_seconds, compute_seconds, write_seconds
+        """
+        self._stop = threading.Event()
+        self._errors = []
+        self._busy = {'read': 0.0, 'compute': 0.0, 'write': 0.0}
+
+        free = queue.Queue()
+        for _ in range(self.depth):
+            free.put(bytearray(self.chunk_size))
+        filled = queue.Queue(self.depth)
+        results = queue.Queue(self.depth)
+
+        started = time.perf_counter()
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            threads = [
+                threading.Thread(target=self._guard, args=(self._read, src, free, filled)),
+                threading.Thread(target=self._guard, args=(self._write, dst, results)),
+            ]
+            for thread in threads:
+                thread.start()
+
+            chars = 0
+            try:
+                chars = self._compute(free, filled, results, started, progress)
+            except _Stopped:
+                pass
+            except BaseException as error:
+                self._errors.append(error)
+                self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        seconds = time.perf_counter() - started
+        if self.metrics is not None:
+            self.metrics.record(self.mode, 'decrypt' if self.decrypt else 'encrypt', chars,
+                                seconds, error=bool(self._errors))
+        if self._errors:
+            raise self._errors[0]
+
+        return {
+            'chars': chars,
+            'seconds': seconds,
+            'chars_per_second': chars / seconds if seconds > 0 else 0.0,
+            'read_seconds': self._busy['read'],
+            'compute_seconds': self._busy['compute'],
+            'write_seconds': self._busy['write'],
+        }
+
+    def _guard(self, stage, *args):
+        """Запуск этапа в потоке: ошибка останавливает весь конвейер"""
+        try:
+            stage(*args)
+        except _Stopped:
+            pass
+        except BaseException as error:
+            self._errors.append(error)
+            self._stop.set()
+
+    def _put(self, target: queue.Queue, item):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                target.put(item, timeout=_POLL)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self, source: queue.Queue):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                pass
+
+    def _read(self, src, free: queue.Queue, filled: queue.Queue):
+        """Этап чтения: буфер из free заполняется и уходит в filled; 0 байт - конец"""
+        while True:
+            buffer = self._get(free)
+            moment = time.perf_counter()
+            count = src.readinto(buffer)
+            self._busy['read'] += time.perf_counter() - moment
+            self._put(filled, (buffer, count))
+            if not count:
+                return
+
+    def _write(self, dst, results: queue.Queue):
+        """Этап записи: None - конец"""
+        while True:
+            data = self._get(results)
+            if data is None:
+                return
+            moment = time.perf_counter()
+            dst.write(data)
+            self._busy['write'] += time.perf_counter() - moment
+
+    def _compute(self, free, filled, results, started, progress) -> int:
+        """Этап шифрования в вызывающем потоке"""
+        # Кодек на весь файл: метка порядка байтов (utf-16) пишется один раз
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        if self.executor is None:
+            stream = open_stream(self.mode, self.key, self.shift, self.decrypt,
+                                 self.nonce, self.rounds)
+        else:
+            in_flight = deque()
+            pending = ''
+            offset = 0
+        chars = 0
+
+        while True:
+            buffer, count = self._get(filled)
+            moment = time.perf_counter()
+            text = decoder.decode(memoryview(buffer)[:count], final=not count)
+            free.put(buffer)
+            chars += len(text)
+
+            if self.executor is None:
+                result = stream.update(text) if text else ''
+                if not count:
+                    result += stream.finalize()
+                self._busy['compute'] += time.perf_counter() - moment
+                if result:
+                    self._put(results, encoder.encode(result))
+            else:
+                # Куски кратны 4 символам, чтобы блоки S-блоков не разрывались
+                text = pending + text
+                cut = len(text) if not count else len(text) - len(text) % 4
+                pending = text[cut:]
+                if cut:
+                    in_flight.append(self.executor.submit(
+                        process_chunk, self.mode, self.key, self.shift, self.decrypt,
+                        self.nonce, offset, text[:cut]))
+                    offset += cut
+                self._busy['compute'] += time.perf_counter() - moment
+                while in_flight and (len(in_flight) >= self.depth or not count
+                                     or in_flight[0].done()):
+                    result = in_flight.popleft().result()
+                    if result:
+                        self._put(results, encoder.encode(result))
+
+            if progress is not None and count:
+                progress(chars, time.perf_counter() - started)
+            if not count:
+                break
+
+        self._put(results, None)
+        return chars
@@ -0,0 +1,550 @@
+"""
+Дифференциальная проверка быстрых реализаций против эталонных
+
+Для каждого режима есть эталон, работающий напрямую по алгоритму:
+PolyTritemiusCipher._process_reference на PolyAlphabet.shift_table,
+посимвольные замены CustomAlphabet, полиалфавитный шифр каждого блока
+для S-блоков и счётчикового режима, раунды усиленного S-блока по
+таблицам PolyAlphabet. Быстрые реализации (таблицы str.translate,
+расписания KeySchedule, таблицы S-блоков, потоки, инкрементальный
+и асинхронный режимы, пул процессов) сравниваются с эталоном посимвольно
+на случайных ключах (повторяющиеся и строчные буквы, ключи длиннее
+алфавита, посторонние символы), текстах и сдвигах. Дополнительно
+проверяется обратимость: расшифровка результата шифрования.
+
+Запуск из командной строки:
+    python fuzz.py --iterations 500 --seed 1
+
+Код возврата 1 - найдены расхождения.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import namedtuple
+
+from aio import AsyncCryptoSystem
+from alphabet import CustomAlphabet, PolyAlphabet, get_standard_alphabet
+from incremental import IncrementalCipher
+from sblocks import CounterMode, EnhancedCryptoSystem, get_block_tables
+from streams import open_stream
+from tritemius import TritemiusCipher, get_poly_cipher
+
+# Параметры одной проверки: chunk - размер куска для потоков и шаг
+# контрольных точек, он же задаёт участок правки в инкрементальном режиме
+Case = namedtuple('Case', 'key text shift nonce decrypt chunk')
+
+# Символы вне алфавита в текстах и ключах (верхний регистр каждого из них -
+# один символ, иначе позиции в тексте после upper() сдвигаются)
+EXTRA_SYMBOLS = ' ,.!?-0123456789QWZ\n\tёъ'
+
+# Режимы и число раундов усиленного S-блока
+MODES = ('simple', 'poly', 'checkpoints', 'sblocks', 'ctr', 'enhanced')
+ROUNDS = 4
+
+
+def _call(function, *args):
+    """Результат вызова или имя исключения (ошибки тоже сравниваются)"""
+    try:
+        return function(*args)
+    except Exception as error:
+        return f"<{type(error).__name__}>"
+
+
+def _timed(function, *args) -> float:
+    started = time.perf_counter()
+    _call(function, *args)
+    return time.perf_counter() - started
+
+
+def _chunks(text: str, size: int):
+    return [text[start:start + size] for start in range(0, len(text), size)] or ['']
+
+
+def _stream(mode: str, case: Case, **params) -> str:
+    """Обработка текста потоком режима по кускам case.chunk"""
+    stream = open_stream(mode, case.key, decrypt=case.decrypt, **params)
+    parts = [stream.update(chunk) for chunk in _chunks(case.text, case.chunk)]
+    parts.append(stream.finalize())
+    return ''.join(parts)
+
+
+def _incremental(mode: str, case: Case) -> str:
+    """Шифрование испорченного текста и исправляющая правка участка"""
+    if not case.key:
+        # Инкрементальный шифр хранит текст в верхнем регистре и без ключа
+        # возвращает его, а не исходный текст
+        return None
+    text = case.text.upper()
+    start = min(case.chunk, len(text))
+    end = min(2 * case.chunk, len(text))
+    cipher = IncrementalCipher(case.key, mode, case.shift, case.decrypt)
+    cipher.set_text(text[:start] + text[start:end][::-1] + text[end:])
+    return cipher.edit(start, end - start, text[start:end])
+
+
+def _is_default(alphabet) -> bool:
+    return alphabet.symbols == get_standard_alphabet().symbols
+
+
+# Моноалфавитный шифр
+
+def simple_reference(case: Case, alphabet) -> str:
+    """Посимвольная замена в CustomAlphabet"""
+    if not case.key:
+        return case.text
+    cipher = TritemiusCipher(case.shift)
+    custom = CustomAlphabet(case.key, alphabet)
+    transform = cipher.decrypt_char if case.decrypt else cipher.encrypt_char
+    return ''.join(transform(char, custom) for char in case.text.upper())
+
+
+def _simple_translate(case, alphabet):
+    system = EnhancedCryptoSystem(case.shift, alphabet)
+    transform = system.decrypt_simple if case.decrypt else system.encrypt_simple
+    return transform(case.text, case.key)
+
+
+# Полиалфавитный шифр
+
+def poly_reference(case: Case, alphabet) -> str:
+    """Цикл на PolyAlphabet.shift_table"""
+    if not case.key:
+        return case.text
+    shift = -case.shift if case.decrypt else case.shift
+    cipher = get_poly_cipher(case.shift, alphabet)
+    return cipher._process_reference(case.text.upper(), case.key, shift)[0]
+
+
+def _poly_schedule(case, alphabet):
+    system = EnhancedCryptoSystem(case.shift, alphabet)
+    transform = system.decrypt_polyalphabetic if case.decrypt else system.encrypt_polyalphabetic
+    return transform(case.text, case.key)
+
+
+def _poly_shifts(case, alphabet):
+    cipher = get_poly_cipher(case.shift, alphabet)
+    transform = cipher.decrypt_shifts if case.decrypt else cipher.encrypt_shifts
+    return transform(case.text, case.key, [case.shift])[case.shift]
+
+
+def _poly_async(case, alphabet):
+    crypto = AsyncCryptoSystem(EnhancedCryptoSystem(case.shift, alphabet),
+                               inline_limit=0, chunk_size=case.chunk)
+    transform = crypto.decrypt_polyalphabetic if case.decrypt else crypto.encrypt_polyalphabetic
+    return asyncio.run(transform(case.text, case.key))
+
+
+def _poly_parallel(case, alphabet):
+    if not case.text:
+        return None
+    cipher = get_poly_cipher(case.shift, alphabet)
+    transform = cipher.decrypt_parallel if case.decrypt else cipher.encrypt_parallel
+    return transform(case.text, case.key, workers=2, chunk_size=case.chunk)
+
+
+# Контрольные точки таблицы
+
+def checkpoints_reference(case: Case, alphabet) -> str:
+    """Таблицы на границах блоков через PolyAlphabet.shift_table"""
+    if not case.key:
+        return ''
+    cipher = get_poly_cipher(case.shift, alphabet)
+    tables = cipher._checkpoints_reference(case.text.upper(), case.key, case.chunk)
+    return '|'.join(''.join(table) for table in tables)
+
+
+def _checkpoints_schedule(case, alphabet):
+    if not case.key:
+        return ''
+    cipher = get_poly_cipher(case.shift, alphabet)
+    tables = cipher.checkpoints(case.text.upper(), case.key, case.chunk)
+    return '|'.join(''.join(table) for table in tables)
+
+
+# S-блоки (ключ из 16 символов, длина текста кратна 4)
+
+def sblocks_reference(case: Case, alphabet) -> str:
+    """Полиалфавитный шифр (сдвиг 8) каждого блока отдельно"""
+    cipher = get_poly_cipher(8, alphabet)
+    shift = -8 if case.decrypt else 8
+    return ''.join(cipher._process_reference(block.upper(), case.key, shift)[0]
+                   for block in _chunks(case.text, 4))
+
+
+def _sblocks_system(case, alphabet):
+    system = EnhancedCryptoSystem(alphabet=alphabet)
+    transform = system.decrypt_s_blocks if case.decrypt else system.encrypt_s_blocks
+    return transform(case.text, case.key)
+
+
+def _sblocks_tables(case, alphabet):
+    """Таблицы замены по позициям блока (только для текста из символов алфавита)"""
+    text = case.text.upper()
+    codes = alphabet.char_to_val
+    if not all(char in codes for char in text):
+        return None
+    tables = get_block_tables(case.key, alphabet)
+    if case.decrypt:
+        tables = [bytes(table.index(c) for c in range(alphabet.size)) for table in tables]
+    return ''.join(alphabet.symbols[tables[i % 4][codes[char]]] for i, char in enumerate(text))
+
+
+# Счётчиковый режим
+
+def ctr_reference(case: Case, alphabet) -> str:
+    """Гамма по определению: цифры счётчика через эталонный S-блок"""
+    size = alphabet.size
+    codes = alphabet.char_to_val
+    symbols = alphabet.symbols
+    cipher = get_poly_cipher(8, alphabet)
+    boxes = {}
+
+    def box(q, x):
+        if (q, x) not in boxes:
+            block = cipher._process_reference(symbols[x] * 4, case.key, 8)[0]
+            boxes[q, x] = codes[block[q]]
+        return boxes[q, x]
+
+    sign = -1 if case.decrypt else 1
+    result = []
+    for i, char in enumerate(case.text.upper()):
+        c = codes.get(char)
+        if c is None:
+            result.append(char)
+            continue
+        value = (case.nonce + i // 4) % size ** 4
+        # Цифры от старшей к младшей, накопленные суммой от младшей
+        digits = [value // size ** (3 - q) % size for q in range(4)]
+        sums = [0] * 4
+        total = 0
+        for q in (3, 2, 1, 0):
+            total = (total + digits[q]) % size
+            sums[q] = total
+        result.append(symbols[(c + sign * box(i % 4, sums[i % 4])) % size])
+    return ''.join(result)
+
+
+def _ctr_system(case, alphabet):
+    system = EnhancedCryptoSystem(alphabet=alphabet)
+    transform = system.decrypt_ctr if case.decrypt else system.encrypt_ctr
+    return transform(case.text, case.key, case.nonce)
+
+
+def _ctr_offsets(case, alphabet):
+    """Куски с их смещениями, в обратном порядке"""
+    counter = CounterMode(case.key, case.nonce, alphabet)
+    transform = counter.decrypt if case.decrypt else counter.encrypt
+    pieces = _chunks(case.text, case.chunk)
+    offsets = range(0, len(case.text), case.chunk) if case.text else [0]
+    done = [transform(piece, offset) for piece, offset in reversed(list(zip(pieces, offsets)))]
+    return ''.join(reversed(done))
+
+
+# Усиленные S-блоки
+
+def enhanced_reference(case: Case, alphabet) -> str:
+    """Раунды по определению на таблицах PolyAlphabet.shift_table"""
+    if not case.key:
+        return case.text
+    key = ''.join(char for char in case.key.upper() if alphabet.is_valid_char(char))
+    if not key:
+        return '<ValueError>'
+
+    size = alphabet.size
+    codes = alphabet.char_to_val
+    symbols = alphabet.symbols
+    key_len = len(key)
+
+    poly = PolyAlphabet(key, alphabet)
+    tables = [poly.custom_symbols]
+    for i in range(4 * ROUNDS - 1):
+        tables.append(poly.shift_table(tables[-1], key[i % key_len], (key_len + i) % size))
+    boxes = [[codes[char] for char in table] for table in tables]
+    inverse = [[box.index(c) for c in range(size)] for box in boxes]
+    keys = [codes[key[i % key_len]] for i in range(4 * ROUNDS)]
+
+    text = case.text.upper()
+    values = [codes[char] for char in text if char in codes]
+    full = len(values) - len(values) % 4
+    out = []
+
+    for start in range(0, full, 4):
+        a, b, c, d = values[start:start + 4]
+        rounds = range(ROUNDS)
+        for r in (reversed(rounds) if case.decrypt else rounds):
+            n = 4 * r
+            k0, k1, k2, k3 = keys[n:n + 4]
+            if case.decrypt:
+                # Обратный сдвиг блока, затем обратные замены пар
+                a, b, c, d = d, a, b, c
+                a2, c2 = a, c
+                a = (inverse[n][a2] - k0) % size
+                b = (inverse[n + 1][b] - a2 - k1) % size
+                c = (inverse[n + 2][c2] - k2) % size
+                d = (inverse[n + 3][d] - c2 - k3) % size
+            else:
+                a = boxes[n][(a + k0) % size]
+                b = boxes[n + 1][(b + a + k1) % size]
+                c = boxes[n + 2][(c + k2) % size]
+                d = boxes[n + 3][(d + c + k3) % size]
+                a, b, c, d = b, c, d, a
+        out += [a, b, c, d]
+
+    for q, x in enumerate(values[full:]):
+        rounds = range(ROUNDS)
+        for r in (reversed(rounds) if case.decrypt else rounds):
+            n = 4 * r
+            if case.decrypt:
+                x = (inverse[n][x] - keys[n] - q) % size
+            else:
+                x = boxes[n][(x + keys[n] + q) % size]
+        out.append(x)
+
+    result = iter(out)
+    return ''.join(symbols[next(result)] if char in codes else char for char in text)
+
+
+def _enhanced_system(case, alphabet):
+    system = EnhancedCryptoSystem(alphabet=alphabet)
+    transform = (system.decrypt_enhanced_sblocks if case.decrypt
+                 else system.encrypt_enhanced_sblocks)
+    return transform(case.text, case.key, ROUNDS)
+
+
+# Режим -> (эталон, {имя реализации: (функция, только телеграфный алфавит)})
+BACKENDS = {
+    'simple': (simple_reference, {
+        'translate': (_simple_translate, False),
+        'stream': (lambda case, alphabet: _stream('simple', case, shift=case.shift), True),
+        'incremental': (lambda case, alphabet: _incremental('simple', case), True),
+    }),
+    'poly': (poly_reference, {
+        'schedule': (_poly_schedule, False),
+        'shifts': (_poly_shifts, False),
+        'stream': (lambda case, alphabet: _stream('poly', case, shift=case.shift), True),
+        'incremental': (lambda case, alphabet: _incremental('poly', case), True),
+        'async': (_poly_async, True),
+    }),
+    'checkpoints': (checkpoints_reference, {
+        'schedule': (_checkpoints_schedule, False),
+    }),
+    'sblocks': (sblocks_reference, {
+        'system': (_sblocks_system, False),
+        'tables': (_sblocks_tables, False),
+        'stream': (lambda case, alphabet: _stream('sblocks', case), True),
+        'incremental': (lambda case, alphabet: _incremental('sblocks', case), True),
+    }),
+    'ctr': (ctr_reference, {
+        'system': (_ctr_system, False),
+        'offsets': (_ctr_offsets, False),
+        'stream': (lambda case, alphabet: _stream('ctr', case, nonce=case.nonce), True),
+    }),
+    'enhanced': (enhanced_reference, {
+        'system': (_enhanced_system, False),
+        'stream': (lambda case, alphabet: _stream('enhanced', case, rounds=ROUNDS), True),
+    }),
+}
+
+# Реализация для проверки обратимости
+_ROUND_TRIP = {
+    'simple': _simple_translate,
+    'poly': _poly_schedule,
+    'sblocks': _sblocks_system,
+    'ctr': _ctr_system,
+    'enhanced': _enhanced_system,
+}
+
+
+def random_key(rng: random.Random, symbols: str, length: int = None) -> str:
+    """
+    Случайный ключ: обычный, из повторяющихся букв, длиннее алфавита,
+    в нижнем регистре или с посторонними символами
+    """
+    kind = rng.choice(('plain', 'repeated', 'long', 'lower', 'extra'))
+    if length is None:
+        length = rng.randint(len(symbols) + 1, 3 * len(symbols)) if kind == 'long' \
+            else rng.randint(0, 12)
+    pool = symbols
+    if kind == 'repeated':
+        pool = rng.sample(symbols, 2)
+    elif kind == 'extra':
+        pool = symbols + EXTRA_SYMBOLS
+    key = ''.join(rng.choice(pool) for _ in range(length))
+    return key.lower() if kind == 'lower' else key
+
+
+def random_text(rng: random.Random, symbols: str, max_length: int) -> str:
+    """Случайный текст: символы алфавита в обоих регистрах и посторонние символы"""
+    pool = symbols + symbols.lower() + EXTRA_SYMBOLS
+    if rng.random() < 0.3:
+        pool = symbols
+    return ''.join(rng.choice(pool) for _ in range(rng.randint(0, max_length)))
+
+
+def random_case(mode: str, rng: random.Random, alphabet, max_length: int) -> Case:
+    """Случайная проверка для режима"""
+    symbols = ''.join(alphabet.symbols)
+    size = alphabet.size
+    text = random_text(rng, symbols, max_length)
+
+    if mode in ('sblocks', 'ctr'):
+        # Ключ S-блока - ровно 16 символов алфавита
+        key = ''.join(rng.choice(symbols) for _ in range(16))
+        if rng.random() < 0.3:
+            key = key.lower()
+        if mode == 'sblocks':
+            text = text[:len(text) - len(text) % 4]
+    else:
+        key = random_key(rng, symbols)
+
+    return Case(
+        key=key,
+        text=text,
+        shift=rng.randint(-size, 2 * size),
+        nonce=rng.randint(0, size ** 4 + 10),
+        decrypt=rng.random() < 0.5,
+        chunk=rng.randint(1, max(1, max_length // 3)),
+    )
+
+
+def _reversible(mode: str, case: Case, alphabet) -> bool:
+    """
+    Должна ли расшифровка вернуть исходный текст
+
+    Ключ с посторонними символами даёт таблицы с этими символами: буква
+    может зашифроваться в посторонний символ и не восстановиться.
+    """
+    if mode == 'enhanced':
+        return any(alphabet.is_valid_char(char) for char in case.key)
+    if mode in ('simple', 'poly'):
+        return bool(case.key) and all(alphabet.is_valid_char(char) for char in case.key)
+    return True
+
+
+def run_fuzz(iterations: int = 200, seed: int = 0, modes=MODES, max_length: int = 200,
+             alphabet=None, parallel: bool = False, keep: int = 5) -> dict:
+    """
+    Сравнение всех реализаций с эталоном на случайных проверках
+
+    Args:
+        iterations: число проверок на режим
+        seed: начальное значение генератора
+        modes: проверяемые режимы
+        max_length: максимальная длина текста
+        alphabet: базовый алфавит (по умолчанию телеграфный)
+        parallel: проверять и шифрование в пуле процессов (медленно)
+        keep: сколько расхождений сохранять на реализацию
+
+    Returns:
+        {режим: {'cases', 'reference_seconds', 'round_trip_failures',
+                 'backends': {имя: {'cases', 'seconds', 'speedup',
+                                    'mismatches', 'examples'}}}}
+    """
+    alphabet = alphabet or get_standard_alphabet()
+    rng = random.Random(seed)
+    report = {}
+
+    for mode in modes:
+        reference, backends = BACKENDS[mode]
+        backends = dict(backends)
+        if mode == 'poly' and parallel:
+            backends['parallel'] = (_poly_parallel, False)
+        backends = {name: function for name, (function, default_only) in backends.items()
+                    if _is_default(alphabet) or not default_only}
+
+        stats = {name: {'cases': 0, 'seconds': 0.0, 'reference_seconds': 0.0,
+                        'mismatches': 0, 'examples': []}
+                 for name in backends}
+        reference_seconds = 0.0
+        round_trip = {'checked': 0, 'failures': 0, 'examples': []}
+
+        for _ in range(iterations):
+            case = random_case(mode, rng, alphabet, max_length)
+
+            # Сравнение - на первом вызове (с построением таблиц ключа),
+            # скорость - на повторном, с прогретыми кэшами
+            expected = _call(reference, case, alphabet)
+            spent = _timed(reference, case, alphabet)
+            reference_seconds += spent
+
+            for name, function in backends.items():
+                got = _call(function, case, alphabet)
+                if got is None:
+                    continue
+                entry = stats[name]
+                entry['cases'] += 1
+                entry['seconds'] += _timed(function, case, alphabet)
+                entry['reference_seconds'] += spent
+                if got != expected:
+                    entry['mismatches'] += 1
+                    if len(entry['examples']) < keep:
+                        entry['examples'].append({'case': case._asdict(), 'expected': expected,
+                                                  'got': got})
+
+            transform = _ROUND_TRIP.get(mode)
+            if transform is not None and _reversible(mode, case, alphabet):
+                forward = _call(transform, case._replace(decrypt=False), alphabet)
+                back = _call(transform, case._replace(text=forward, decrypt=True), alphabet)
+                round_trip['checked'] += 1
+                if back != case.text.upper():
+                    round_trip['failures'] += 1
+                    if len(round_trip['examples']) < keep:
+                        round_trip['examples'].append({'case': case._asdict(), 'got': back})
+
+        for entry in stats.values():
+            entry['speedup'] = (entry.pop('reference_seconds') / entry['seconds']
+                                if entry['seconds'] else None)
+        report[mode] = {
+            'cases': iterations,
+            'reference_seconds': reference_seconds,
+            'round_trip': round_trip,
+            'backends': stats,
+        }
+
+    return report
+
+
+def failures(report: dict) -> int:
+    """Общее число расхождений и нарушений обратимости"""
+    return sum(entry['round_trip']['failures']
+               + sum(backend['mismatches'] for backend in entry['backends'].values())
+               for entry in report.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение быстрых реализаций с эталонными")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--mode', action='append', choices=MODES,
+                        help="режим (можно несколько; по умолчанию все)")
+    parser.add_argument('--max-length', type=int, default=200)
+    parser.add_argument('--symbols', default=None, help="символы базового алфавита")
+    parser.add_argument('--parallel', action='store_true',
+                        help="проверять и пул процессов (медленно)")
+    args = parser.parse_args()
+
+    alphabet = get_standard_alphabet(args.symbols) if args.symbols else None
+    report = run_fuzz(args.iterations, args.seed, args.mode or MODES, args.max_length,
+                      alphabet, args.parallel)
+
+    for mode, entry in report.items():
+        round_trip = entry['round_trip']
+        print(f"{mode}: {entry['cases']} проверок, обратимость "
+              f"{round_trip['checked'] - round_trip['failures']}/{round_trip['checked']}")
+        for example in round_trip['examples']:
+            print(f"    обратимость нарушена: {example}")
+        for name, backend in entry['backends'].items():
+            speedup = f"{backend['speedup']:.1f}x" if backend['speedup'] else '-'
+            print(f"  {name:12s} {backend['cases']:5d} проверок, "
+                  f"расхождений {backend['mismatches']}, скорость {speedup}")
+            for example in backend['examples']:
+                print(f"    {example}")
+
+    sys.exit(1 if failures(report) else 0)
+
+
+if __name__ == "__main__":
+    main()
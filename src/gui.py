@@ -2,12 +2,26 @@
 Графический интерфейс для криптосистемы Тритемиуса
 """
 
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 
+from incremental import IncrementalCipher
 from sblocks import EnhancedCryptoSystem
+from streams import stream_file
 from tritemius import get_custom_alphabet_string
 
+# Задержка живого просмотра после последнего нажатия, мс
+LIVE_DELAY = 300
+
+# Сколько первых символов файла показывать в полях при обработке файлов
+FILE_PREVIEW = 2000
+
+# Период опроса хода обработки файла, мс
+FILE_POLL = 100
+
 
 class CryptoApp:
     """Главное окно приложения с 4 вкладками"""
@@ -20,7 +34,14 @@ class CryptoApp:
         # Создаем криптосистему
         self.system = EnhancedCryptoSystem()
 
+        # Состояние живого просмотра по вкладкам
+        self.live = {}
+
+        # Очередь событий фоновой обработки файла (None - обработки нет)
+        self.file_events = None
+
         self.setup_ui()
+        self._setup_live_preview()
 
     def setup_ui(self):
         """Настройка пользовательского интерфейса"""
@@ -75,10 +96,18 @@ class CryptoApp:
         self.tab1_input = scrolledtext.ScrolledText(left_frame, height=8)
         self.tab1_input.pack(fill='both', expand=True, pady=(0, 10))
 
+        # Живой просмотр результата при наборе
+        self.tab1_live = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left_frame, text="Живой просмотр", variable=self.tab1_live,
+                        command=lambda: self._live_toggle(1)).pack(anchor='w', pady=(0, 5))
+
         # Кнопка шифрования
         ttk.Button(left_frame, text="ЗАШИФРОВАТЬ",
                   command=self.tab1_encrypt,
                   style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(left_frame, text="ЗАШИФРОВАТЬ ФАЙЛ...",
+                  command=lambda: self.file_job(1, decrypt=False)).pack(pady=5)
 
         # Результат шифрования
         ttk.Label(left_frame, text="Результат шифрования:").pack(anchor='w', pady=(10, 5))
@@ -102,6 +131,9 @@ class CryptoApp:
         ttk.Button(right_frame, text="РАСШИФРОВАТЬ",
                   command=self.tab1_decrypt,
                   style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(right_frame, text="РАСШИФРОВАТЬ ФАЙЛ...",
+                  command=lambda: self.file_job(1, decrypt=True)).pack(pady=5)
 
         # Результат дешифрования
         ttk.Label(right_frame, text="Расшифрованный текст:").pack(anchor='w', pady=(10, 5))
@@ -127,7 +159,7 @@ class CryptoApp:
         """Шифрование для вкладки 1"""
         try:
             key = self.tab1_key.get().strip()
-            text = self.tab1_input.get("1.0", tk.END).strip()
+            text = _input_text(self.tab1_input)
 
             if not key:
                 messagebox.showwarning("Ошибка", "Введите ключевое слово!")
@@ -149,7 +181,7 @@ class CryptoApp:
         """Дешифрование для вкладки 1"""
         try:
             key = self.tab1_key.get().strip()
-            text = self.tab1_cipher_input.get("1.0", tk.END).strip()
+            text = _input_text(self.tab1_cipher_input)
 
             if not key:
                 messagebox.showwarning("Ошибка", "Введите ключевое слово!")
@@ -207,10 +239,18 @@ class CryptoApp:
         self.tab2_input = scrolledtext.ScrolledText(left_frame, height=8)
         self.tab2_input.pack(fill='both', expand=True, pady=(0, 10))
 
+        # Живой просмотр результата при наборе
+        self.tab2_live = tk.BooleanVar(value=False)
+        ttk.Checkbutton(left_frame, text="Живой просмотр", variable=self.tab2_live,
+                        command=lambda: self._live_toggle(2)).pack(anchor='w', pady=(0, 5))
+
         # Кнопка шифрования
         ttk.Button(left_frame, text="ЗАШИФРОВАТЬ",
                   command=self.tab2_encrypt,
                   style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(left_frame, text="ЗАШИФРОВАТЬ ФАЙЛ...",
+                  command=lambda: self.file_job(2, decrypt=False)).pack(pady=5)
 
         # Результат шифрования
         ttk.Label(left_frame, text="Результат шифрования:").pack(anchor='w', pady=(10, 5))
@@ -234,6 +274,13 @@ class CryptoApp:
         ttk.Button(right_frame, text="РАСШИФРОВАТЬ",
                   command=self.tab2_decrypt,
                   style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(right_frame, text="РАСШИФРОВАТЬ ФАЙЛ...",
+                  command=lambda: self.file_job(2, decrypt=True)).pack(pady=5)
+
+        # Кнопка перебора сдвигов (все варианты за один проход)
+        ttk.Button(right_frame, text="ПЕРЕБРАТЬ ВСЕ СДВИГИ",
+                  command=self.tab2_decrypt_all_shifts).pack(pady=5)
 
         # Результат дешифрования
         ttk.Label(right_frame, text="Расшифрованный текст:").pack(anchor='w', pady=(10, 5))
@@ -244,13 +291,20 @@ class CryptoApp:
         ttk.Button(right_frame, text="КОПИРОВАТЬ РЕЗУЛЬТАТ",
                   command=self.tab2_copy_decrypt_result).pack(pady=5)
 
+    def _tab2_shift(self) -> int:
+        """Сдвиг вкладки 2 (пусто - 8); ValueError, если это не число от 1 до 31"""
+        shift_text = self.tab2_shift.get().strip()
+        shift = int(shift_text) if shift_text else 8
+        if not 1 <= shift <= 31:
+            raise ValueError(f"сдвиг вне диапазона: {shift}")
+        return shift
+
     def tab2_encrypt(self):
         """Шифрование для вкладки 2"""
         try:
             key = self.tab2_key.get().strip()
-            shift_text = self.tab2_shift.get().strip()
-            shift = int(shift_text) if shift_text else 8
-            text = self.tab2_input.get("1.0", tk.END).strip()
+            shift = self._tab2_shift()
+            text = _input_text(self.tab2_input)
 
             if not key:
                 messagebox.showwarning("Ошибка", "Введите ключевое слово!")
@@ -260,9 +314,8 @@ class CryptoApp:
                 messagebox.showwarning("Ошибка", "Введите текст для шифрования!")
                 return
 
-            # Создаем новую систему с указанным сдвигом
-            system = EnhancedCryptoSystem(shift=shift)
-            result = system.encrypt_polyalphabetic(text, key, shift)
+            # Система неизменяема, сдвиг передаётся в вызов
+            result = self.system.encrypt_polyalphabetic(text, key, shift)
             self.tab2_result.delete("1.0", tk.END)
             self.tab2_result.insert("1.0", result)
             self.status_bar.config(text=f"Текст зашифрован (полиалфавитный, сдвиг={shift})")
@@ -276,9 +329,8 @@ class CryptoApp:
         """Дешифрование для вкладки 2"""
         try:
             key = self.tab2_key.get().strip()
-            shift_text = self.tab2_shift.get().strip()
-            shift = int(shift_text) if shift_text else 8
-            text = self.tab2_cipher_input.get("1.0", tk.END).strip()
+            shift = self._tab2_shift()
+            text = _input_text(self.tab2_cipher_input)
 
             if not key:
                 messagebox.showwarning("Ошибка", "Введите ключевое слово!")
@@ -288,9 +340,8 @@ class CryptoApp:
                 messagebox.showwarning("Ошибка", "Введите шифротекст!")
                 return
 
-            # Создаем новую систему с указанным сдвигом
-            system = EnhancedCryptoSystem(shift=shift)
-            result = system.decrypt_polyalphabetic(text, key, shift)
+            # Система неизменяема, сдвиг передаётся в вызов
+            result = self.system.decrypt_polyalphabetic(text, key, shift)
             self.tab2_decrypt_result.delete("1.0", tk.END)
             self.tab2_decrypt_result.insert("1.0", result)
             self.status_bar.config(text=f"Текст расшифрован (полиалфавитный, сдвиг={shift})")
@@ -300,6 +351,29 @@ class CryptoApp:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Произошла ошибка: {e}")
 
+    def tab2_decrypt_all_shifts(self):
+        """Дешифрование для вкладки 2 сразу при всех сдвигах 1-31"""
+        try:
+            key = self.tab2_key.get().strip()
+            text = _input_text(self.tab2_cipher_input)
+
+            if not key:
+                messagebox.showwarning("Ошибка", "Введите ключевое слово!")
+                return
+
+            if not text:
+                messagebox.showwarning("Ошибка", "Введите шифротекст!")
+                return
+
+            variants = self.system.decrypt_polyalphabetic_shifts(text, key)
+            result = '\n'.join(f"{shift:2d}: {variant}" for shift, variant in variants.items())
+            self.tab2_decrypt_result.delete("1.0", tk.END)
+            self.tab2_decrypt_result.insert("1.0", result)
+            self.status_bar.config(text="Текст расшифрован при всех сдвигах (полиалфавитный)")
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Произошла ошибка: {e}")
+
     def tab2_copy_result(self):
         """Копирование результата шифрования"""
         result = self.tab2_result.get("1.0", tk.END).strip()
@@ -334,10 +408,18 @@ class CryptoApp:
         self.tab3_input = scrolledtext.ScrolledText(top_frame, height=6)
         self.tab3_input.pack(fill='both', expand=True, pady=(0, 10))
 
+        # Живой просмотр результата при наборе
+        self.tab3_live = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Живой просмотр", variable=self.tab3_live,
+                        command=lambda: self._live_toggle(3)).pack(anchor='w', pady=(0, 5))
+
         # Кнопка для шифрования S-блоками
         ttk.Button(top_frame, text="ЗАШИФРОВАТЬ S-БЛОКАМИ",
                    command=self.tab3_encrypt_sblocks,
                    style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(top_frame, text="ЗАШИФРОВАТЬ ФАЙЛ...",
+                   command=lambda: self.file_job(3, decrypt=False)).pack(pady=5)
 
         # Результат шифрования
         ttk.Label(top_frame, text="Результат шифрования:").pack(anchor='w', pady=(10, 5))
@@ -362,6 +444,9 @@ class CryptoApp:
         ttk.Button(bottom_frame, text="РАСШИФРОВАТЬ S-БЛОКАМИ",
                    command=self.tab3_decrypt_sblocks,
                    style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(bottom_frame, text="РАСШИФРОВАТЬ ФАЙЛ...",
+                   command=lambda: self.file_job(3, decrypt=True)).pack(pady=5)
 
         # Результат дешифрования
         ttk.Label(bottom_frame, text="Результат дешифрования:").pack(anchor='w', pady=(10, 5))
@@ -372,7 +457,7 @@ class CryptoApp:
         """Шифрование S-блоками (по псевдокоду)"""
         try:
             key = self.tab3_key.get().strip()
-            text = self.tab3_input.get("1.0", tk.END).strip()
+            text = _input_text(self.tab3_input)
 
             if not key:
                 messagebox.showwarning("Ошибка", "Введите ключ (16 символов)!")
@@ -404,7 +489,7 @@ class CryptoApp:
         """Дешифрование S-блоками (по псевдокоду)"""
         try:
             key = self.tab3_key2.get().strip()
-            text = self.tab3_cipher_input.get("1.0", tk.END).strip()
+            text = _input_text(self.tab3_cipher_input)
 
             if not key:
                 messagebox.showwarning("Ошибка", "Введите ключ (16 символов)!")
@@ -454,6 +539,9 @@ class CryptoApp:
         ttk.Button(top_frame, text="ЗАШИФРОВАТЬ С УСИЛЕННЫМИ S-БЛОКАМИ",
                   command=self.tab4_apply_enhanced_sbox,
                   style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(top_frame, text="ЗАШИФРОВАТЬ ФАЙЛ...",
+                  command=lambda: self.file_job(4, decrypt=False)).pack(pady=5)
 
         # Результат усиленного S-блока
         ttk.Label(top_frame, text="Результат шифрования:").pack(anchor='w', pady=(10, 5))
@@ -478,6 +566,9 @@ class CryptoApp:
         ttk.Button(bottom_frame, text="РАСШИФРОВАТЬ С УСИЛЕННЫМИ S-БЛОКАМИ",
                   command=self.tab4_apply_inverse_enhanced_sbox,
                   style='Accent.TButton').pack(pady=5)
+        # Потоковая обработка файла в файл
+        ttk.Button(bottom_frame, text="РАСШИФРОВАТЬ ФАЙЛ...",
+                  command=lambda: self.file_job(4, decrypt=True)).pack(pady=5)
 
         # Результат дешифрования
         ttk.Label(bottom_frame, text="Результат дешифрования:").pack(anchor='w', pady=(10, 5))
@@ -488,7 +579,7 @@ class CryptoApp:
         """Применение усиленного S-блока"""
         try:
             key = self.tab4_key.get().strip()
-            text = self.tab4_input.get("1.0", tk.END).strip()
+            text = _input_text(self.tab4_input)
 
             if not text:
                 messagebox.showwarning("Ошибка", "Введите текст!")
@@ -511,7 +602,7 @@ class CryptoApp:
         """Применение обратного усиленного S-блока"""
         try:
             key = self.tab4_key2.get().strip()
-            text = self.tab4_cipher_input.get("1.0", tk.END).strip()
+            text = _input_text(self.tab4_cipher_input)
 
             if not text:
                 messagebox.showwarning("Ошибка", "Введите зашифрованный текст!")
@@ -530,6 +621,217 @@ class CryptoApp:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Произошла ошибка: {e}")
 
+    # ===== Живой просмотр (вкладки 1-3) =====
+    def _setup_live_preview(self):
+        """Подписка на изменения полей ввода вкладок 1-3"""
+        tabs = {
+            1: (self.tab1_input, self.tab1_result, self.tab1_key, self.tab1_live),
+            2: (self.tab2_input, self.tab2_result, self.tab2_key, self.tab2_live),
+            3: (self.tab3_input, self.tab3_result, self.tab3_key, self.tab3_live),
+        }
+        for tab, (text_widget, result_widget, key_entry, enabled) in tabs.items():
+            self.live[tab] = {
+                'input': text_widget,
+                'result': result_widget,
+                'enabled': enabled,
+                'after': None,
+                'cipher': None,
+                'params': None,
+            }
+            text_widget.bind('<<Modified>>', lambda event, tab=tab: self._live_modified(tab))
+            key_entry.bind('<KeyRelease>', lambda event, tab=tab: self._live_schedule(tab))
+        self.tab2_shift.bind('<KeyRelease>', lambda event: self._live_schedule(2))
+        self.tab2_shift.configure(command=lambda: self._live_schedule(2))
+
+    def _live_params(self, tab):
+        """Параметры шифрования вкладки: (ключ, режим, сдвиг)"""
+        if tab == 1:
+            return self.tab1_key.get().strip(), 'simple', self.system.cipher.shift
+        if tab == 2:
+            return self.tab2_key.get().strip(), 'poly', self._tab2_shift()
+        return self.tab3_key.get().strip(), 'sblocks', self.system.cipher.shift
+
+    def _live_toggle(self, tab):
+        """Включение/выключение живого просмотра"""
+        state = self.live[tab]
+        if state['enabled'].get():
+            state['cipher'] = None
+            self._live_update(tab)
+        elif state['after'] is not None:
+            self.root.after_cancel(state['after'])
+            state['after'] = None
+
+    def _live_modified(self, tab):
+        """Обработчик <<Modified>> поля ввода"""
+        widget = self.live[tab]['input']
+        if not widget.edit_modified():
+            return
+        widget.edit_modified(False)
+        self._live_schedule(tab)
+
+    def _live_schedule(self, tab):
+        """Отложенный пересчёт (повторные события сдвигают его)"""
+        state = self.live[tab]
+        if not state['enabled'].get():
+            return
+        if state['after'] is not None:
+            self.root.after_cancel(state['after'])
+        state['after'] = self.root.after(LIVE_DELAY, lambda: self._live_update(tab))
+
+    def _live_update(self, tab):
+        """Пересчёт только изменённой части текста и результата"""
+        state = self.live[tab]
+        state['after'] = None
+
+        try:
+            params = self._live_params(tab)
+        except ValueError:
+            self.status_bar.config(text="Сдвиг должен быть числом от 1 до 31!")
+            return
+
+        key, mode, shift = params
+        if not key:
+            self.status_bar.config(text="Живой просмотр: введите ключ")
+            return
+        if mode == 'sblocks' and len(key) != 16:
+            self.status_bar.config(text="Живой просмотр: ключ должен содержать ровно 16 символов")
+            return
+
+        # Текст берётся так же, как кнопками шифрования, иначе пробелы по краям
+        # сдвигают таблицы poly и блоки sblocks
+        text = _input_text(state['input']).upper()
+        cipher = state['cipher']
+
+        if cipher is None or state['params'] != params:
+            cipher = IncrementalCipher(key, mode, shift)
+            cipher.set_text(text)
+            state['cipher'], state['params'] = cipher, params
+            state['result'].delete("1.0", tk.END)
+            state['result'].insert("1.0", cipher.ciphertext)
+        else:
+            old = cipher.ciphertext
+            offset, deleted, inserted = _text_diff(cipher.plaintext, text)
+            if deleted or inserted:
+                cipher.edit(offset, deleted, inserted)
+            _replace_changed(state['result'], old, cipher.ciphertext)
+
+        self.status_bar.config(text=f"Живой просмотр: {len(text)} символов")
+
+    # ===== Потоковая обработка файлов =====
+    def _file_params(self, tab, decrypt):
+        """
+        Параметры обработки файла для вкладки
+
+        Returns:
+            (режим, ключ, сдвиг, поле исходного текста, поле результата)
+        """
+        if tab == 1:
+            widgets = ((self.tab1_cipher_input, self.tab1_decrypt_result) if decrypt
+                       else (self.tab1_input, self.tab1_result))
+            return ('simple', self.tab1_key.get().strip(), self.system.cipher.shift) + widgets
+        if tab == 2:
+            shift = self._tab2_shift()
+            widgets = ((self.tab2_cipher_input, self.tab2_decrypt_result) if decrypt
+                       else (self.tab2_input, self.tab2_result))
+            return ('poly', self.tab2_key.get().strip(), shift) + widgets
+        if tab == 3:
+            if decrypt:
+                return ('sblocks', self.tab3_key2.get().strip(), self.system.cipher.shift,
+                        self.tab3_cipher_input, self.tab3_decrypt_result)
+            return ('sblocks', self.tab3_key.get().strip(), self.system.cipher.shift,
+                    self.tab3_input, self.tab3_result)
+        if decrypt:
+            return ('enhanced', self.tab4_key2.get().strip(), self.system.cipher.shift,
+                    self.tab4_cipher_input, self.tab4_decrypt_result)
+        return ('enhanced', self.tab4_key.get().strip(), self.system.cipher.shift,
+                self.tab4_input, self.tab4_result)
+
+    def file_job(self, tab, decrypt):
+        """Шифрование/расшифровка файла в файл в фоновом потоке"""
+        if self.file_events is not None:
+            messagebox.showwarning("Ошибка", "Обработка файла уже выполняется!")
+            return
+
+        try:
+            mode, key, shift, input_widget, result_widget = self._file_params(tab, decrypt)
+        except ValueError:
+            messagebox.showwarning("Ошибка", "Сдвиг должен быть числом от 1 до 31!")
+            return
+
+        if not key:
+            messagebox.showwarning("Ошибка", "Введите ключевое слово!")
+            return
+        if mode == 'sblocks' and len(key) != 16:
+            messagebox.showwarning("Ошибка", "Ключ должен содержать ровно 16 символов!")
+            return
+
+        source = filedialog.askopenfilename(title="Исходный файл")
+        if not source:
+            return
+        target = filedialog.asksaveasfilename(title="Сохранить результат как")
+        if not target:
+            return
+        if os.path.abspath(source) == os.path.abspath(target):
+            messagebox.showwarning("Ошибка", "Файл результата должен отличаться от исходного!")
+            return
+
+        events = queue.Queue()
+
+        def work():
+            try:
+                report = stream_file(source, target, mode, key, shift, decrypt,
+                                     preview=FILE_PREVIEW,
+                                     progress=lambda chars, seconds:
+                                     events.put(('progress', chars, seconds)))
+                events.put(('done', report))
+            except Exception as e:
+                events.put(('error', e))
+
+        self.file_events = events
+        self.status_bar.config(text=f"Обработка файла: {os.path.basename(source)}")
+        threading.Thread(target=work, daemon=True).start()
+        self.root.after(FILE_POLL, lambda: self._file_poll(input_widget, result_widget, target))
+
+    def _file_poll(self, input_widget, result_widget, target):
+        """Обновление хода обработки файла из событий фонового потока"""
+        events = self.file_events
+        progress = None
+
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+
+            if event[0] == 'progress':
+                progress = event
+                continue
+
+            self.file_events = None
+            if event[0] == 'error':
+                self.status_bar.config(text="Ошибка обработки файла")
+                messagebox.showerror("Ошибка", f"Произошла ошибка: {event[1]}")
+                return
+
+            report = event[1]
+            # В полях - только начало исходного текста и результата
+            input_widget.delete("1.0", tk.END)
+            input_widget.insert("1.0", report['preview_in'])
+            result_widget.delete("1.0", tk.END)
+            result_widget.insert("1.0", report['preview_out'])
+            self.status_bar.config(
+                text=f"Файл обработан: {report['chars']} символов за {report['seconds']:.2f} с "
+                     f"({_format_rate(report['chars_per_second'])}) -> "
+                     f"{os.path.basename(target)}")
+            return
+
+        if progress is not None:
+            _, chars, seconds = progress
+            rate = chars / seconds if seconds > 0 else 0.0
+            self.status_bar.config(
+                text=f"Обработка файла: {chars} символов ({_format_rate(rate)})")
+        self.root.after(FILE_POLL, lambda: self._file_poll(input_widget, result_widget, target))
+
     def run(self):
         """Запуск приложения"""
         # Настройка стилей
@@ -539,6 +841,65 @@ class CryptoApp:
         self.root.mainloop()
 
 
+def _input_text(widget) -> str:
+    """Текст поля ввода без пробелов и переводов строк по краям"""
+    return widget.get("1.0", tk.END).strip()
+
+
+def _format_rate(chars_per_second: float) -> str:
+    """Пропускная способность в удобных единицах"""
+    if chars_per_second >= 1e6:
+        return f"{chars_per_second / 1e6:.2f} млн симв/с"
+    if chars_per_second >= 1e3:
+        return f"{chars_per_second / 1e3:.1f} тыс. симв/с"
+    return f"{chars_per_second:.0f} симв/с"
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Длина общего начала строк (двоичный поиск по срезам)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Длина общего конца строк, не больше limit"""
+    low, high = 0, min(len(a), len(b), limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _text_diff(old: str, new: str):
+    """
+    Правка, превращающая old в new
+
+    Returns:
+        (позиция, число удалённых символов, вставленный текст)
+    """
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    return prefix, len(old) - prefix - suffix, new[prefix:len(new) - suffix]
+
+
+def _replace_changed(widget, old: str, new: str):
+    """Замена в текстовом поле только отличающейся части"""
+    offset, deleted, inserted = _text_diff(old, new)
+    if deleted:
+        widget.delete(f"1.0 + {offset} chars", f"1.0 + {offset + deleted} chars")
+    if inserted:
+        widget.insert(f"1.0 + {offset} chars", inserted)
+
+
 # Точка входа в приложение
 if __name__ == "__main__":
     app = CryptoApp()
@@ -0,0 +1,36 @@
+"""
+Неизменяемые объекты шифров
+
+Шифры, S-блоки и криптосистема после построения не меняются: таблицы
+хранятся в bytes и tuple, кэши ключей (lru_cache) потокобезопасны,
+а состояние одного вызова (текущая таблица, позиция, результат) живёт
+только в локальных переменных метода. Поэтому один экземпляр можно
+вызывать одновременно из нескольких потоков без блокировок, в том числе
+на CPython без GIL (3.13t).
+
+Потоковые объекты с состоянием между вызовами (streams, IncrementalCipher)
+к ним не относятся: у каждого потока должен быть свой экземпляр.
+"""
+
+
+class Immutable:
+    """
+    Базовый класс неизменяемых объектов
+
+    Атрибуты задаются в __init__, после чего вызывается _freeze();
+    дальнейшее присваивание или удаление атрибутов запрещено.
+    """
+
+    __slots__ = ()
+
+    def _freeze(self):
+        """Запретить изменение атрибутов"""
+        object.__setattr__(self, '_frozen', True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"{type(self).__name__} неизменяем")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} неизменяем")
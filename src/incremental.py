@@ -0,0 +1,188 @@
+"""
+Инкрементальное перешифрование после правок текста
+
+В моноалфавитном режиме правка меняет только отредактированные символы.
+В полиалфавитном режиме правка в позиции p меняет шифротекст лишь начиная
+с p, поэтому достаточно взять таблицу из ближайшей контрольной точки и
+пересчитать хвост. Если длина текста не изменилась, пересчёт прекращается,
+как только таблица снова совпадёт с прежней контрольной точкой: дальше
+шифротекст прежний. В режиме S-блоков пересчитываются только блоки,
+затронутые правкой (или все блоки после неё, если длина изменилась).
+
+Позиции правок отсчитываются в тексте, приведённом к верхнему регистру
+(для символов телеграфного алфавита он совпадает с исходным).
+"""
+
+from sblocks import SBlock
+from tritemius import TritemiusCipher, TextCipher, get_poly_cipher
+
+
+class IncrementalCipher:
+    """Шифрование текста с поддержкой правок"""
+
+    MODES = ('simple', 'poly', 'sblocks')
+
+    def __init__(self, key: str, mode: str = 'poly', shift: int = 8, decrypt: bool = False,
+                 checkpoint_every: int = 1024):
+        """
+        Args:
+            key: ключевое слово
+            mode: 'simple' (моноалфавитный), 'poly' (полиалфавитный) или
+                'sblocks' (S-блоки; ключ из 16 символов, результат - только
+                для полных блоков по 4 символа)
+            shift: сдвиг шифра Тритемиуса
+            decrypt: расшифровывать вместо шифрования
+            checkpoint_every: шаг контрольных точек таблицы (режим poly)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"неизвестный режим: {mode}")
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every должен быть положительным")
+        if mode == 'sblocks' and len(key) != 16:
+            raise ValueError("ключ должен содержать ровно 16 символов")
+
+        self.key = key
+        self.mode = mode
+        self.shift = -shift if decrypt else shift
+        self.decrypt = decrypt
+        self.checkpoint_every = checkpoint_every
+
+        self.text_cipher = TextCipher(TritemiusCipher(shift=shift))
+        self.poly_cipher = get_poly_cipher(shift)
+        self.sblock = SBlock()
+
+        self.plaintext = ''
+        self.ciphertext = ''
+        # checkpoints[m] - таблица перед позицией m * checkpoint_every
+        self.checkpoints = []
+
+    def set_text(self, text: str) -> str:
+        """
+        Полное шифрование текста
+
+        Args:
+            text: исходный текст
+
+        Returns:
+            Результат
+        """
+        self.plaintext = text.upper()
+        if not self.key:
+            self.ciphertext = self.plaintext
+            self.checkpoints = []
+        elif self.mode == 'simple':
+            self.ciphertext = self._simple(self.plaintext)
+        elif self.mode == 'sblocks':
+            self.ciphertext = self._blocks(0, self._full_length())
+        else:
+            self.ciphertext = self._poly_suffix(0, None, None)
+        return self.ciphertext
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> str:
+        """
+        Применение правки и пересчёт только затронутой части
+
+        Args:
+            offset: позиция правки
+            deleted: число удалённых символов
+            inserted: вставленный текст
+
+        Returns:
+            Новый результат
+        """
+        if not 0 <= offset <= len(self.plaintext) or deleted < 0 \
+                or offset + deleted > len(self.plaintext):
+            raise ValueError("правка выходит за границы текста")
+
+        inserted = inserted.upper()
+        old_length = len(self.plaintext)
+        self.plaintext = self.plaintext[:offset] + inserted + self.plaintext[offset + deleted:]
+
+        if not self.key:
+            self.ciphertext = self.plaintext
+        elif self.mode == 'simple':
+            self.ciphertext = (self.ciphertext[:offset] + self._simple(inserted)
+                               + self.ciphertext[offset + deleted:])
+        elif self.mode == 'sblocks':
+            start = offset - offset % 4
+            full = self._full_length()
+            if len(self.plaintext) == old_length:
+                # Пересчитываем только блоки, пересекающиеся с правкой
+                end = min(full, -(-(offset + len(inserted)) // 4) * 4)
+                self.ciphertext = (self.ciphertext[:start] + self._blocks(start, end)
+                                   + self.ciphertext[end:])
+            else:
+                self.ciphertext = self.ciphertext[:start] + self._blocks(start, full)
+        else:
+            same_length = len(self.plaintext) == old_length
+            self.ciphertext = self._poly_suffix(offset, offset + len(inserted)
+                                                if same_length else None,
+                                                self.ciphertext)
+        return self.ciphertext
+
+    def _simple(self, text: str) -> str:
+        if self.decrypt:
+            return self.text_cipher.decrypt_text(text, self.key)
+        return self.text_cipher.encrypt_text(text, self.key)
+
+    def _full_length(self) -> int:
+        """Длина части текста из полных блоков по 4 символа"""
+        return len(self.plaintext) - len(self.plaintext) % 4
+
+    def _blocks(self, start: int, end: int) -> str:
+        """Обработка S-блоками символов [start, end) (границы кратны 4)"""
+        transform = self.sblock.decrypt_s_block if self.decrypt else self.sblock.encrypt_s_block
+        text = self.plaintext
+        return ''.join(transform(text[i:i + 4], self.key) for i in range(start, end, 4))
+
+    def _poly_suffix(self, offset: int, edit_end, old_ciphertext) -> str:
+        """
+        Пересчёт полиалфавитного результата с позиции offset
+
+        Args:
+            offset: первая изменённая позиция
+            edit_end: конец правки, если длина текста не изменилась (иначе None)
+            old_ciphertext: прежний результат (None - пересчёт с нуля)
+        """
+        step = self.checkpoint_every
+        text = self.plaintext
+        old_checkpoints = self.checkpoints
+
+        if old_ciphertext is None or not old_checkpoints:
+            initial = self.poly_cipher.process_from('', self.key, self.shift)[1]
+            old_checkpoints = [initial]
+
+        # Таблица в позиции offset: от ближайшей контрольной точки до offset
+        m = min(offset // step, len(old_checkpoints) - 1)
+        checkpoints = old_checkpoints[:m + 1]
+        _, table = self.poly_cipher.process_from(text[m * step:offset], self.key, self.shift,
+                                                 old_checkpoints[m], m * step)
+        if offset % step == 0 and offset // step == len(checkpoints) and offset < len(text):
+            checkpoints.append(table)
+
+        parts = [old_ciphertext[:offset] if old_ciphertext is not None else '']
+        position = offset
+        boundary = (offset // step + 1) * step
+
+        while position < len(text):
+            end = min(boundary, len(text))
+            result, table = self.poly_cipher.process_from(text[position:end], self.key,
+                                                          self.shift, table, position)
+            parts.append(result)
+            position = end
+            if position == len(text):
+                break
+
+            index = position // step
+            # Таблица совпала с прежней после конца правки - хвост не изменился
+            if edit_end is not None and position >= edit_end \
+                    and index < len(old_checkpoints) and old_checkpoints[index] == table:
+                parts.append(old_ciphertext[position:])
+                checkpoints.extend(old_checkpoints[index:])
+                break
+
+            checkpoints.append(table)
+            boundary += step
+
+        self.checkpoints = checkpoints
+        return ''.join(parts)
@@ -0,0 +1,296 @@
+"""
+Пакетное шифрование каталогов
+
+Обходит дерево каталогов и распределяет файлы по пулу процессов, начиная
+с самых больших. Каждый процесс держит свою EnhancedCryptoSystem, поэтому
+кэши ключей (расписания, алфавиты, таблицы S-блоков) прогреваются один раз
+и используются для всех его файлов. Завершённые файлы записываются
+в манифест (размер, время изменения, параметры запуска, контрольные суммы),
+так что прерванный запуск продолжается без повторной работы. Ошибка в одном
+файле записывается в манифест и не останавливает остальные.
+
+Запуск из командной строки:
+    python jobs.py ИСХОДНЫЙ_КАТАЛОГ КАТАЛОГ_РЕЗУЛЬТАТА --key КЛЮЧ --mode poly
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sblocks import EnhancedCryptoSystem
+from streams import key_digest
+
+# Имя файла манифеста в каталоге результата
+MANIFEST = '.manifest.jsonl'
+
+# Режим -> (метод шифрования, метод расшифровки) EnhancedCryptoSystem
+MODES = {
+    'simple': ('encrypt_simple', 'decrypt_simple'),
+    'poly': ('encrypt_polyalphabetic', 'decrypt_polyalphabetic'),
+    'sblocks': ('encrypt_s_blocks', 'decrypt_s_blocks'),
+    'ctr': ('encrypt_ctr', 'decrypt_ctr'),
+    'enhanced': ('encrypt_enhanced_sblocks', 'decrypt_enhanced_sblocks'),
+}
+
+# Криптосистема процесса пула (создаётся в _init_worker)
+_system = None
+
+
+def _init_worker(shift: int):
+    """Инициализация процесса пула"""
+    global _system
+    _system = EnhancedCryptoSystem(shift=shift)
+
+
+def _process_file(source: str, target: str, key: str, mode: str, decrypt: bool,
+                  encoding: str) -> dict:
+    """Обработка одного файла в процессе пула"""
+    started = time.perf_counter()
+
+    with open(source, 'rb') as f:
+        raw = f.read()
+    text = raw.decode(encoding)
+
+    # Методы S-блоков сообщают об ошибке строкой вместо результата,
+    # поэтому параметры проверяются заранее
+    if mode in ('sblocks', 'ctr') and len(key) != 16:
+        raise ValueError("ключ должен содержать ровно 16 символов")
+    if mode == 'sblocks' and len(text) % 4 != 0:
+        raise ValueError("текст должен быть кратен 4 символам")
+
+    method = getattr(_system, MODES[mode][1 if decrypt else 0])
+    result = method(text, key).encode(encoding)
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(result)
+
+    return {
+        'chars': len(text),
+        'size': len(raw),
+        'sha256': hashlib.sha256(raw).hexdigest(),
+        'output_size': len(result),
+        'output_sha256': hashlib.sha256(result).hexdigest(),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+class JobRunner:
+    """Пакетная обработка дерева каталогов"""
+
+    def __init__(self, source: str, target: str, key: str, mode: str = 'poly',
+                 shift: int = 8, decrypt: bool = False, workers: int = None,
+                 encoding: str = 'utf-8', manifest: str = None, metrics=None):
+        """
+        Args:
+            source: исходный каталог
+            target: каталог результата (структура повторяет исходную)
+            key: ключ шифрования
+            mode: режим из MODES
+            shift: сдвиг шифра Тритемиуса
+            decrypt: расшифровывать вместо шифрования
+            workers: число процессов (по умолчанию по числу ядер)
+            encoding: кодировка файлов
+            manifest: путь к манифесту (по умолчанию target/.manifest.jsonl)
+            metrics: регистр MetricsRegistry; каждый файл учитывается одним
+                вызовом по времени, измеренному в процессе пула
+        """
+        if mode not in MODES:
+            raise ValueError(f"неизвестный режим: {mode}")
+
+        self.source = os.path.abspath(source)
+        self.target = os.path.abspath(target)
+        self.key = key
+        self.mode = mode
+        self.shift = shift
+        self.decrypt = decrypt
+        self.workers = workers
+        self.encoding = encoding
+        self.manifest = manifest or os.path.join(self.target, MANIFEST)
+        self.metrics = metrics
+
+    def files(self) -> list:
+        """
+        Файлы для обработки, от больших к меньшим
+
+        Returns:
+            Список (относительный путь, размер, время изменения в нс)
+        """
+        result = []
+        for root, dirs, names in os.walk(self.source):
+            dirs.sort()
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                # Манифесты (свой и оставшиеся от прошлых запусков) не обрабатываются
+                if name == MANIFEST or os.path.abspath(path) == os.path.abspath(self.manifest):
+                    continue
+                stat = os.stat(path)
+                result.append((os.path.relpath(path, self.source), stat.st_size, stat.st_mtime_ns))
+
+        result.sort(key=lambda item: item[1], reverse=True)
+        return result
+
+    def load_manifest(self) -> dict:
+        """Записи манифеста по относительному пути"""
+        done = {}
+        if not os.path.exists(self.manifest):
+            return done
+
+        with open(self.manifest, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Оборванная последняя строка после прерывания
+                    continue
+                done[entry['path']] = entry
+        return done
+
+    def settings(self) -> dict:
+        """Параметры запуска, с которыми сверяются записи манифеста (ключ - отпечатком)"""
+        return {
+            'mode': self.mode,
+            'decrypt': self.decrypt,
+            'shift': self.shift,
+            'encoding': self.encoding,
+            'key_digest': key_digest(self.key).hex(),
+        }
+
+    def _is_done(self, entry, size: int, mtime: int, path: str) -> bool:
+        """Файл уже обработан с теми же параметрами и результат на месте"""
+        if entry is None or 'error' in entry:
+            return False
+        if entry['size'] != size or entry['mtime_ns'] != mtime:
+            return False
+        if any(entry.get(name) != value for name, value in self.settings().items()):
+            return False
+        target = os.path.join(self.target, path)
+        return os.path.exists(target) and os.path.getsize(target) == entry['output_size']
+
+    def run(self, progress=None) -> dict:
+        """
+        Обработка всех файлов
+
+        Args:
+            progress: функция progress(path, entry), вызываемая после каждого файла
+
+        Returns:
+            Отчёт: число файлов, объём, время, пропускная способность и задержки
+        """
+        started = time.perf_counter()
+        done = self.load_manifest()
+        files = self.files()
+        pending = [
+            (path, size, mtime) for path, size, mtime in files
+            if not self._is_done(done.get(path), size, mtime, path)
+        ]
+
+        os.makedirs(os.path.dirname(self.manifest) or '.', exist_ok=True)
+        settings = self.settings()
+        op = 'decrypt' if self.decrypt else 'encrypt'
+        latencies = []
+        total_bytes = 0
+        failed = 0
+
+        with open(self.manifest, 'a', encoding='utf-8') as manifest, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                    initargs=(self.shift,)) as pool:
+            futures = {
+                pool.submit(_process_file,
+                            os.path.join(self.source, path),
+                            os.path.join(self.target, path),
+                            self.key, self.mode, self.decrypt, self.encoding): (path, size, mtime)
+                for path, size, mtime in pending
+            }
+
+            for future in as_completed(futures):
+                path, size, mtime = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as error:
+                    # Ошибка одного файла записывается в манифест, остальные
+                    # продолжают обрабатываться; при следующем запуске файл повторяется
+                    entry = {'size': size, 'error': f"{type(error).__name__}: {error}"}
+                    failed += 1
+                    if self.metrics is not None:
+                        self.metrics.record(self.mode, op, 0, 0.0, error=True)
+                else:
+                    latencies.append(entry['seconds'])
+                    total_bytes += entry['size']
+                    if self.metrics is not None:
+                        self.metrics.record(self.mode, op, entry['chars'], entry['seconds'])
+                entry = dict(entry, path=path, mtime_ns=mtime, **settings)
+                manifest.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                manifest.flush()
+
+                if progress is not None:
+                    progress(path, entry)
+
+        elapsed = time.perf_counter() - started
+        return _report(len(pending) - failed, len(files) - len(pending), failed, total_bytes,
+                       elapsed, latencies)
+
+
+def _report(processed: int, skipped: int, failed: int, total_bytes: int, elapsed: float,
+            latencies: list) -> dict:
+    """Сводный отчёт о запуске"""
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        'processed': processed,
+        'skipped': skipped,
+        'failed': failed,
+        'bytes': total_bytes,
+        'seconds': elapsed,
+        'bytes_per_second': total_bytes / elapsed if elapsed > 0 else 0.0,
+        'latency_min': latencies[0] if latencies else 0.0,
+        'latency_median': percentile(0.5),
+        'latency_p95': percentile(0.95),
+        'latency_max': latencies[-1] if latencies else 0.0,
+    }
+
+
+def _print_progress(path: str, entry: dict):
+    if 'error' in entry:
+        print(f"  ошибка  {path}: {entry['error']}")
+    else:
+        print(f"{entry['seconds']:8.3f} с  {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетное шифрование каталогов")
+    parser.add_argument('source', help="исходный каталог")
+    parser.add_argument('target', help="каталог результата")
+    parser.add_argument('--key', required=True, help="ключ шифрования")
+    parser.add_argument('--mode', default='poly', choices=sorted(MODES))
+    parser.add_argument('--shift', type=int, default=8)
+    parser.add_argument('--decrypt', action='store_true')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--encoding', default='utf-8')
+    args = parser.parse_args()
+
+    runner = JobRunner(args.source, args.target, args.key, mode=args.mode, shift=args.shift,
+                       decrypt=args.decrypt, workers=args.workers, encoding=args.encoding)
+    report = runner.run(progress=_print_progress)
+
+    print(f"\nОбработано файлов: {report['processed']}, пропущено: {report['skipped']}, "
+          f"с ошибкой: {report['failed']}")
+    print(f"Объём: {report['bytes']} байт за {report['seconds']:.2f} с "
+          f"({report['bytes_per_second'] / 1e6:.2f} МБ/с)")
+    print(f"Задержка на файл: медиана {report['latency_median']:.3f} с, "
+          f"95% {report['latency_p95']:.3f} с, максимум {report['latency_max']:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Метрики работы шифров
+
+MetricsRegistry собирает по каждому режиму и операции число вызовов,
+обработанных символов, ошибок и гистограмму длительности, а также
+хранит кольцевой буфер медленных вызовов (режим, операция, длина
+входа, время). Статистика кэшей ключей (расписания, алфавиты, таблицы
+S-блоков) берётся из lru_cache модулей, зарегистрированных через
+register_cache: промахи кэша - это перестроения таблиц.
+
+    metrics = MetricsRegistry(slow_threshold=0.05)
+    system = EnhancedCryptoSystem(metrics=metrics)
+    ...
+    metrics.write('metrics.prom', fmt='prometheus')
+    metrics.serve(port=9100)  # GET /metrics, /metrics.json
+
+Вызовы методов EnhancedCryptoSystem учитываются декоратором measured.
+Остальные пути (потоки open_stream и stream_file, AsyncCryptoSystem,
+FilePipeline, JobRunner, AdaptiveCryptoSystem) учитывают обработку
+целого сообщения или файла в регистре, переданном им или их системе.
+
+Регистр потокобезопасен. При передаче в другой процесс (pickle)
+копия начинается с пустых счётчиков.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Границы корзин гистограммы длительности (секунды)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Кэши ключей: имя -> функция с lru_cache
+_caches = {}
+
+
+def register_cache(name: str, cached_function):
+    """Учитывать статистику lru_cache функции под именем name"""
+    _caches[name] = cached_function
+    return cached_function
+
+
+def cache_stats() -> dict:
+    """
+    Статистика зарегистрированных кэшей
+
+    Returns:
+        {имя: {'hits', 'misses', 'size', 'maxsize', 'hit_ratio'}}
+    """
+    stats = {}
+    for name, function in sorted(_caches.items()):
+        info = function.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_ratio': info.hits / lookups if lookups else None,
+        }
+    return stats
+
+
+class _Series:
+    """Счётчики и гистограмма одной пары (режим, операция)"""
+
+    __slots__ = ('calls', 'errors', 'chars', 'seconds', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.chars = 0
+        self.seconds = 0.0
+        # Последняя корзина - больше всех границ
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class MetricsRegistry:
+    """Потокобезопасный регистр метрик шифрования"""
+
+    def __init__(self, slow_threshold: float = 0.1, slow_capacity: int = 100):
+        """
+        Args:
+            slow_threshold: вызовы не короче этого (секунды) попадают в журнал медленных
+            slow_capacity: размер кольцевого буфера медленных вызовов
+        """
+        self.slow_threshold = slow_threshold
+        self.slow_capacity = slow_capacity
+        self._lock = threading.Lock()
+        self._series = {}
+        self._slow = deque(maxlen=slow_capacity)
+
+    def __getstate__(self):
+        return {'slow_threshold': self.slow_threshold, 'slow_capacity': self.slow_capacity}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def record(self, mode: str, op: str, chars: int, seconds: float, error: bool = False):
+        """
+        Учёт одного вызова
+
+        Args:
+            mode: режим ('simple', 'poly', 'sblocks', 'ctr', 'enhanced', ...)
+            op: операция ('encrypt' или 'decrypt')
+            chars: длина входного текста
+            seconds: длительность
+            error: вызов завершился исключением
+        """
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            series = self._series.get((mode, op))
+            if series is None:
+                series = self._series[(mode, op)] = _Series()
+            series.calls += 1
+            series.errors += error
+            series.chars += chars
+            series.seconds += seconds
+            series.buckets[bucket] += 1
+            if seconds >= self.slow_threshold:
+                self._slow.append({
+                    'time': time.time(),
+                    'mode': mode,
+                    'op': op,
+                    'chars': chars,
+                    'seconds': seconds,
+                    'error': error,
+                })
+
+    @contextmanager
+    def measure(self, mode: str, op: str, chars: int):
+        """
+        Учёт блока кода как одного вызова
+
+            with metrics.measure('poly', 'encrypt', len(text)):
+                ...
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(mode, op, chars, time.perf_counter() - started, error=True)
+            raise
+        self.record(mode, op, chars, time.perf_counter() - started)
+
+    def reset(self):
+        """Обнулить счётчики и журнал медленных вызовов"""
+        with self._lock:
+            self._series.clear()
+            self._slow.clear()
+
+    def slow_calls(self) -> list:
+        """Медленные вызовы, от старых к новым"""
+        with self._lock:
+            return list(self._slow)
+
+    def to_dict(self) -> dict:
+        """Снимок всех метрик"""
+        with self._lock:
+            operations = []
+            for (mode, op), series in sorted(self._series.items()):
+                operations.append({
+                    'mode': mode,
+                    'op': op,
+                    'calls': series.calls,
+                    'errors': series.errors,
+                    'chars': series.chars,
+                    'seconds': series.seconds,
+                    'chars_per_second': series.chars / series.seconds if series.seconds else None,
+                    'latency_buckets': dict(zip([*map(str, LATENCY_BUCKETS), '+Inf'],
+                                                series.buckets)),
+                })
+            slow = list(self._slow)
+        return {'operations': operations, 'caches': cache_stats(), 'slow_calls': slow}
+
+    def to_json(self) -> str:
+        """Метрики в формате JSON"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        snapshot = self.to_dict()
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        operations = snapshot['operations']
+        for name, field, text in (
+                ('cipher_calls_total', 'calls', 'Number of calls'),
+                ('cipher_errors_total', 'errors', 'Number of failed calls'),
+                ('cipher_chars_total', 'chars', 'Input characters processed'),
+        ):
+            header(name, 'counter', text)
+            for row in operations:
+                lines.append(f'{name}{{mode="{row["mode"]}",op="{row["op"]}"}} {row[field]}')
+
+        header('cipher_seconds', 'histogram', 'Call latency in seconds')
+        for row in operations:
+            labels = f'mode="{row["mode"]}",op="{row["op"]}"'
+            total = 0
+            for bound, count in row['latency_buckets'].items():
+                total += count
+                lines.append(f'cipher_seconds_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f'cipher_seconds_sum{{{labels}}} {row["seconds"]}')
+            lines.append(f'cipher_seconds_count{{{labels}}} {row["calls"]}')
+
+        caches = snapshot['caches']
+        for name, field, kind, text in (
+                ('cipher_cache_hits_total', 'hits', 'counter', 'Key cache hits'),
+                ('cipher_cache_misses_total', 'misses', 'counter',
+                 'Key cache misses (table builds)'),
+                ('cipher_cache_size', 'size', 'gauge', 'Entries in key cache'),
+        ):
+            header(name, kind, text)
+            for cache, stats in caches.items():
+                lines.append(f'{name}{{cache="{cache}"}} {stats[field]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, fmt: str = 'json'):
+        """
+        Запись метрик в файл (через временный файл, атомарно)
+
+        Args:
+            path: путь к файлу
+            fmt: 'json' или 'prometheus'
+        """
+        if fmt == 'json':
+            data = self.to_json()
+        elif fmt == 'prometheus':
+            data = self.to_prometheus()
+        else:
+            raise ValueError(f"неизвестный формат: {fmt}")
+
+        temp = f"{path}.tmp"
+        with open(temp, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(temp, path)
+
+    def serve(self, host: str = '127.0.0.1', port: int = 9100) -> ThreadingHTTPServer:
+        """
+        HTTP-точка для сбора метрик в фоновом потоке
+
+        GET /metrics - формат Prometheus, GET /metrics.json - JSON.
+
+        Returns:
+            Сервер (остановка - server.shutdown())
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = registry.to_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    body = registry.to_json().encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def measured(mode: str):
+    """
+    Декоратор метода шифрования: учёт вызова в self.metrics
+
+    Первый аргумент метода - текст; операция определяется по имени
+    метода (decrypt_* - 'decrypt', иначе 'encrypt'). Если self.metrics
+    равен None, метод вызывается без замеров.
+    """
+    def decorate(method):
+        op = 'decrypt' if method.__name__.startswith('decrypt') else 'encrypt'
+
+        @wraps(method)
+        def wrapper(self, text, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return method(self, text, *args, **kwargs)
+            with metrics.measure(mode, op, len(text)):
+                return method(self, text, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def call_unmeasured(obj, name: str, *args, **kwargs):
+    """
+    Вызов метода obj.name в обход замера measured
+
+    Для вызовов, которые учитывает сам вызывающий (например, целиком
+    вместе с разбиением на куски), чтобы вызов не попал в метрики дважды.
+    Функция уровня модуля, поэтому её можно передать в пул процессов.
+    """
+    method = getattr(type(obj), name)
+    method = getattr(method, '__wrapped__', method)
+    return method(obj, *args, **kwargs)
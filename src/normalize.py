@@ -0,0 +1,202 @@
+"""
+Нормализация исходного текста перед шифрованием
+
+Шифры приводят текст к верхнему регистру и пропускают все символы вне
+телеграфного алфавита без изменений. Нормализатор заранее заменяет
+Ё -> Е, Ъ -> Ь, пробел -> '_', латинские буквы, похожие на русские,
+на русские и переводит буквы в верхний регистр - всё за один проход
+str.translate по скомпилированной таблице. Остальные символы остаются
+на месте или удаляются; их позиции можно получить отдельным индексом,
+чтобы дальше обрабатывать только символы алфавита.
+
+    normalizer = Normalizer(other='drop')
+    clean, runs = normalizer.split("Ёлка и ёж")
+    # clean = 'ЕЛКА_И_ЕЖ', runs = []
+
+Нормализатор подключается к шифрованию параметром normalizer у
+tritemius.TextCipher и streams.open_stream / stream_file:
+
+    stream = open_stream('poly', key, normalizer=get_normalizer())
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from alphabet import TelegraphAlphabet
+from metrics import register_cache
+
+_ALPHABET = TelegraphAlphabet()
+_SYMBOLS = ''.join(_ALPHABET.symbols)
+
+# Замены по умолчанию
+DEFAULT_REPLACEMENTS = {
+    'Ё': 'Е',
+    'Ъ': 'Ь',
+    ' ': '_',
+}
+
+# Латинские буквы, совпадающие по начертанию с русскими
+LATIN_LOOKALIKES = {
+    'A': 'А', 'B': 'В', 'C': 'С', 'E': 'Е', 'H': 'Н', 'K': 'К',
+    'M': 'М', 'O': 'О', 'P': 'Р', 'T': 'Т', 'X': 'Х', 'Y': 'У',
+}
+
+# Символ алфавита -> chr(код)
+_TO_CODE = {ord(char): code for code, char in enumerate(_SYMBOLS)}
+
+# Участки из символов вне алфавита
+_OTHER = re.compile('[^' + re.escape(_SYMBOLS) + ']+')
+
+# Нормализованный текст и участки вне алфавита (позиция, текст участка)
+Normalized = namedtuple('Normalized', 'text runs')
+
+
+@lru_cache(maxsize=4096)
+def _fold(code: int) -> int:
+    """Код символа в верхнем регистре (если он одиночный, иначе сам код)"""
+    upper = chr(code).upper()
+    return ord(upper) if len(upper) == 1 else code
+
+
+register_cache('normalize_fold', _fold)
+
+
+class _Translation(dict):
+    """
+    Таблица str.translate для прочих символов
+
+    Явные замены и символы алфавита занесены заранее; прочие символы
+    сводятся к верхнему регистру через общий ограниченный кэш _fold и
+    в таблицу не добавляются, так что она не растёт с разнообразием текста.
+    """
+
+    __slots__ = ('drop',)
+
+    def __init__(self, table: dict, drop: bool):
+        super().__init__(table)
+        self.drop = drop
+
+    def __missing__(self, code: int):
+        upper = _fold(code)
+        if upper != code and upper in self:
+            return self[upper]
+        return None if self.drop else upper
+
+
+class Normalizer:
+    """Настраиваемая нормализация текста за один проход"""
+
+    def __init__(self, replacements: dict = None, latin: bool = True, other: str = 'keep'):
+        """
+        Args:
+            replacements: замены символ -> символ алфавита
+                (по умолчанию DEFAULT_REPLACEMENTS)
+            latin: заменять латинские буквы, похожие на русские
+            other: что делать с остальными символами: 'keep' - оставить
+                (в верхнем регистре), 'drop' - удалить
+        """
+        if other not in ('keep', 'drop'):
+            raise ValueError(f"неизвестный режим для прочих символов: {other}")
+
+        mapping = {char: char for char in _SYMBOLS}
+        if latin:
+            mapping.update(LATIN_LOOKALIKES)
+        mapping.update(DEFAULT_REPLACEMENTS if replacements is None else replacements)
+
+        table = {}
+        for source, target in mapping.items():
+            if len(source) != 1:
+                raise ValueError(f"заменяемый символ должен быть одиночным: {source!r}")
+            if target not in _ALPHABET.char_to_val:
+                raise ValueError(f"замена {source!r} -> {target!r} не является символом алфавита")
+            # Замена действует в обоих регистрах, если другой регистр не задан явно
+            for variant in (source.lower(), source.upper()):
+                if len(variant) == 1:
+                    table.setdefault(ord(variant), target)
+        table.update({ord(source): target for source, target in mapping.items()})
+
+        self.replacements = mapping
+        self.other = other
+        self._keep = _Translation(table, drop=False)
+        self._drop = _Translation(table, drop=True)
+
+    def normalize(self, text: str) -> str:
+        """
+        Нормализация текста
+
+        Args:
+            text: исходный текст
+
+        Returns:
+            Текст из символов алфавита (и прочих символов в режиме 'keep')
+        """
+        return text.translate(self._drop if self.other == 'drop' else self._keep)
+
+    def split(self, text: str) -> Normalized:
+        """
+        Нормализация с индексом символов вне алфавита
+
+        Args:
+            text: исходный текст
+
+        Returns:
+            Normalized(text, runs): в режиме 'keep' text содержит участки
+            на месте, в режиме 'drop' - только символы алфавита;
+            runs - список (позиция в нормализованном тексте с участками,
+            текст участка)
+        """
+        kept = text.translate(self._keep)
+        runs = [(match.start(), match.group()) for match in _OTHER.finditer(kept)]
+        if self.other == 'drop' and runs:
+            return Normalized(_OTHER.sub('', kept), runs)
+        return Normalized(kept, runs)
+
+    def codes(self, text: str) -> Normalized:
+        """
+        Коды символов алфавита (0-31) и индекс участков вне алфавита
+
+        Returns:
+            Normalized(коды в bytes, участки)
+        """
+        clean, runs = self.split(text)
+        if self.other == 'keep' and runs:
+            clean = _OTHER.sub('', clean)
+        return Normalized(clean.translate(_TO_CODE).encode('latin-1'), runs)
+
+
+def restore(text: str, runs) -> str:
+    """
+    Возврат участков вне алфавита на их позиции
+
+    Args:
+        text: текст только из символов алфавита (например, зашифрованный)
+        runs: индекс участков из Normalizer.split
+
+    Returns:
+        Текст с участками
+    """
+    pieces = []
+    taken = 0
+    position = 0
+    for start, run in runs:
+        pieces.append(text[taken:taken + start - position])
+        taken += start - position
+        pieces.append(run)
+        position = start + len(run)
+    pieces.append(text[taken:])
+    return ''.join(pieces)
+
+
+@lru_cache(maxsize=None)
+def get_normalizer(latin: bool = True, other: str = 'keep') -> Normalizer:
+    """Получить (кэшированный) нормализатор с заменами по умолчанию"""
+    return Normalizer(latin=latin, other=other)
+
+
+register_cache('normalizer', get_normalizer)
+
+
+def normalize(text: str, other: str = 'keep') -> str:
+    """Нормализация текста с настройками по умолчанию"""
+    return get_normalizer(other=other).normalize(text)
@@ -0,0 +1,173 @@
+"""
+Двоичный формат шифротекста с упаковкой по 5 бит на символ
+
+Символ телеграфного алфавита несёт ровно 5 бит, а в UTF-8 кириллица
+занимает 2 байта на символ. Формат хранит коды символов алфавита по 5 бит
+и отдельный индекс участков из остальных символов (пробелы, знаки и т.п.).
+
+Формат:
+    заголовок  <3sBBBIII: метка, версия, режим, сдвиг, длина текста,
+               число символов алфавита, число участков
+    участки    для каждого: <II (позиция в тексте, длина в байтах UTF-8) и сами байты
+    данные     коды символов алфавита по 5 бит, старшие биты первыми
+"""
+
+import re
+import struct
+from collections import namedtuple
+
+from alphabet import TelegraphAlphabet
+
+# Коды режимов шифрования в заголовке
+MODES = {
+    'raw': 0,
+    'simple': 1,
+    'poly': 2,
+    'sblocks': 3,
+    'enhanced': 4,
+    'ctr': 5,
+}
+_MODE_NAMES = {code: name for name, code in MODES.items()}
+
+_MAGIC = b'TR5'
+_VERSION = 1
+_HEADER = struct.Struct('<3sBBBIII')
+_RUN = struct.Struct('<II')
+
+_ALPHABET = TelegraphAlphabet()
+_SYMBOLS = ''.join(_ALPHABET.symbols)
+
+# Участки из символов вне алфавита
+_PASSTHROUGH = re.compile('[^' + re.escape(_SYMBOLS) + ']+')
+
+# Символ алфавита -> chr(код) и обратно (для перехода str <-> bytes кодов)
+_TO_CODE = {ord(char): code for code, char in enumerate(_SYMBOLS)}
+_FROM_CODE = {code: char for code, char in enumerate(_SYMBOLS)}
+
+# chr(код) -> 5 бит строкой, 10 бит строкой -> два chr(код)
+_CODE_TO_BITS = {code: format(code, '05b') for code in range(32)}
+_BITS_TO_PAIR = {format(pair, '010b'): chr(pair >> 5) + chr(pair & 31) for pair in range(1024)}
+
+PackedText = namedtuple('PackedText', 'text mode shift')
+
+
+def pack_codes(codes: bytes) -> bytes:
+    """
+    Упаковка кодов 0-31 по 5 бит
+
+    Args:
+        codes: коды символов
+
+    Returns:
+        ceil(5 * len(codes) / 8) байт
+    """
+    if not codes:
+        return b''
+
+    bits = bytes(codes).decode('latin-1').translate(_CODE_TO_BITS)
+    size = (len(bits) + 7) // 8
+    # Дополняем нулями до целого байта справа
+    return (int(bits, 2) << (size * 8 - len(bits))).to_bytes(size, 'big')
+
+
+def unpack_codes(data: bytes, count: int) -> bytes:
+    """
+    Распаковка count кодов по 5 бит
+
+    Args:
+        data: упакованные данные
+        count: число кодов
+
+    Returns:
+        Коды 0-31
+    """
+    if count == 0:
+        return b''
+
+    nbits = count * 5
+    size = (nbits + 7) // 8
+    if len(data) < size:
+        raise ValueError("недостаточно данных для распаковки")
+
+    bits = format(int.from_bytes(data[:size], 'big'), f'0{size * 8}b')[:nbits]
+    if count % 2:
+        bits += '00000'
+
+    pairs = _BITS_TO_PAIR
+    codes = ''.join([pairs[bits[i:i + 10]] for i in range(0, len(bits), 10)])
+    return codes[:count].encode('latin-1')
+
+
+def pack(text: str, mode: str = 'raw', shift: int = 0) -> bytes:
+    """
+    Упаковка текста в двоичный формат
+
+    Args:
+        text: текст (обычно шифротекст)
+        mode: режим шифрования из MODES
+        shift: сдвиг шифра (0-31)
+
+    Returns:
+        Упакованные данные
+    """
+    if mode not in MODES:
+        raise ValueError(f"неизвестный режим: {mode}")
+
+    runs = [(match.start(), match.group().encode('utf-8'))
+            for match in _PASSTHROUGH.finditer(text)]
+    symbols = _PASSTHROUGH.sub('', text) if runs else text
+    codes = symbols.translate(_TO_CODE).encode('latin-1')
+
+    parts = [_HEADER.pack(_MAGIC, _VERSION, MODES[mode], shift % 32,
+                          len(text), len(codes), len(runs))]
+    for offset, raw in runs:
+        parts.append(_RUN.pack(offset, len(raw)))
+        parts.append(raw)
+    parts.append(pack_codes(codes))
+
+    return b''.join(parts)
+
+
+def unpack(data: bytes) -> PackedText:
+    """
+    Распаковка двоичного формата
+
+    Args:
+        data: упакованные данные
+
+    Returns:
+        PackedText(text, mode, shift)
+    """
+    data = memoryview(data)
+    magic, version, mode, shift, length, count, run_count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("данные не в формате упакованного шифротекста")
+    if mode not in _MODE_NAMES:
+        raise ValueError(f"неизвестный код режима: {mode}")
+
+    offset = _HEADER.size
+    runs = []
+    for _ in range(run_count):
+        position, size = _RUN.unpack_from(data, offset)
+        offset += _RUN.size
+        runs.append((position, bytes(data[offset:offset + size]).decode('utf-8')))
+        offset += size
+
+    symbols = unpack_codes(data[offset:], count).decode('latin-1').translate(_FROM_CODE)
+
+    # Вставляем участки обратно на их позиции
+    pieces = []
+    taken = 0
+    position = 0
+    for start, run in runs:
+        pieces.append(symbols[taken:taken + start - position])
+        taken += start - position
+        pieces.append(run)
+        position = start + len(run)
+    pieces.append(symbols[taken:])
+    text = ''.join(pieces)
+
+    if len(text) != length:
+        raise ValueError("длина распакованного текста не совпадает с заголовком")
+
+    return PackedText(text, _MODE_NAMES[mode], shift)
@@ -0,0 +1,326 @@
+"""
+Каскады шифров со слиянием этапов
+
+Каскад - упорядоченный список этапов (например, простой шифр Тритемиуса,
+затем полиалфавитный, затем S-блоки). Последовательные вызовы методов
+EnhancedCryptoSystem делают по полному проходу с новой строкой на этап;
+Pipeline компилирует каскад один раз:
+
+- моноалфавитные этапы - перестановки алфавита, поэтому соседние такие
+  этапы (с любыми сдвигами, шифрование и расшифровка) сводятся в одну
+  таблицу, которая вливается в таблицу предыдущего этапа (или в
+  перекодировку текста, если каскад с них начинается);
+- остальные этапы работают над общим буфером кодов символов (bytes),
+  по одному проходу на этап.
+
+Символы вне алфавита кодируются как SKIP и возвращаются на место при
+обратной перекодировке. Результат совпадает с последовательными вызовами
+посимвольно (кроме режима S-блоков: при длине текста не кратной 4
+Pipeline выбрасывает ValueError вместо строки с ошибкой).
+
+    pipeline = Pipeline([
+        Stage('simple', 'КЛЮЧ', shift=3),
+        Stage('poly', 'ПАРОЛЬ'),
+        Stage('sblocks', 'АБВГДЕЖЗИЙКЛМНОП'),
+    ])
+    cipher_text = pipeline.run(text)
+    plain_text = pipeline.inverse().run(cipher_text)
+"""
+
+import re
+from collections import namedtuple
+from itertools import chain, cycle
+from operator import add
+
+from alphabet import get_custom_alphabet, get_standard_alphabet
+from sblocks import CounterMode, get_block_tables, get_enhanced_sblock
+from schedule import KeySchedule, get_key_schedule
+from tritemius import TritemiusCipher, TextCipher, get_poly_cipher
+
+MODES = ('simple', 'poly', 'sblocks', 'ctr', 'enhanced')
+
+# Код символа вне алфавита в буфере
+SKIP = 255
+
+# Этап каскада: shift - для simple и poly, nonce - для ctr, rounds - для enhanced
+Stage = namedtuple('Stage', 'mode key decrypt shift nonce rounds',
+                   defaults=(False, 8, 0, 4))
+
+_IDENTITY = bytes(range(256))
+
+
+class _Encoding(dict):
+    """Таблица str.translate: символ алфавита -> chr(код), остальные -> chr(SKIP)"""
+
+    __slots__ = ()
+
+    def __missing__(self, code: int):
+        self[code] = chr(SKIP)
+        return chr(SKIP)
+
+
+class Pipeline:
+    """Скомпилированный каскад этапов над одним алфавитом"""
+
+    def __init__(self, stages, alphabet=None):
+        """
+        Args:
+            stages: список этапов Stage (или кортежей с теми же полями)
+            alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        self.alphabet = alphabet or get_standard_alphabet()
+        self.stages = tuple(Stage(*stage) for stage in stages)
+
+        for stage in self.stages:
+            if stage.mode not in MODES:
+                raise ValueError(f"неизвестный режим: {stage.mode}")
+            if stage.mode in ('sblocks', 'ctr') and len(stage.key) != 16:
+                raise ValueError("ключ должен содержать ровно 16 символов")
+
+        # Этапы с пустым ключом возвращают текст без изменений
+        self._active = [stage for stage in self.stages
+                        if stage.key or stage.mode in ('sblocks', 'ctr')]
+
+        if all(self._code_safe(stage) for stage in self._active):
+            self._compile()
+        else:
+            self._steps = None
+
+    def inverse(self) -> 'Pipeline':
+        """Обратный каскад: этапы в обратном порядке, расшифровка вместо шифрования"""
+        return Pipeline([stage._replace(decrypt=not stage.decrypt)
+                         for stage in reversed(self.stages)], self.alphabet)
+
+    @property
+    def passes(self) -> int:
+        """
+        Число проходов по буферу кодов (без перекодировки текста на входе
+        и выходе); None - каскад выполняется последовательными вызовами
+        """
+        return None if self._steps is None else len(self._steps)
+
+    def _code_safe(self, stage: Stage) -> bool:
+        """
+        Можно ли выполнить этап над кодами
+
+        Таблицы полиалфавитного шифра для ключа с посторонними символами
+        содержат эти символы, и результат выходит за пределы алфавита.
+        """
+        if stage.mode in ('poly', 'sblocks', 'ctr'):
+            return KeySchedule.supports(stage.key, self.alphabet)
+        return True
+
+    def _mono_table(self, stage: Stage) -> bytes:
+        """Перестановка кодов моноалфавитного этапа (SKIP на месте)"""
+        cipher = TritemiusCipher(stage.shift)
+        custom = get_custom_alphabet(stage.key, self.alphabet)
+        transform = cipher.decrypt_char if stage.decrypt else cipher.encrypt_char
+        codes = self.alphabet.char_to_val
+        table = bytearray(_IDENTITY)
+        for code, char in enumerate(self.alphabet.symbols):
+            table[code] = codes[transform(char, custom)]
+        return bytes(table)
+
+    def _compile(self):
+        """Слияние моноалфавитных этапов и подготовка таблиц остальных"""
+        alphabet = self.alphabet
+        symbols = ''.join(alphabet.symbols)
+
+        # Группы: [моноалфавитная таблица, которой начинается каскад],
+        # затем этапы, каждый со своей таблицей на выходе
+        pre = _IDENTITY
+        steps = []
+        for stage in self._active:
+            if stage.mode == 'simple':
+                table = self._mono_table(stage)
+                if steps:
+                    steps[-1][1] = steps[-1][1].translate(table)
+                else:
+                    pre = pre.translate(table)
+            else:
+                steps.append([stage, _IDENTITY])
+
+        self._encode = _Encoding({ord(char): chr(pre[code]) for code, char in enumerate(symbols)})
+        self._decode = {code: char for code, char in enumerate(symbols)}
+        self._other = re.compile('[^' + re.escape(symbols) + ']+')
+        self._steps = [self._prepare(stage, post) for stage, post in steps]
+
+    def _prepare(self, stage: Stage, post: bytes):
+        """Функция этапа над буфером кодов и её аргументы"""
+        alphabet = self.alphabet
+        size = alphabet.size
+
+        if stage.mode == 'poly':
+            shift = -stage.shift if stage.decrypt else stage.shift
+            schedule = get_key_schedule(stage.key, alphabet)
+            rows = bytes(schedule.rows(shift)).translate(post)
+            return _poly_codes, (schedule, shift, rows, post)
+
+        if stage.mode == 'sblocks':
+            tables = get_block_tables(stage.key, alphabet)
+            if stage.decrypt:
+                tables = [bytes(table.index(c) for c in range(size)) for table in tables]
+            tables = [(bytes(table) + _IDENTITY[size:]).translate(post) for table in tables]
+            shift = -8 if stage.decrypt else 8
+            schedule = get_key_schedule(stage.key, alphabet)
+            rows = bytes(schedule.rows(shift)).translate(post)
+            return _sblock_codes, (tables, schedule, shift, rows, post)
+
+        if stage.mode == 'ctr':
+            counter = CounterMode(stage.key, stage.nonce, alphabet)
+            sign = -1 if stage.decrypt else 1
+            # Результат для пары (код, код гаммы) сразу с выходной таблицей
+            combine = [bytes(post[(c + sign * k) % size] for c in range(size)) + _IDENTITY[size:]
+                       for k in range(size)]
+            return _ctr_codes, (counter, combine)
+
+        sblock = get_enhanced_sblock(stage.key.upper(), stage.rounds, alphabet)
+        transform = sblock.decrypt_codes if stage.decrypt else sblock.encrypt_codes
+        return _enhanced_codes, (transform, post)
+
+    def run(self, text: str) -> str:
+        """
+        Применение каскада к тексту
+
+        Args:
+            text: исходный текст
+
+        Returns:
+            Результат, совпадающий с последовательными вызовами этапов
+        """
+        if not self._active:
+            return text
+        if self._steps is None:
+            return self._run_text(text)
+
+        upper = text.upper()
+        codes = upper.translate(self._encode).encode('latin-1')
+        for function, args in self._steps:
+            codes = function(codes, *args)
+        result = codes.decode('latin-1').translate(self._decode)
+
+        # Возврат символов вне алфавита на их места
+        pieces = []
+        position = 0
+        for match in self._other.finditer(upper):
+            pieces.append(result[position:match.start()])
+            pieces.append(match.group())
+            position = match.end()
+        if not pieces:
+            return result
+        pieces.append(result[position:])
+        return ''.join(pieces)
+
+    def _run_text(self, text: str) -> str:
+        """Последовательные вызовы этапов (ключи с посторонними символами)"""
+        alphabet = self.alphabet
+        for stage in self._active:
+            if stage.mode == 'simple':
+                cipher = TextCipher(TritemiusCipher(stage.shift), alphabet)
+                transform = cipher.decrypt_text if stage.decrypt else cipher.encrypt_text
+                text = transform(text, stage.key)
+            elif stage.mode == 'poly':
+                cipher = get_poly_cipher(stage.shift, alphabet)
+                transform = cipher.decrypt if stage.decrypt else cipher.encrypt
+                text = transform(text, stage.key)
+            elif stage.mode == 'sblocks':
+                text = _check_blocks(text.upper())
+                cipher = get_poly_cipher(8, alphabet)
+                transform = cipher.decrypt if stage.decrypt else cipher.encrypt
+                text = ''.join(transform(text[i:i + 4], stage.key) for i in range(0, len(text), 4))
+            elif stage.mode == 'ctr':
+                counter = CounterMode(stage.key, stage.nonce, alphabet)
+                text = counter.decrypt(text) if stage.decrypt else counter.encrypt(text)
+            else:
+                sblock = get_enhanced_sblock(stage.key.upper(), stage.rounds, alphabet)
+                text = sblock.decrypt(text) if stage.decrypt else sblock.encrypt(text)
+        return text
+
+
+def _check_blocks(data):
+    if len(data) % 4 != 0:
+        raise ValueError("текст должен быть кратен 4 символам")
+    return data
+
+
+def _poly_codes(codes: bytes, schedule, shift: int, rows: bytes, post: bytes) -> bytes:
+    """
+    Полиалфавитный шифр над кодами
+
+    rows - строки замены расписания для сдвига, уже с выходной таблицей post.
+    Пока в буфере нет SKIP, таблицы идут строго по расписанию и результат
+    снимается одним проходом; иначе таблица после пропуска ведётся вручную,
+    как в PolyTritemiusCipher.process_from.
+    """
+    size = schedule.size
+    data = schedule.data
+    end = len(data)
+    loop_base = schedule.mu * size
+
+    if SKIP not in codes:
+        bases = chain(range(0, end, size), cycle(range(loop_base, end, size)))
+        return bytes(map(rows.__getitem__, map(add, bases, codes)))
+
+    advance = schedule.alphabet.modulus.shift_table(shift)
+    out = bytearray(len(codes))
+    base = 0
+    current = None  # None - таблица совпадает с расписанием
+
+    for i, c in enumerate(codes):
+        if c == SKIP:
+            if current is None:
+                current = bytes(data[base:base + size])
+            out[i] = SKIP
+        elif current is None:
+            out[i] = rows[base + c]
+        else:
+            out[i] = post[current[advance[current.index(c)]]]
+            current = schedule.step(current, base // size)
+
+        base += size
+        if base == end:
+            base = loop_base
+
+        if current is not None and c != SKIP and current == data[base:base + size]:
+            current = None
+
+    return bytes(out)
+
+
+def _sblock_codes(codes: bytes, tables, schedule, shift: int, rows: bytes, post: bytes) -> bytes:
+    """
+    S-блоки над кодами
+
+    Блок из символов алфавита заменяется таблицами позиций; блок с
+    пропусками шифруется полиалфавитным шифром отдельно, как в SBlock.
+    """
+    _check_blocks(codes)
+    out = bytearray(codes)
+
+    if SKIP not in codes:
+        for q in range(4):
+            out[q::4] = codes[q::4].translate(tables[q])
+        return bytes(out)
+
+    for start in range(0, len(codes), 4):
+        block = codes[start:start + 4]
+        if SKIP in block:
+            out[start:start + 4] = _poly_codes(block, schedule, shift, rows, post)
+        else:
+            out[start:start + 4] = bytes(tables[q][c] for q, c in enumerate(block))
+    return bytes(out)
+
+
+def _ctr_codes(codes: bytes, counter, combine) -> bytes:
+    """Счётчиковый режим: combine[k][c] - результат для кода c и гаммы k"""
+    stream = counter.keystream(0, len(codes))
+    return bytes(combine[k][c] for c, k in zip(codes, stream))
+
+
+def _enhanced_codes(codes: bytes, transform, post: bytes) -> bytes:
+    """Усиленные S-блоки над символами алфавита (SKIP на месте)"""
+    if SKIP not in codes:
+        return transform(codes).translate(post)
+
+    result = iter(transform(codes.replace(bytes((SKIP,)), b'')).translate(post))
+    return bytes(SKIP if c == SKIP else next(result) for c in codes)
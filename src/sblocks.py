@@ -1,13 +1,21 @@
-from alphabet import TelegraphAlphabet, CustomAlphabet
-from tritemius import TritemiusCipher, TextCipher, PolyTritemiusCipher
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+from alphabet import TelegraphAlphabet, CustomAlphabet, get_standard_alphabet
+from immutable import Immutable
+from metrics import measured, register_cache
+from schedule import get_key_schedule
+from tritemius import TritemiusCipher, TextCipher, PolyTritemiusCipher, get_poly_cipher
 
-class SBlock:
-    """S-блоки для шифра Тритимуса (по псевдокоду)"""
 
-    def __init__(self):
-        self.alphabet = TelegraphAlphabet()
-        self.poly_cipher = PolyTritemiusCipher(shift=8)  # Для полиалфавитного шифра
+class SBlock(Immutable):
+    """S-блоки для шифра Тритимуса (по псевдокоду), неизменяемый объект"""
+
+    def __init__(self, alphabet: TelegraphAlphabet = None):
+        self.alphabet = alphabet or get_standard_alphabet()
+        # Для полиалфавитного шифра
+        self.poly_cipher = get_poly_cipher(8, alphabet)
+        self._freeze()
 
     def encrypt_s_block(self, block: str, key: str) -> str:
         """
@@ -49,27 +57,469 @@ class SBlock:
         # Используем полиалфавитный дешифратор
         return self.poly_cipher.decrypt(block, key)
 
+    def block_tables(self, key: str) -> tuple:
+        """
+        Таблицы замены S-блока по позициям
+
+        Таблица полиалфавитного шифра внутри блока из 4 символов алфавита
+        зависит только от позиции, поэтому S-блок сводится к четырём
+        заменам кодов 0 - size-1.
+
+        Args:
+            key: ключ из 16 символов
+
+        Returns:
+            Кортеж из 4 объектов bytes по size кодов
+        """
+        if len(key) != 16:
+            raise ValueError("ключ должен содержать ровно 16 символов")
+
+        tables = [bytearray(self.alphabet.size) for _ in range(4)]
+        for code, char in enumerate(self.alphabet.get_all_symbols()):
+            block = self.encrypt_s_block(char * 4, key)
+            for q in range(4):
+                tables[q][code] = self.alphabet.get_value(block[q])
+
+        return tuple(bytes(table) for table in tables)
+
+
+class CounterMode(Immutable):
+    """
+    Счётчиковый режим на основе S-блока
+
+    Блок гаммы с номером j получается из счётчика (nonce + j) mod size^4:
+    его 4 цифры по основанию size накапливаются суммой по модулю size
+    (так каждый символ блока меняется с каждым номером) и пропускаются
+    через S-блок. Символ текста складывается с символом гаммы по модулю size
+    (как TelegraphAlphabet.add), при расшифровке гамма вычитается.
+    Для размеров - степеней двойки цифры выделяются сдвигами и масками.
+
+    Гамма для позиции i зависит только от i, поэтому любой участок текста
+    можно обработать отдельно: параллельно и с произвольного смещения,
+    без дополнения и ограничений на длину. Символы вне алфавита остаются
+    на месте, но занимают свою позицию гаммы.
+
+    Объект неизменяем, смещение передаётся в каждый вызов, поэтому
+    один экземпляр можно использовать из нескольких потоков.
+    """
+
+    def __init__(self, key: str, nonce: int = 0, alphabet: TelegraphAlphabet = None):
+        """
+        Args:
+            key: ключ из 16 символов
+            nonce: начальное значение счётчика
+            alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        self.key = key
+        self.nonce = nonce
+        self.alphabet = alphabet or _ALPHABET
+        self.size = self.alphabet.size
+        self.mask = self.alphabet.modulus.mask
+        self.tables = get_block_tables(key, alphabet)
+        self._freeze()
+
+    def keystream(self, offset: int, length: int) -> bytes:
+        """
+        Коды гаммы для позиций [offset, offset + length)
+
+        Args:
+            offset: абсолютная позиция первого символа
+            length: число символов
+
+        Returns:
+            Коды 0 - size-1
+        """
+        if length <= 0:
+            return b''
+
+        first = offset // 4
+        last = (offset + length - 1) // 4
+        t0, t1, t2, t3 = self.tables
+        size = self.size
+        mask = self.mask
+
+        if mask is not None:
+            bits = mask.bit_length()
+            bits2, bits3 = 2 * bits, 3 * bits
+            period = (1 << 4 * bits) - 1
+            counters = [(self.nonce + j) & period for j in range(first, last + 1)]
+            s3 = [v & mask for v in counters]
+            s2 = [((v >> bits) + x) & mask for v, x in zip(counters, s3)]
+            s1 = [((v >> bits2) + x) & mask for v, x in zip(counters, s2)]
+            s0 = [((v >> bits3) + x) & mask for v, x in zip(counters, s1)]
+        else:
+            size2, size3 = size * size, size * size * size
+            period = size3 * size
+            counters = [(self.nonce + j) % period for j in range(first, last + 1)]
+            s3 = [v % size for v in counters]
+            s2 = [(v // size + x) % size for v, x in zip(counters, s3)]
+            s1 = [(v // size2 + x) % size for v, x in zip(counters, s2)]
+            s0 = [(v // size3 + x) % size for v, x in zip(counters, s1)]
+
+        stream = bytearray(len(counters) * 4)
+        stream[0::4] = bytes(t0[x] for x in s0)
+        stream[1::4] = bytes(t1[x] for x in s1)
+        stream[2::4] = bytes(t2[x] for x in s2)
+        stream[3::4] = bytes(t3[x] for x in s3)
+
+        start = offset - first * 4
+        return bytes(stream[start:start + length])
+
+    def encrypt(self, text: str, offset: int = 0) -> str:
+        """
+        Шифрование участка текста
+
+        Args:
+            text: исходный текст
+            offset: позиция text в полном тексте
+        """
+        return self._process(text.upper(), offset, 1)
+
+    def decrypt(self, text: str, offset: int = 0) -> str:
+        """
+        Расшифровка участка текста
+
+        Args:
+            text: зашифрованный текст
+            offset: позиция text в полном тексте
+        """
+        return self._process(text.upper(), offset, -1)
+
+    def _process(self, text: str, offset: int, sign: int) -> str:
+        codes = self.alphabet.char_to_val
+        symbols = self.alphabet.symbols
+        stream = self.keystream(offset, len(text))
+
+        result = []
+        if self.mask is not None:
+            mask = self.mask
+            for char, k in zip(text, stream):
+                c = codes.get(char)
+                result.append(char if c is None else symbols[(c + sign * k) & mask])
+        else:
+            size = self.size
+            for char, k in zip(text, stream):
+                c = codes.get(char)
+                result.append(char if c is None else symbols[(c + sign * k) % size])
+
+        return ''.join(result)
+
+    def encrypt_parallel(self, text: str, workers: int = None, chunk_size: int = 65536) -> str:
+        """Шифрование блоков текста в пуле процессов"""
+        return self._process_parallel(text.upper(), 1, workers, chunk_size)
+
+    def decrypt_parallel(self, text: str, workers: int = None, chunk_size: int = 65536) -> str:
+        """Расшифровка блоков текста в пуле процессов"""
+        return self._process_parallel(text.upper(), -1, workers, chunk_size)
+
+    def _process_parallel(self, text, sign, workers, chunk_size):
+        if len(text) <= chunk_size:
+            return self._process(text, 0, sign)
+
+        symbols = _symbols_of(self.alphabet)
+        jobs = [
+            (self.key, self.nonce, text[start:start + chunk_size], start, sign, symbols)
+            for start in range(0, len(text), chunk_size)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return ''.join(pool.map(_counter_chunk, jobs))
+
+
+def _counter_chunk(job) -> str:
+    """Обработка одного участка в процессе пула"""
+    key, nonce, chunk, offset, sign, symbols = job
+    return CounterMode(key, nonce, _alphabet_of(symbols))._process(chunk, offset, sign)
+
+
+def _symbols_of(alphabet) -> str:
+    """Строка символов алфавита для ключа кэша (None - телеграфный)"""
+    if alphabet is None or alphabet.symbols == _ALPHABET.symbols:
+        return None
+    return ''.join(alphabet.symbols)
+
+
+def _alphabet_of(symbols: str):
+    """Базовый алфавит по строке символов (None - телеграфный)"""
+    return None if symbols is None else get_standard_alphabet(symbols)
+
+
+@lru_cache(maxsize=256)
+def _cached_block_tables(key: str, symbols: str) -> tuple:
+    return SBlock(_alphabet_of(symbols)).block_tables(key)
+
+
+register_cache('block_tables', _cached_block_tables)
+
+
+def get_block_tables(key: str, alphabet: TelegraphAlphabet = None) -> tuple:
+    """Получить (кэшированные) таблицы S-блока для ключа"""
+    return _cached_block_tables(key, _symbols_of(alphabet))
+
+
+class EnhancedSBlock(Immutable):
+    """
+    Усиленный S-блок: несколько раундов подстановки и перестановки
+
+    Блок из 4 символов упаковывается в число по bits бит на символ
+    (для 32 символов - 20-битное число по 5 бит). Раунд заменяет каждую
+    пару символов (a, b) по ключевым таблицам a' = A[(a + k0) % size],
+    b' = B[(b + a' + k1) % size] и циклически сдвигает блок на один
+    символ, так что пары следующего раунда перемешиваются.
+    Таблицы A и B берутся из расписания полиалфавитного шифра для ключа.
+
+    Для скорости каждый раунд заранее сводится к двум таблицам по 2^(2*bits)
+    значения (старшая и младшая пары, сдвиг уже учтён), и блоки
+    обрабатываются пакетом: один раунд - одно списковое выражение.
+    Хвост короче 4 символов шифруется посимвольными таблицами.
+
+    Таблицы раундов хранятся в кортежах и после построения не меняются,
+    поэтому общий экземпляр из get_enhanced_sblock безопасен для потоков.
+    """
+
+    def __init__(self, key: str, rounds: int = 4, alphabet: TelegraphAlphabet = None):
+        """
+        Построение таблиц раундов
+
+        Args:
+            key: ключевое слово (учитываются только символы алфавита)
+            rounds: число раундов
+            alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        alphabet = alphabet or _ALPHABET
+        key = ''.join(char for char in key.upper() if alphabet.is_valid_char(char))
+        if not key:
+            raise ValueError("ключ должен содержать символы алфавита")
+        if rounds < 1:
+            raise ValueError("число раундов должно быть положительным")
+
+        self.key = key
+        self.rounds = rounds
+        self.alphabet = alphabet
+        self.size = size = alphabet.size
+        # Бит на символ в упакованном блоке
+        self.bits = bits = (size - 1).bit_length()
+        self._code_to_symbol = dict(enumerate(alphabet.symbols))
+
+        schedule = get_key_schedule(key, alphabet)
+        key_codes = schedule.key_codes
+        key_len = len(key_codes)
+
+        enc_rounds = []
+        dec_rounds = []
+        tail_boxes = []
+
+        for r in range(rounds):
+            boxes = [schedule.table_at(4 * r + n) for n in range(4)]
+            keys = [key_codes[(4 * r + n) % key_len] for n in range(4)]
+
+            hi, hi_inv = self._pair_tables(boxes[0], boxes[1], keys[0], keys[1], size, bits)
+            lo, lo_inv = self._pair_tables(boxes[2], boxes[3], keys[2], keys[3], size, bits)
+
+            # Сдвиг блока на символ влево учтён прямо в значениях таблиц
+            enc_rounds.append((
+                tuple(_rotl(value << 2 * bits, bits) for value in hi),
+                tuple(_rotl(value, bits) for value in lo),
+            ))
+            dec_rounds.append((
+                tuple(value << 2 * bits for value in hi_inv),
+                tuple(lo_inv),
+            ))
+            tail_boxes.append((boxes[0], keys[0]))
+
+        self._enc = tuple(enc_rounds)
+        self._dec = tuple(reversed(dec_rounds))
+
+        # Посимвольные таблицы для хвоста (позиция в хвосте входит в ключ)
+        tail_enc = []
+        tail_dec = []
+        for q in range(3):
+            enc = bytearray(size)
+            for c in range(size):
+                x = c
+                for box, k in tail_boxes:
+                    x = box[(x + k + q) % size]
+                enc[c] = x
+            dec = bytearray(size)
+            for c in range(size):
+                dec[enc[c]] = c
+            tail_enc.append(bytes(enc))
+            tail_dec.append(bytes(dec))
+
+        self._tail_enc = tuple(tail_enc)
+        self._tail_dec = tuple(tail_dec)
+        self._freeze()
+
+    @staticmethod
+    def _pair_tables(box_a, box_b, k0, k1, size=32, bits=5):
+        """Замена пары символов и обратная ей в виде таблиц на 2^(2*bits) значения"""
+        table = [0] * (1 << 2 * bits)
+        inverse = [0] * (1 << 2 * bits)
+        for a in range(size):
+            a2 = box_a[(a + k0) % size]
+            for b in range(size):
+                b2 = box_b[(b + a2 + k1) % size]
+                table[(a << bits) | b] = (a2 << bits) | b2
+                inverse[(a2 << bits) | b2] = (a << bits) | b
+        return table, inverse
+
+    def encrypt_codes(self, codes) -> bytes:
+        """Шифрование последовательности кодов 0 - size-1"""
+        return self._process_codes(codes, decrypt=False)
+
+    def decrypt_codes(self, codes) -> bytes:
+        """Расшифровка последовательности кодов 0 - size-1"""
+        return self._process_codes(codes, decrypt=True)
+
+    def _process_codes(self, codes, decrypt: bool) -> bytes:
+        codes = bytes(codes)
+        full = len(codes) - len(codes) % 4
+        b1 = self.bits
+        b2, b3 = 2 * b1, 3 * b1
+        mask = (1 << b1) - 1
+        pair_mask = (1 << b2) - 1
+
+        # Упаковка блоков в числа по bits бит на символ
+        blocks = [
+            (a << b3) | (b << b2) | (c << b1) | d
+            for a, b, c, d in zip(codes[0:full:4], codes[1:full:4],
+                                  codes[2:full:4], codes[3:full:4])
+        ]
+
+        if decrypt:
+            for hi, lo in self._dec:
+                blocks = [(v >> b1) | ((v & mask) << b3) for v in blocks]
+                blocks = [hi[v >> b2] | lo[v & pair_mask] for v in blocks]
+        else:
+            for hi, lo in self._enc:
+                blocks = [hi[v >> b2] | lo[v & pair_mask] for v in blocks]
+
+        out = bytearray(len(codes))
+        out[0:full:4] = bytes(v >> b3 for v in blocks)
+        out[1:full:4] = bytes((v >> b2) & mask for v in blocks)
+        out[2:full:4] = bytes((v >> b1) & mask for v in blocks)
+        out[3:full:4] = bytes(v & mask for v in blocks)
+
+        tail = self._tail_dec if decrypt else self._tail_enc
+        for q in range(len(codes) - full):
+            out[full + q] = tail[q][codes[full + q]]
+
+        return bytes(out)
+
+    def encrypt(self, text: str) -> str:
+        """Шифрование текста (символы вне алфавита остаются на месте)"""
+        return _map_codes(text, self.encrypt_codes, self.alphabet.char_to_val,
+                          self._code_to_symbol)
+
+    def decrypt(self, text: str) -> str:
+        """Расшифровка текста"""
+        return _map_codes(text, self.decrypt_codes, self.alphabet.char_to_val,
+                          self._code_to_symbol)
+
+
+def _rotl(value: int, bits: int = 5) -> int:
+    """Циклический сдвиг блока из 4 символов по bits бит на один символ влево"""
+    return ((value << bits) | (value >> 3 * bits)) & ((1 << 4 * bits) - 1)
+
+
+_ALPHABET = TelegraphAlphabet()
+_CODE_TO_SYMBOL = {code: char for code, char in enumerate(_ALPHABET.symbols)}
+
+
+def _map_codes(text: str, transform, codes=_ALPHABET.char_to_val,
+               code_to_symbol=_CODE_TO_SYMBOL) -> str:
+    """
+    Применение преобразования кодов к символам алфавита в тексте
+
+    Символы вне алфавита не передаются в transform и остаются на своих местах.
+    """
+    text = text.upper()
+
+    values = bytes(codes[char] for char in text if char in codes)
+    result = transform(values).decode('latin-1').translate(code_to_symbol)
+
+    if len(values) == len(text):
+        return result
+
+    symbols = iter(result)
+    return ''.join(next(symbols) if char in codes else char for char in text)
+
+
+@lru_cache(maxsize=256)
+def _cached_enhanced_sblock(key: str, rounds: int, symbols: str) -> EnhancedSBlock:
+    return EnhancedSBlock(key, rounds, _alphabet_of(symbols))
+
 
-class EnhancedCryptoSystem:
-    """Усиленная криптосистема с S-блоками"""
+register_cache('enhanced_sblock', _cached_enhanced_sblock)
 
-    def __init__(self, shift: int = 8):
-        self.alphabet = TelegraphAlphabet()
+
+def get_enhanced_sblock(key: str, rounds: int = 4,
+                        alphabet: TelegraphAlphabet = None) -> EnhancedSBlock:
+    """Получить (кэшированный) усиленный S-блок для ключа"""
+    return _cached_enhanced_sblock(key, rounds, _symbols_of(alphabet))
+
+
+def enhanced_key_valid(key: str, rounds: int = 4, alphabet: TelegraphAlphabet = None) -> bool:
+    """Можно ли построить усиленный S-блок (иначе EnhancedSBlock выбросит ValueError)"""
+    alphabet = alphabet or _ALPHABET
+    return rounds >= 1 and any(alphabet.is_valid_char(char) for char in key.upper())
+
+
+class EnhancedCryptoSystem(Immutable):
+    """
+    Усиленная криптосистема с S-блоками
+
+    Объект неизменяем и не хранит состояния между вызовами: шифры внутри
+    тоже неизменяемы, а таблицы ключей берутся из общих кэшей. Один
+    экземпляр можно использовать для любых ключей и сдвигов, в том числе
+    из нескольких потоков одновременно.
+    """
+
+    def __init__(self, shift: int = 8, alphabet: TelegraphAlphabet = None, metrics=None,
+                 normalizer=None):
+        """
+        Args:
+            shift: сдвиг шифра Тритемиуса
+            alphabet: базовый алфавит (по умолчанию телеграфный из 32 символов)
+            metrics: регистр метрик MetricsRegistry (None - без замеров)
+            normalizer: normalize.Normalizer, применяемый к исходному тексту
+                всех методов шифрования (None - текст не меняется)
+        """
+        self.alphabet = alphabet or get_standard_alphabet()
+        self._base_alphabet = alphabet  # None - телеграфный
         self.cipher = TritemiusCipher(shift=shift)
-        self.poly_cipher = PolyTritemiusCipher(shift=shift)  # Используем переданный shift
-        self.text_cipher = TextCipher(self.cipher)
-        self.sblock = SBlock()  # Используем новый SBlock
+        # Используем переданный shift
+        self.poly_cipher = get_poly_cipher(shift, alphabet)
+        self.text_cipher = TextCipher(self.cipher, alphabet)
+        self.sblock = SBlock(alphabet)  # Используем новый SBlock
+        self.metrics = metrics
+        self.normalizer = normalizer
+        self._freeze()
+
+    def normalize(self, text: str) -> str:
+        """Исходный текст в том виде, в котором его шифруют методы системы"""
+        return text if self.normalizer is None else self.normalizer.normalize(text)
+
+    def _poly(self, shift: int = None) -> PolyTritemiusCipher:
+        """Полиалфавитный шифр для сдвига (по умолчанию из конструктора)"""
+        if shift is None or shift == self.poly_cipher.shift:
+            return self.poly_cipher
+        # Шифры для других сдвигов общие и берутся из кэша
+        return get_poly_cipher(shift, self._base_alphabet)
 
     # Простые методы шифрования (моноалфавитные)
+    @measured('simple')
     def encrypt_simple(self, text: str, key: str) -> str:
         """Простое шифрование Тритемиуса"""
+        text = self.normalize(text)
         return self.text_cipher.encrypt_text(text, key)
 
+    @measured('simple')
     def decrypt_simple(self, text: str, key: str) -> str:
         """Простое дешифрование Тритемиуса"""
         return self.text_cipher.decrypt_text(text, key)
 
     # Полиалфавитные методы (которые отсутствовали и вызывали ошибку)
+    @measured('poly')
     def encrypt_polyalphabetic(self, text: str, key: str, shift: int = None) -> str:
         """
         Полиалфавитное шифрование
@@ -82,14 +532,10 @@ class EnhancedCryptoSystem:
         Returns:
             Зашифрованный текст
         """
-        if shift is not None and shift != self.poly_cipher.shift:
-            # Если передали новый сдвиг, создаём новый объект
-            poly_cipher = PolyTritemiusCipher(shift=shift)
-            return poly_cipher.encrypt(text, key)
-        else:
-            # Используем существующий объект
-            return self.poly_cipher.encrypt(text, key)
+        text = self.normalize(text)
+        return self._poly(shift).encrypt(text, key)
 
+    @measured('poly')
     def decrypt_polyalphabetic(self, text: str, key: str, shift: int = None) -> str:
         """
         Расшифровка полиалфавитного шифра
@@ -102,15 +548,76 @@ class EnhancedCryptoSystem:
         Returns:
             Расшифрованный текст
         """
-        if shift is not None and shift != self.poly_cipher.shift:
-            # Если передали новый сдвиг, создаём новый объект
-            poly_cipher = PolyTritemiusCipher(shift=shift)
-            return poly_cipher.decrypt(text, key)
-        else:
-            # Используем существующий объект
-            return self.poly_cipher.decrypt(text, key)
+        return self._poly(shift).decrypt(text, key)
+
+    @measured('poly_shifts')
+    def encrypt_polyalphabetic_shifts(self, text: str, key: str, shifts=None) -> dict:
+        """
+        Полиалфавитное шифрование для нескольких сдвигов за один проход
+
+        Args:
+            text: исходный текст
+            key: ключевое слово
+            shifts: список сдвигов (по умолчанию все сдвиги 1-31)
+
+        Returns:
+            Словарь {сдвиг: зашифрованный текст}
+        """
+        text = self.normalize(text)
+        return self.poly_cipher.encrypt_shifts(text, key, shifts)
+
+    @measured('poly_shifts')
+    def decrypt_polyalphabetic_shifts(self, text: str, key: str, shifts=None) -> dict:
+        """
+        Расшифровка полиалфавитного шифра для нескольких сдвигов за один проход
+
+        Args:
+            text: зашифрованный текст
+            key: ключевое слово
+            shifts: список сдвигов (по умолчанию все сдвиги 1-31)
+
+        Returns:
+            Словарь {сдвиг: расшифрованный текст}
+        """
+        return self.poly_cipher.decrypt_shifts(text, key, shifts)
+
+    @measured('poly_parallel')
+    def encrypt_polyalphabetic_parallel(self, text: str, key: str, shift: int = None,
+                                        workers: int = None) -> str:
+        """
+        Параллельное полиалфавитное шифрование больших текстов
+
+        Args:
+            text: исходный текст
+            key: ключевое слово
+            shift: сдвиг (опционально, по умолчанию из конструктора)
+            workers: число процессов (по умолчанию по числу ядер)
+
+        Returns:
+            Зашифрованный текст (совпадает с encrypt_polyalphabetic)
+        """
+        text = self.normalize(text)
+        return self._poly(shift).encrypt_parallel(text, key, workers=workers)
+
+    @measured('poly_parallel')
+    def decrypt_polyalphabetic_parallel(self, text: str, key: str, shift: int = None,
+                                        workers: int = None) -> str:
+        """
+        Параллельная расшифровка полиалфавитного шифра
+
+        Args:
+            text: зашифрованный текст
+            key: ключевое слово
+            shift: сдвиг (опционально, по умолчанию из конструктора)
+            workers: число процессов (по умолчанию по числу ядер)
+
+        Returns:
+            Расшифрованный текст (совпадает с decrypt_polyalphabetic)
+        """
+        return self._poly(shift).decrypt_parallel(text, key, workers=workers)
 
     # Методы для S-блоков
+    @measured('sblocks')
     def encrypt_s_blocks(self, text: str, key: str) -> str:
         """
         Шифрование текста с использованием S-блоков
@@ -122,6 +629,7 @@ class EnhancedCryptoSystem:
         Returns:
             Зашифрованный текст или сообщение об ошибке
         """
+        text = self.normalize(text)
         if len(key) != 16:
             return "Ошибка: ключ должен содержать ровно 16 символов"
 
@@ -137,6 +645,7 @@ class EnhancedCryptoSystem:
 
         return ''.join(result_blocks)
 
+    @measured('sblocks')
     def decrypt_s_blocks(self, text: str, key: str) -> str:
         """
         Расшифровка текста с использованием S-блоков
@@ -163,23 +672,90 @@ class EnhancedCryptoSystem:
 
         return ''.join(result_blocks)
 
-    # Методы для усиленных S-блоков (если они используются)
-    def encrypt_enhanced_sblocks(self, text: str, key: str) -> str:
+    # Счётчиковый режим S-блоков
+    @measured('ctr')
+    def encrypt_ctr(self, text: str, key: str, nonce: int = 0, offset: int = 0) -> str:
         """
-        Шифрование с усиленными S-блоками
+        Шифрование S-блоками в счётчиковом режиме
 
-        Примечание: Этот метод нужно будет реализовать, если требуется
-        специальная логика для усиленных S-блоков
+        Args:
+            text: исходный текст (любой длины)
+            key: ключ из 16 символов
+            nonce: начальное значение счётчика
+            offset: позиция text в полном тексте (для обработки по частям)
+
+        Returns:
+            Зашифрованный текст или сообщение об ошибке
         """
-        # Временная реализация - используем обычное полиалфавитное шифрование
-        return self.encrypt_polyalphabetic(text, key)
+        text = self.normalize(text)
+        if len(key) != 16:
+            return "Ошибка: ключ должен содержать ровно 16 символов"
 
-    def decrypt_enhanced_sblocks(self, text: str, key: str) -> str:
+        return CounterMode(key, nonce, self._base_alphabet).encrypt(text, offset)
+
+    @measured('ctr')
+    def decrypt_ctr(self, text: str, key: str, nonce: int = 0, offset: int = 0) -> str:
+        """
+        Расшифровка S-блоков в счётчиковом режиме
+
+        Args:
+            text: зашифрованный текст
+            key: ключ из 16 символов
+            nonce: начальное значение счётчика
+            offset: позиция text в полном тексте (для обработки по частям)
+
+        Returns:
+            Расшифрованный текст или сообщение об ошибке
+        """
+        if len(key) != 16:
+            return "Ошибка: ключ должен содержать ровно 16 символов"
+
+        return CounterMode(key, nonce, self._base_alphabet).decrypt(text, offset)
+
+    # Методы для усиленных S-блоков
+    @measured('enhanced')
+    def encrypt_enhanced_sblocks(self, text: str, key: str, rounds: int = 4) -> str:
+        """
+        Шифрование с усиленными S-блоками
+
+        Args:
+            text: исходный текст (любой длины)
+            key: ключевое слово
+            rounds: число раундов
+
+        Returns:
+            Зашифрованный текст или сообщение об ошибке
+        """
+        text = self.normalize(text)
+        if not key:
+            return text
+
+        try:
+            sblock = get_enhanced_sblock(key.upper(), rounds, self._base_alphabet)
+        except ValueError as error:
+            # Ключ без символов алфавита или неверное число раундов
+            return f"Ошибка: {error}"
+        return sblock.encrypt(text)
+
+    @measured('enhanced')
+    def decrypt_enhanced_sblocks(self, text: str, key: str, rounds: int = 4) -> str:
         """
         Дешифрование с усиленными S-блоками
 
-        Примечание: Этот метод нужно будет реализовать, если требуется
-        специальная логика для усиленных S-блоков
+        Args:
+            text: зашифрованный текст
+            key: ключевое слово
+            rounds: число раундов
+
+        Returns:
+            Расшифрованный текст или сообщение об ошибке
         """
-        # Временная реализация - используем обычное полиалфавитное дешифрование
-        return self.decrypt_polyalphabetic(text, key)
\ No newline at end of file
+        if not key:
+            return text
+
+        try:
+            sblock = get_enhanced_sblock(key.upper(), rounds, self._base_alphabet)
+        except ValueError as error:
+            # Ключ без символов алфавита или неверное число раундов
+            return f"Ошибка: {error}"
+        return sblock.decrypt(text)
@@ -0,0 +1,364 @@
+"""
+Расписание таблиц полиалфавитного шифра Тритемиуса
+
+Последовательность таблиц, получаемая повторением
+shift_table(table, key[i % key_len], (key_len + i) % size), зависит только от
+ключа и номера позиции. Пространство состояний (таблица, i mod lcm(key_len, size))
+конечно, поэтому последовательность со временем становится периодической.
+KeySchedule находит этот цикл алгоритмом Брента и хранит только предпериод
+и один период, что даёт O(период) памяти и O(1) доступ к таблице любой позиции.
+
+Расписание после построения не меняется; производные таблицы (rows, inverse,
+symbol_data) строятся лениво под блокировкой, поэтому одно расписание
+из кэша можно читать из нескольких потоков.
+
+Для множества ключей сразу (аудит, смена ключей, генерация тестов)
+batch_tables строит начальные таблицы и первые шаги расписания без
+PolyAlphabet и поиска цикла.
+"""
+
+import threading
+from functools import lru_cache
+from math import gcd
+
+from alphabet import PolyAlphabet, get_standard_alphabet
+from metrics import register_cache
+
+
+class KeySchedule:
+    """Сжатое расписание таблиц для одного ключа"""
+
+    def __init__(self, key: str, alphabet=None):
+        """
+        Построение расписания
+
+        Args:
+            key (str): Ключевое слово (только символы алфавита)
+            alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        if not self.supports(key, alphabet):
+            raise ValueError("ключ должен состоять из символов алфавита")
+
+        self._setup(key, alphabet)
+
+        codes = self.alphabet.char_to_val
+        poly_alpha = PolyAlphabet(self.key, self.alphabet)
+        initial = bytes(codes[char] for char in poly_alpha.custom_symbols)
+
+        self.mu, self.lam = self._find_cycle(initial)
+
+        # Предпериод и один период подряд, по size байт на таблицу:
+        # таблица с номером j действует перед позицией j
+        data = bytearray()
+        table = initial
+        for i in range(self.mu + self.lam):
+            data += table
+            table = self.step(table, i)
+        self.data = bytes(data)
+
+    def _setup(self, key: str, alphabet):
+        """Общие атрибуты расписания"""
+        self.alphabet = alphabet or get_standard_alphabet()
+        self.size = self.alphabet.size
+        self.key = key.upper()
+
+        codes = self.alphabet.char_to_val
+        self.key_codes = tuple(codes[char] for char in self.key)
+        self.key_len = len(self.key_codes)
+        # Период фазы: номер символа ключа и смещение повторяются через lcm(key_len, size)
+        self.phase_period = self.key_len * self.size // gcd(self.key_len, self.size)
+        # Следующий код по кругу: _next[s] = (s + 1) mod size
+        self._next = self.alphabet.modulus.shift_table(1)
+
+        self._rows = {}
+        self._inverse = None
+        self._symbol_data = None
+        # Блокировка ленивого построения производных таблиц
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_buffer(cls, key: str, mu: int, lam: int, data, rows=None, alphabet=None):
+        """
+        Расписание поверх готового буфера таблиц (например, общей памяти)
+
+        Args:
+            key: ключевое слово
+            mu: длина предпериода
+            lam: длина периода
+            data: буфер из (mu + lam) * size байт
+            rows: словарь {сдвиг: буфер строк замены} (опционально)
+            alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        schedule = cls.__new__(cls)
+        schedule._setup(key, alphabet)
+        schedule.mu, schedule.lam = mu, lam
+
+        if len(data) != (mu + lam) * schedule.size:
+            raise ValueError("размер буфера не соответствует расписанию")
+        schedule.data = data
+        schedule._rows = dict(rows or {})
+        return schedule
+
+    @staticmethod
+    def supports(key: str, alphabet=None) -> bool:
+        """Можно ли построить расписание для ключа"""
+        alphabet = alphabet or get_standard_alphabet()
+        return bool(key) and all(alphabet.is_valid_char(char) for char in key)
+
+    def step(self, table: bytes, i: int) -> bytes:
+        """
+        Один шаг shift_table в кодах символов
+
+        Args:
+            table: текущая таблица (size байт с кодами 0 - size-1)
+            i: номер позиции (важен только остаток от деления на phase_period)
+
+        Returns:
+            Новая таблица
+        """
+        s = self.key_codes[i % self.key_len]
+        bias = (self.key_len + i) % self.size
+        rem_part = table[:bias]
+
+        # Пока s находится в rem_part, берём следующий символ алфавита
+        while s in rem_part:
+            s = self._next[s]
+
+        first = _BYTES[s]
+        return first + rem_part + table[bias:].replace(first, b'')
+
+    def _find_cycle(self, initial: bytes):
+        """
+        Алгоритм Брента для состояния (таблица, фаза)
+
+        Returns:
+            (mu, lam): длина предпериода и длина периода
+        """
+        period = self.phase_period
+
+        def advance(state):
+            table, phase = state
+            return self.step(table, phase), (phase + 1) % period
+
+        start = (initial, 0)
+
+        # Поиск длины цикла
+        power = lam = 1
+        tortoise = start
+        hare = advance(start)
+        while tortoise != hare:
+            if power == lam:
+                tortoise = hare
+                power *= 2
+                lam = 0
+            hare = advance(hare)
+            lam += 1
+
+        # Поиск начала цикла
+        tortoise = hare = start
+        for _ in range(lam):
+            hare = advance(hare)
+
+        mu = 0
+        while tortoise != hare:
+            tortoise = advance(tortoise)
+            hare = advance(hare)
+            mu += 1
+
+        return mu, lam
+
+    def __len__(self):
+        """Число хранимых таблиц (предпериод + период)"""
+        return self.mu + self.lam
+
+    def index(self, i: int) -> int:
+        """Номер хранимой таблицы для позиции i"""
+        if i < self.mu + self.lam:
+            return i
+        return self.mu + (i - self.mu) % self.lam
+
+    def table(self, j: int) -> bytes:
+        """Хранимая таблица с номером j"""
+        size = self.size
+        return bytes(self.data[j * size:(j + 1) * size])
+
+    def table_at(self, i: int) -> bytes:
+        """Таблица, действующая перед позицией i (при тексте без пропусков)"""
+        return self.table(self.index(i))
+
+    def rows(self, shift: int):
+        """
+        Строки замены для заданного сдвига
+
+        rows(shift)[j * size + c] - код символа, в который переходит символ
+        с кодом c под таблицей с номером j. Строки строятся один раз на сдвиг.
+        """
+        shift %= self.size
+        rows = self._rows.get(shift)
+        if rows is not None:
+            return rows
+
+        with self._lock:
+            rows = self._rows.get(shift)
+            if rows is not None:
+                return rows
+            data = self.data
+            size = self.size
+            advance = self.alphabet.modulus.shift_table(shift)
+            out = bytearray(len(data))
+            for base in range(0, len(data), size):
+                for pos in range(size):
+                    out[base + data[base + pos]] = data[base + advance[pos]]
+            rows = bytes(out)
+            self._rows[shift] = rows
+        return rows
+
+    def inverse(self):
+        """
+        Обратные таблицы
+
+        inverse()[j * size + c] - позиция символа с кодом c в таблице с номером j.
+        """
+        if self._inverse is None:
+            with self._lock:
+                if self._inverse is None:
+                    data = self.data
+                    size = self.size
+                    inverse = bytearray(len(data))
+                    for base in range(0, len(data), size):
+                        for pos in range(size):
+                            inverse[base + data[base + pos]] = pos
+                    self._inverse = bytes(inverse)
+        return self._inverse
+
+    def symbol_data(self) -> str:
+        """Все хранимые таблицы одной строкой символов (по size на таблицу)"""
+        if self._symbol_data is None:
+            with self._lock:
+                if self._symbol_data is None:
+                    # Символ с кодом c (chr(c)) -> символ алфавита
+                    code_to_symbol = dict(enumerate(self.alphabet.symbols))
+                    data = bytes(self.data).decode('latin-1')
+                    self._symbol_data = data.translate(code_to_symbol)
+        return self._symbol_data
+
+
+_BYTES = [bytes((code,)) for code in range(256)]
+
+
+def batch_tables(keys, steps: int, alphabet=None) -> list:
+    """
+    Начальные таблицы и первые steps шагов расписания для набора ключей
+
+    Таблицы всех ключей хранятся строками одной матрицы и продвигаются
+    вместе, шаг за шагом. Ключи одной длины делят смещение шага, поэтому
+    оно считается один раз на группу. Векторной арифметики (NumPy) в
+    зависимостях нет, поэтому строки матрицы - bytes, а шаг по строкам
+    идёт циклом. Шаг shift_table сводится к операциям
+    над bytes: первый свободный символ - первый байт строки алфавита,
+    начатой с символа ключа, после удаления (translate) символов rem_part.
+    Повторяющиеся ключи считаются один раз.
+
+    Args:
+        keys: ключевые слова (только символы алфавита)
+        steps: число шагов после начальной таблицы
+        alphabet: базовый алфавит (по умолчанию телеграфный)
+
+    Returns:
+        Список bytes по ключам: (steps + 1) * size кодов, таблица с номером j
+        (действует перед позицией j) - байты [j * size, (j + 1) * size),
+        как в KeySchedule.data
+    """
+    alphabet = alphabet or get_standard_alphabet()
+    size = alphabet.size
+    codes = alphabet.char_to_val
+    # rotated[s] - коды алфавита по кругу, начиная с s
+    rotated = [alphabet.modulus.shift_table(s) for s in range(size)]
+    everything = bytes(range(size))
+
+    unique = {}
+    for key in keys:
+        key = key.upper()
+        if key not in unique:
+            if not KeySchedule.supports(key, alphabet):
+                raise ValueError("ключ должен состоять из символов алфавита")
+            unique[key] = len(unique)
+
+    # Матрица текущих таблиц (строка на ключ) и буферы результатов
+    tables = []
+    groups = {}
+    for key, row in unique.items():
+        key_codes = bytes(codes[char] for char in key)
+        table = bytearray()
+        for c in key_codes:
+            if len(table) >= size:
+                break
+            table.append(rotated[c].translate(None, table)[0])
+        table += everything.translate(None, table)
+        tables.append(bytes(table))
+        groups.setdefault(len(key_codes), []).append((row, key_codes))
+
+    out = [bytearray(table) for table in tables]
+
+    for i in range(steps):
+        for key_len, members in groups.items():
+            bias = (key_len + i) % size
+            k = i % key_len
+            for row, key_codes in members:
+                table = tables[row]
+                first = rotated[key_codes[k]].translate(None, table[:bias])[0]
+                pos = table.index(first)
+                table = table[pos:pos + 1] + table[:pos] + table[pos + 1:]
+                tables[row] = table
+                out[row] += table
+
+    return [bytes(out[unique[key.upper()]]) for key in keys]
+
+
+_DEFAULT_SYMBOLS = get_standard_alphabet().symbols
+
+# Расписания, подключённые извне (например, из общей памяти)
+_registered = {}
+
+
+def _symbols_key(alphabet):
+    """Ключ алфавита в кэшах: None для телеграфного, иначе строка символов"""
+    if alphabet is None or alphabet.symbols == _DEFAULT_SYMBOLS:
+        return None
+    return ''.join(alphabet.symbols)
+
+
+def register_schedule(schedule: KeySchedule):
+    """Использовать готовое расписание вместо построения своего"""
+    _registered[(schedule.key, _symbols_key(schedule.alphabet))] = schedule
+
+
+def unregister_schedule(schedule: KeySchedule):
+    """Перестать использовать ранее зарегистрированное расписание"""
+    key = (schedule.key, _symbols_key(schedule.alphabet))
+    if _registered.get(key) is schedule:
+        del _registered[key]
+
+
+@lru_cache(maxsize=256)
+def _cached_schedule(key: str, symbols: str = None) -> KeySchedule:
+    return KeySchedule(key, None if symbols is None else get_standard_alphabet(symbols))
+
+
+register_cache('key_schedule', _cached_schedule)
+
+
+def get_key_schedule(key: str, alphabet=None) -> KeySchedule:
+    """
+    Получить (кэшированное) расписание для ключа
+
+    Args:
+        key: ключевое слово
+        alphabet: базовый алфавит (по умолчанию телеграфный)
+    """
+    key = key.upper()
+    symbols = _symbols_key(alphabet)
+    schedule = _registered.get((key, symbols))
+    if schedule is None:
+        schedule = _cached_schedule(key, symbols)
+    return schedule
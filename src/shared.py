@@ -0,0 +1,191 @@
+"""
+Общие таблицы ключей для пулов процессов
+
+Расписание ключа (KeySchedule) публикуется один раз в сегмент
+multiprocessing.shared_memory. Процессы пула подключаются к нему по имени
+только для чтения, поэтому пул из N процессов хранит одну копию таблиц
+каждого ключа вместо N.
+
+Формат сегмента:
+    заголовок  <4sBHIIBH: метка, версия, длина ключа, mu, lam, число сдвигов,
+               длина строки символов алфавита в байтах UTF-8
+    алфавит    символы алфавита в UTF-8 (size символов)
+    сдвиги     по одному байту на сдвиг
+    ключ       коды символов ключа (по байту на символ)
+    таблицы    (mu + lam) * size байт
+    строки     (mu + lam) * size байт на каждый сдвиг
+
+Процесс держит подключённые сегменты до detach() или до своего завершения.
+"""
+
+import atexit
+import struct
+from multiprocessing import shared_memory
+
+from alphabet import get_standard_alphabet
+from schedule import KeySchedule, get_key_schedule, register_schedule, unregister_schedule
+
+_MAGIC = b'TRKS'
+_VERSION = 2
+_HEADER = struct.Struct('<4sBHIIBH')
+
+# Сегменты, к которым подключён текущий процесс:
+# {имя: (SharedMemory, расписание, представления буфера)}
+_attached = {}
+
+
+class SharedKeyTables:
+    """Публикатор расписаний ключей в общей памяти"""
+
+    def __init__(self, shifts=(8, -8), alphabet=None):
+        """
+        Args:
+            shifts: сдвиги, для которых заранее строятся строки замены
+            alphabet: базовый алфавит (по умолчанию телеграфный)
+        """
+        self.alphabet = alphabet or get_standard_alphabet()
+        self.shifts = tuple(sorted({self.alphabet.modulus.reduce(shift) for shift in shifts}))
+        self._segments = {}
+
+    def publish(self, key: str) -> str:
+        """
+        Опубликовать расписание ключа
+
+        Args:
+            key: ключевое слово (только символы алфавита)
+
+        Returns:
+            Имя сегмента общей памяти
+        """
+        key = key.upper()
+        segment = self._segments.get(key)
+        if segment is not None:
+            return segment.name
+
+        schedule = get_key_schedule(key, self.alphabet)
+        symbols = ''.join(self.alphabet.symbols).encode('utf-8')
+        header = _HEADER.pack(_MAGIC, _VERSION, schedule.key_len, schedule.mu, schedule.lam,
+                              len(self.shifts), len(symbols))
+        parts = [header, symbols, bytes(self.shifts), bytes(schedule.key_codes), schedule.data]
+        parts.extend(schedule.rows(shift) for shift in self.shifts)
+        size = sum(len(part) for part in parts)
+
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        offset = 0
+        for part in parts:
+            segment.buf[offset:offset + len(part)] = part
+            offset += len(part)
+
+        self._segments[key] = segment
+        return segment.name
+
+    def names(self) -> tuple:
+        """Имена всех опубликованных сегментов"""
+        return tuple(segment.name for segment in self._segments.values())
+
+    def initializer(self):
+        """
+        Параметры инициализации пула
+
+        Returns:
+            (функция, аргументы) для ProcessPoolExecutor/Pool
+        """
+        return attach_all, (self.names(),)
+
+    def close(self):
+        """Закрыть и удалить все сегменты"""
+        for segment in self._segments.values():
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach(name: str) -> KeySchedule:
+    """
+    Подключиться к опубликованному расписанию (только чтение)
+
+    Расписание регистрируется в процессе, так что get_key_schedule()
+    и шифры используют его вместо построения своей копии.
+
+    Args:
+        name: имя сегмента общей памяти
+
+    Returns:
+        KeySchedule поверх общей памяти
+    """
+    attached = _attached.get(name)
+    if attached is not None:
+        return attached[1]
+
+    segment = shared_memory.SharedMemory(name=name)
+    buf = segment.buf.toreadonly()
+    magic, version, key_len, mu, lam, shift_count, symbols_len = _HEADER.unpack_from(buf)
+    if magic != _MAGIC or version != _VERSION:
+        buf.release()
+        segment.close()
+        raise ValueError(f"сегмент {name} не содержит таблиц ключа")
+
+    offset = _HEADER.size
+    alphabet = get_standard_alphabet(bytes(buf[offset:offset + symbols_len]).decode('utf-8'))
+    offset += symbols_len
+
+    shifts = bytes(buf[offset:offset + shift_count])
+    offset += shift_count
+
+    key = ''.join(alphabet.symbols[code] for code in buf[offset:offset + key_len])
+    offset += key_len
+
+    size = (mu + lam) * alphabet.size
+    data = buf[offset:offset + size]
+    offset += size
+
+    rows = {}
+    for shift in shifts:
+        rows[shift] = buf[offset:offset + size]
+        offset += size
+
+    schedule = KeySchedule.from_buffer(key, mu, lam, data, rows, alphabet)
+    register_schedule(schedule)
+    _attached[name] = (segment, schedule, [data, *rows.values(), buf])
+    return schedule
+
+
+def attach_all(names):
+    """Подключить несколько сегментов (удобно как initializer пула)"""
+    for name in names:
+        attach(name)
+
+
+def detach(name: str):
+    """
+    Отключиться от сегмента
+
+    Расписание снимается с регистрации, так что дальше get_key_schedule()
+    строит свою копию. Представления буфера освобождаются, поэтому
+    расписание, полученное из attach(), после этого использовать нельзя.
+    """
+    attached = _attached.pop(name, None)
+    if attached is None:
+        return
+    segment, schedule, views = attached
+    unregister_schedule(schedule)
+    for view in views:
+        view.release()
+    try:
+        segment.close()
+    except BufferError:
+        # Кто-то ещё держит срез буфера; отображение снимет ОС при завершении
+        pass
+
+
+@atexit.register
+def detach_all():
+    """Отключиться от всех сегментов (вызывается и при завершении процесса)"""
+    for name in list(_attached):
+        detach(name)
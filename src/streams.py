@@ -0,0 +1,431 @@
+"""
+Потоковое шифрование по частям
+
+Поток принимает текст кусками через update() и возвращает результат
+по мере готовности; finalize() дообрабатывает остаток. Результат
+совпадает с шифрованием всего текста соответствующим методом
+EnhancedCryptoSystem, но в памяти держится только текущий кусок.
+
+    stream = open_stream('poly', key, shift=8)
+    for chunk in chunks:
+        out.write(stream.update(chunk))
+    out.write(stream.finalize())
+
+Состояние полиалфавитного и счётчикового потоков (позиция, таблица) можно
+сохранить снимком и продолжить шифрование в другом процессе, не
+проходя заново уже зашифрованный текст:
+
+    state = stream.snapshot()
+    ...
+    stream = PolyStream.restore(key, state)
+    log.write(stream.update(record))
+"""
+
+import hashlib
+import struct
+import time
+
+from alphabet import TelegraphAlphabet
+from sblocks import SBlock, CounterMode, get_enhanced_sblock
+from tritemius import TritemiusCipher, TextCipher, get_poly_cipher
+
+MODES = ('simple', 'poly', 'sblocks', 'ctr', 'enhanced')
+
+_ALPHABET = TelegraphAlphabet()
+
+# Размер куска при обработке файлов (символов)
+CHUNK_SIZE = 1 << 20
+
+# Заголовок снимка PolyStream: версия, флаги, сдвиг, позиция, отпечаток ключа
+_SNAPSHOT = struct.Struct('>BBiQ4s')
+_SNAPSHOT_VERSION = 1
+# Снимок CounterStream: версия, флаги, начальное значение счётчика, позиция, отпечаток ключа
+_COUNTER_SNAPSHOT = struct.Struct('>BBqQ4s')
+_DECRYPT = 1    # поток расшифровывает
+_CODES = 2      # таблица записана кодами алфавита, а не строкой UTF-8
+
+
+class SimpleStream:
+    """Моноалфавитный шифр: каждый кусок обрабатывается независимо"""
+
+    def __init__(self, key: str, shift: int = 8, decrypt: bool = False):
+        text_cipher = TextCipher(TritemiusCipher(shift=shift))
+        self.key = key
+        self._transform = text_cipher.decrypt_text if decrypt else text_cipher.encrypt_text
+
+    def update(self, text: str) -> str:
+        return self._transform(text, self.key)
+
+    def finalize(self) -> str:
+        return ''
+
+
+class PolyStream:
+    """Полиалфавитный шифр: между кусками переносятся позиция и таблица"""
+
+    def __init__(self, key: str, shift: int = 8, decrypt: bool = False):
+        self.key = key
+        self.shift = -shift if decrypt else shift
+        self.cipher = get_poly_cipher(shift)
+        self.position = 0
+        self.table = None
+
+    def update(self, text: str) -> str:
+        if not self.key:
+            return text
+
+        text = text.upper()
+        result, self.table = self.cipher.process_from(text, self.key, self.shift,
+                                                      self.table, self.position)
+        self.position += len(text)
+        return result
+
+    def finalize(self) -> str:
+        return ''
+
+    def snapshot(self) -> bytes:
+        """
+        Снимок состояния потока (несколько десятков байт)
+
+        Содержит позицию, сдвиг, направление, текущую таблицу и отпечаток
+        ключа (сам ключ не сохраняется). Таблица - внутреннее состояние
+        шифра, поэтому снимок нужно хранить так же, как ключ.
+        """
+        flags = _DECRYPT if self.shift < 0 else 0
+        if self.table is None:
+            table = b''
+        elif all(char in _ALPHABET.char_to_val for char in self.table):
+            flags |= _CODES
+            table = bytes(_ALPHABET.char_to_val[char] for char in self.table)
+        else:
+            # Ключ с посторонними символами: они попадают в таблицу
+            table = ''.join(self.table).encode('utf-8')
+        header = _SNAPSHOT.pack(_SNAPSHOT_VERSION, flags, abs(self.shift), self.position,
+                                key_digest(self.key))
+        return header + table
+
+    @classmethod
+    def restore(cls, key: str, snapshot: bytes) -> 'PolyStream':
+        """
+        Поток, продолжающий работу с места снимка
+
+        Args:
+            key: ключ, с которым создавался снимок
+            snapshot: результат snapshot()
+
+        Returns:
+            PolyStream; следующий update() даёт тот же результат, что и
+            исходный поток без перерыва
+        """
+        try:
+            version, flags, shift, position, digest = _SNAPSHOT.unpack_from(snapshot)
+        except struct.error:
+            raise ValueError("повреждённый снимок потока") from None
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(f"неподдерживаемая версия снимка: {version}")
+        if digest != key_digest(key):
+            raise ValueError("снимок создан с другим ключом")
+
+        data = snapshot[_SNAPSHOT.size:]
+        stream = cls(key, shift, bool(flags & _DECRYPT))
+        stream.position = position
+        if not data:
+            stream.table = None
+        elif flags & _CODES:
+            if len(data) != _ALPHABET.size or max(data) >= _ALPHABET.size:
+                raise ValueError("повреждённый снимок потока")
+            stream.table = [_ALPHABET.symbols[code] for code in data]
+        else:
+            stream.table = list(data.decode('utf-8'))
+        return stream
+
+
+def key_digest(key: str) -> bytes:
+    """Отпечаток ключа (4 байта) для проверки снимков и манифестов без хранения ключа"""
+    return hashlib.blake2b(key.upper().encode('utf-8'), digest_size=4).digest()
+
+
+class SBlockStream:
+    """S-блоки: обрабатываются полные блоки, неполный переносится в следующий кусок"""
+
+    def __init__(self, key: str, decrypt: bool = False):
+        if len(key) != 16:
+            raise ValueError("ключ должен содержать ровно 16 символов")
+
+        sblock = SBlock()
+        self.key = key
+        self._transform = sblock.decrypt_s_block if decrypt else sblock.encrypt_s_block
+        self._pending = ''
+
+    def update(self, text: str) -> str:
+        text = self._pending + text
+        full = len(text) - len(text) % 4
+        self._pending = text[full:]
+        return ''.join(self._transform(text[i:i + 4], self.key) for i in range(0, full, 4))
+
+    def finalize(self) -> str:
+        if self._pending:
+            raise ValueError("текст должен быть кратен 4 символам")
+        return ''
+
+
+class CounterStream:
+    """Счётчиковый режим: кусок обрабатывается со своего смещения"""
+
+    def __init__(self, key: str, nonce: int = 0, decrypt: bool = False, offset: int = 0):
+        if len(key) != 16:
+            raise ValueError("ключ должен содержать ровно 16 символов")
+
+        self.key = key
+        self.counter = CounterMode(key, nonce)
+        self.decrypt = decrypt
+        self.position = offset
+
+    def update(self, text: str) -> str:
+        if self.decrypt:
+            result = self.counter.decrypt(text, self.position)
+        else:
+            result = self.counter.encrypt(text, self.position)
+        self.position += len(text)
+        return result
+
+    def finalize(self) -> str:
+        return ''
+
+    def snapshot(self) -> bytes:
+        """Снимок состояния потока: направление, счётчик, позиция и отпечаток ключа"""
+        flags = _DECRYPT if self.decrypt else 0
+        return _COUNTER_SNAPSHOT.pack(_SNAPSHOT_VERSION, flags, self.counter.nonce,
+                                      self.position, key_digest(self.key))
+
+    @classmethod
+    def restore(cls, key: str, snapshot: bytes) -> 'CounterStream':
+        """
+        Поток, продолжающий работу с места снимка
+
+        Args:
+            key: ключ, с которым создавался снимок
+            snapshot: результат snapshot()
+
+        Returns:
+            CounterStream с той же позицией в гамме
+        """
+        try:
+            version, flags, nonce, position, digest = _COUNTER_SNAPSHOT.unpack(snapshot)
+        except struct.error:
+            raise ValueError("повреждённый снимок потока") from None
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(f"неподдерживаемая версия снимка: {version}")
+        if digest != key_digest(key):
+            raise ValueError("снимок создан с другим ключом")
+        return cls(key, nonce, bool(flags & _DECRYPT), offset=position)
+
+
+class EnhancedStream:
+    """
+    Усиленные S-блоки
+
+    Блоки складываются из символов алфавита подряд, поэтому кусок режется
+    после символа алфавита с номером, кратным 4; остаток переносится дальше.
+    """
+
+    def __init__(self, key: str, rounds: int = 4, decrypt: bool = False):
+        self.key = key
+        self.decrypt = decrypt
+        self._pending = ''
+        self._sblock = get_enhanced_sblock(key.upper(), rounds) if key else None
+
+    def _transform(self, text: str) -> str:
+        return self._sblock.decrypt(text) if self.decrypt else self._sblock.encrypt(text)
+
+    def update(self, text: str) -> str:
+        if self._sblock is None:
+            return text
+
+        codes = _ALPHABET.char_to_val
+        text = self._pending + text.upper()
+
+        # Ищем конец последнего полного блока символов алфавита
+        count = 0
+        cut = 0
+        for i, char in enumerate(text):
+            if char in codes:
+                count += 1
+                if count % 4 == 0:
+                    cut = i + 1
+
+        self._pending = text[cut:]
+        return self._transform(text[:cut])
+
+    def finalize(self) -> str:
+        text, self._pending = self._pending, ''
+        return self._transform(text) if text else ''
+
+
+class MeasuredStream:
+    """
+    Поток с учётом в MetricsRegistry
+
+    Обработка всего текста потока - один вызов: символы и время update()
+    копятся и записываются при finalize(); ошибка записывается сразу.
+    Остальные атрибуты (snapshot, position и т.п.) берутся у потока.
+    """
+
+    def __init__(self, stream, metrics, mode: str, decrypt: bool = False):
+        self.stream = stream
+        self.metrics = metrics
+        self.mode = mode
+        self.op = 'decrypt' if decrypt else 'encrypt'
+        self.chars = 0
+        self.seconds = 0.0
+
+    def __getattr__(self, name):
+        # До заполнения __dict__ (например, при распаковке pickle) потока ещё нет
+        if name == 'stream':
+            raise AttributeError(name)
+        return getattr(self.stream, name)
+
+    def _timed(self, call, *args) -> str:
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        except Exception:
+            self.metrics.record(self.mode, self.op, self.chars,
+                                self.seconds + time.perf_counter() - started, error=True)
+            raise
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def update(self, text: str) -> str:
+        self.chars += len(text)
+        return self._timed(self.stream.update, text)
+
+    def finalize(self) -> str:
+        result = self._timed(self.stream.finalize)
+        self.metrics.record(self.mode, self.op, self.chars, self.seconds)
+        self.chars = 0
+        self.seconds = 0.0
+        return result
+
+
+class NormalizedStream:
+    """
+    Поток с нормализацией исходного текста (normalize.Normalizer)
+
+    Нормализация посимвольная, поэтому куски можно нормализовать
+    независимо; в режиме 'drop' длина куска может уменьшиться.
+    """
+
+    def __init__(self, stream, normalizer):
+        self.stream = stream
+        self.normalizer = normalizer
+
+    def __getattr__(self, name):
+        if name == 'stream':
+            raise AttributeError(name)
+        return getattr(self.stream, name)
+
+    def update(self, text: str) -> str:
+        return self.stream.update(self.normalizer.normalize(text))
+
+    def finalize(self) -> str:
+        return self.stream.finalize()
+
+
+def open_stream(mode: str, key: str, shift: int = 8, decrypt: bool = False,
+                nonce: int = 0, rounds: int = 4, offset: int = 0, metrics=None,
+                normalizer=None):
+    """
+    Создание потока для режима
+
+    Args:
+        mode: режим из MODES
+        key: ключ
+        shift: сдвиг шифра Тритемиуса (simple, poly)
+        decrypt: расшифровывать вместо шифрования
+        nonce: начальное значение счётчика (ctr)
+        rounds: число раундов (enhanced)
+        offset: позиция первого куска в полном тексте (ctr)
+        metrics: регистр MetricsRegistry (None - без замеров)
+        normalizer: normalize.Normalizer для исходного текста при шифровании
+            (при расшифровке не применяется)
+
+    Returns:
+        Объект с методами update(text) и finalize()
+    """
+    if metrics is not None:
+        stream = open_stream(mode, key, shift, decrypt, nonce, rounds, offset,
+                             normalizer=normalizer)
+        return MeasuredStream(stream, metrics, mode, decrypt)
+    if normalizer is not None and not decrypt:
+        stream = open_stream(mode, key, shift, decrypt, nonce, rounds, offset)
+        return NormalizedStream(stream, normalizer)
+    if mode == 'simple':
+        return SimpleStream(key, shift, decrypt)
+    if mode == 'poly':
+        return PolyStream(key, shift, decrypt)
+    if mode == 'sblocks':
+        return SBlockStream(key, decrypt)
+    if mode == 'ctr':
+        return CounterStream(key, nonce, decrypt, offset)
+    if mode == 'enhanced':
+        return EnhancedStream(key, rounds, decrypt)
+    raise ValueError(f"неизвестный режим: {mode}")
+
+
+def stream_file(source, target, mode: str, key: str, shift: int = 8, decrypt: bool = False,
+                encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE, preview: int = 0,
+                progress=None, metrics=None, normalizer=None) -> dict:
+    """
+    Потоковая обработка файла в файл
+
+    Args:
+        source: путь к исходному файлу
+        target: путь к файлу результата
+        mode, key, shift, decrypt: параметры шифра (см. open_stream)
+        encoding: кодировка файлов
+        chunk_size: размер куска в символах
+        preview: сколько первых символов исходного текста и результата вернуть
+        progress: функция progress(символов обработано, секунд прошло)
+        metrics: регистр MetricsRegistry (None - без замеров)
+        normalizer: normalize.Normalizer для исходного текста (см. open_stream)
+
+    Returns:
+        Словарь: chars, seconds, chars_per_second, preview_in, preview_out
+    """
+    stream = open_stream(mode, key, shift, decrypt, metrics=metrics, normalizer=normalizer)
+    started = time.perf_counter()
+    chars = 0
+    preview_in = []
+    preview_out = []
+    preview_in_size = preview_out_size = 0
+
+    with open(source, encoding=encoding, newline='') as src, \
+            open(target, 'w', encoding=encoding, newline='') as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            result = stream.update(chunk) if chunk else stream.finalize()
+            dst.write(result)
+
+            if preview_in_size < preview and chunk:
+                preview_in.append(chunk[:preview - preview_in_size])
+                preview_in_size += len(preview_in[-1])
+            if preview_out_size < preview and result:
+                preview_out.append(result[:preview - preview_out_size])
+                preview_out_size += len(preview_out[-1])
+
+            if not chunk:
+                break
+
+            chars += len(chunk)
+            if progress is not None:
+                progress(chars, time.perf_counter() - started)
+
+    seconds = time.perf_counter() - started
+    return {
+        'chars': chars,
+        'seconds': seconds,
+        'chars_per_second': chars / seconds if seconds > 0 else 0.0,
+        'preview_in': ''.join(preview_in),
+        'preview_out': ''.join(preview_out),
+    }
@@ -1,11 +1,22 @@
-from alphabet import TelegraphAlphabet, CustomAlphabet, PolyAlphabet
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
 
+from alphabet import (TelegraphAlphabet, CustomAlphabet, PolyAlphabet, get_custom_alphabet,
+                      get_standard_alphabet)
+from immutable import Immutable
+from metrics import register_cache
+from schedule import KeySchedule, get_key_schedule
+from shared import SharedKeyTables
 
-# Реализация шифра Тритемиуса
-class TritemiusCipher:
+
+# Реализация шифра Тритемиуса (неизменяемый объект)
+class TritemiusCipher(Immutable):
 
     def __init__(self, shift: int = 8):
         self.shift = shift  # Фиксированный сдвиг Тритемиуса
+        self._freeze()
 
     # Шифрование одного символа
     def encrypt_char(self, plain_char: str, alphabet: CustomAlphabet) -> str:
@@ -19,7 +30,7 @@ class TritemiusCipher:
             return plain_char
 
         # Применяем сдвиг на 8 позиций
-        encrypted_val = (char_val + self.shift) % 32
+        encrypted_val = alphabet.standard_alphabet.modulus.add(char_val, self.shift)
         return alphabet.val_to_char[encrypted_val]
 
     # Дешифрование одного символа
@@ -34,15 +45,19 @@ class TritemiusCipher:
             return cipher_char
 
         # Применяем обратный сдвиг на 8 позиций
-        decrypted_val = (char_val - self.shift) % 32
+        decrypted_val = alphabet.standard_alphabet.modulus.sub(char_val, self.shift)
         return alphabet.val_to_char[decrypted_val]
 
 
-# Шифрование и дешифрование текстовых блоков
-class TextCipher:
+# Шифрование и дешифрование текстовых блоков (неизменяемый объект)
+class TextCipher(Immutable):
 
-    def __init__(self, cipher: TritemiusCipher):
+    def __init__(self, cipher: TritemiusCipher, alphabet: TelegraphAlphabet = None,
+                 normalizer=None):
         self.cipher = cipher
+        self.alphabet = alphabet  # Базовый алфавит (None - телеграфный)
+        self.normalizer = normalizer  # normalize.Normalizer для исходного текста (None - без)
+        self._freeze()
 
     # Моноалфавитное шифрование (один символ ключа для всего текста)
     def encrypt_text(self, text: str, key_word: str) -> str:
@@ -54,18 +69,15 @@ class TextCipher:
         if not key_word:
             return text
 
-        # Создаем пользовательский алфавит на основе ключа
-        alphabet = CustomAlphabet(key_word)
+        # Берём пользовательский алфавит на основе ключа из кэша
+        alphabet = get_custom_alphabet(key_word, self.alphabet)
 
-        result = []
-        for char in text.upper():
-            if alphabet.standard_alphabet.is_valid_char(char):
-                encrypted = self.cipher.encrypt_char(char, alphabet)
-                result.append(encrypted)
-            else:
-                result.append(char)
+        if self.normalizer is not None:
+            text = self.normalizer.normalize(text)
 
-        return ''.join(result)
+        # Замена не зависит от позиции, поэтому текст обрабатывается
+        # одной таблицей str.translate на символы алфавита
+        return text.upper().translate(self.translation(alphabet, self.cipher.encrypt_char))
 
     # Дешифрование моноалфавитного шифра
     def decrypt_text(self, text: str, key_word: str) -> str:
@@ -73,26 +85,49 @@ class TextCipher:
         if not key_word:
             return text
 
-        # Создаем пользовательский алфавит на основе ключа (должен быть тот же!)
-        alphabet = CustomAlphabet(key_word)
+        # Берём пользовательский алфавит на основе ключа (должен быть тот же!)
+        alphabet = get_custom_alphabet(key_word, self.alphabet)
 
-        result = []
-        for char in text.upper():
-            if alphabet.standard_alphabet.is_valid_char(char):
-                decrypted = self.cipher.decrypt_char(char, alphabet)
-                result.append(decrypted)
-            else:
-                result.append(char)
+        return text.upper().translate(self.translation(alphabet, self.cipher.decrypt_char))
+
+    @staticmethod
+    def translation(alphabet, transform) -> dict:
+        """
+        Таблица для str.translate: символ алфавита -> результат transform
+
+        Args:
+            alphabet: пользовательский алфавит
+            transform: encrypt_char или decrypt_char шифра
+
+        Returns:
+            Словарь {код символа: заменяющий символ}
+        """
+        return {
+            ord(char): transform(char, alphabet)
+            for char in alphabet.standard_alphabet.get_all_symbols()
+        }
 
-        return ''.join(result)
 
+class PolyTritemiusCipher(Immutable):
+    """
+    Полиалфавитный шифр Тритемиуса
 
-class PolyTritemiusCipher:
-    """Полиалфавитный шифр Тритемиуса"""
+    Объект неизменяем: текущая таблица и позиция живут в локальных
+    переменных вызова, а расписания ключей общие и только читаются.
+    Один экземпляр можно вызывать из нескольких потоков одновременно.
+    Нормализатор (normalize.Normalizer) применяется к тексту только при шифровании.
+    """
 
-    def __init__(self, shift: int = 8):
+    def __init__(self, shift: int = 8, alphabet: TelegraphAlphabet = None, normalizer=None):
         self.shift = shift
-        self.standard_alphabet = TelegraphAlphabet()
+        # Базовый алфавит по умолчанию общий для всех шифров
+        self.standard_alphabet = alphabet or get_standard_alphabet()
+        self.normalizer = normalizer  # normalize.Normalizer для исходного текста (None - без)
+        self._freeze()
+
+    def _normalize(self, text: str) -> str:
+        """Нормализация исходного текста перед шифрованием"""
+        return text if self.normalizer is None else self.normalizer.normalize(text)
 
     def encrypt(self, text: str, key: str) -> str:
         """
@@ -108,20 +143,114 @@ class PolyTritemiusCipher:
         if not key:
             return text
 
-        # Строим начальную таблицу
-        poly_alpha = PolyAlphabet(key)
-        table = poly_alpha.custom_symbols.copy()
+        return self._process(self._normalize(text).upper(), key, self.shift)
+
+    def decrypt(self, text: str, key: str) -> str:
+        """
+        Расшифровка полиалфавитного шифра
+
+        Args:
+            text: зашифрованный текст
+            key: ключевое слово
+
+        Returns:
+            Расшифрованный текст
+        """
+        if not key:
+            return text
+
+        return self._process(text.upper(), key, -self.shift)
+
+    def _process(self, text: str, key: str, shift: int, table=None, start: int = 0) -> str:
+        """Общий цикл шифрования/расшифровки, только результат"""
+        return self.process_from(text, key, shift, table, start)[0]
+
+    def process_from(self, text: str, key: str, shift: int, table=None, start: int = 0):
+        """
+        Общий цикл шифрования/расшифровки (fru_Trithemus)
+
+        Для ключей из символов алфавита таблицы берутся из сжатого
+        расписания KeySchedule; после пропущенного (недопустимого) символа
+        таблица ведётся вручную до тех пор, пока снова не совпадёт
+        с расписанием.
+
+        Args:
+            text: текст в верхнем регистре
+            key: ключевое слово
+            shift: сдвиг (отрицательный при расшифровке)
+            table: состояние таблицы перед позицией start (по умолчанию начальная)
+            start: абсолютная позиция первого символа text в исходном тексте
+
+        Returns:
+            (обработанный текст, таблица после последнего символа)
+        """
+        alphabet = self.standard_alphabet
+        if not KeySchedule.supports(key, alphabet):
+            return self._process_reference(text, key, shift, table, start)
+
+        schedule = get_key_schedule(key, alphabet)
+        codes = alphabet.char_to_val
+        symbols = alphabet.symbols
+        size = alphabet.size
+        advance = alphabet.modulus.shift_table(shift)
+        data = schedule.data
+        rows = schedule.rows(shift)
+        end = len(data)
+        loop_base = schedule.mu * size
+
+        # base - смещение текущей хранимой таблицы в буфере расписания
+        base = schedule.index(start) * size
+        if table is None:
+            current = schedule.table(0)
+        else:
+            current = bytes(codes[char] for char in table)
+        on_schedule = current == data[base:base + size]
+
+        result = []
+
+        for char in text:
+            c = codes.get(char)
+
+            if c is None:
+                # Пропуск: таблица не меняется, а позиция сдвигается
+                if on_schedule:
+                    current = bytes(data[base:base + size])
+                    on_schedule = False
+                result.append(char)
+            elif on_schedule:
+                result.append(symbols[rows[base + c]])
+            else:
+                pos = current.index(c)
+                result.append(symbols[current[advance[pos]]])
+                current = schedule.step(current, base // size)
+
+            base += size
+            if base == end:
+                base = loop_base
+
+            if not on_schedule and c is not None:
+                on_schedule = current == data[base:base + size]
+
+        if on_schedule:
+            current = data[base:base + size]
+        return ''.join(result), [symbols[code] for code in current]
+
+    def _process_reference(self, text: str, key: str, shift: int, table=None, start: int = 0):
+        """Эталонный цикл на PolyAlphabet.shift_table (для любых ключей): (текст, таблица)"""
+        poly_alpha = PolyAlphabet(key, self.standard_alphabet)
+        if table is None:
+            table = poly_alpha.custom_symbols.copy()
         key_array = list(key.upper())
         key_len = len(key_array)
+        size = self.standard_alphabet.size
 
         result = []
 
-        for i, char in enumerate(text.upper()):
+        for i, char in enumerate(text, start):
             if not self.standard_alphabet.is_valid_char(char):
                 result.append(char)
                 continue
 
-            # Шифруем символ (fru_Trithemus)
             try:
                 pos = table.index(char)
             except ValueError:
@@ -129,62 +258,308 @@ class PolyTritemiusCipher:
                 result.append(char)
                 continue
 
-            encrypted_pos = (pos + self.shift) % 32
-            csym = table[encrypted_pos]
+            # Таблица для ключа с посторонними символами длиннее алфавита,
+            # поэтому здесь остаток от деления, а не таблица сдвига
+            new_pos = (pos + shift) % size
+            csym = table[new_pos]
             result.append(csym)
 
             # Обновляем таблицу для следующего символа
             k = i % key_len
-            b = (key_len + i) % 32
+            b = (key_len + i) % size
             table = poly_alpha.shift_table(table, key_array[k], b)
 
-        return ''.join(result)
+        return ''.join(result), table
 
-    def decrypt(self, text: str, key: str) -> str:
+    def encrypt_shifts(self, text: str, key: str, shifts=None) -> dict:
         """
-        Расшифровка полиалфавитного шифра
+        Полиалфавитное шифрование сразу для нескольких сдвигов
+
+        Расписание таблиц не зависит от сдвига, поэтому оно проходится
+        один раз, а результаты для всех сдвигов снимаются с одной таблицы.
+
+        Args:
+            text: исходный текст
+            key: ключевое слово
+            shifts: список сдвигов (по умолчанию все сдвиги 1 - size-1)
+
+        Returns:
+            Словарь {сдвиг: зашифрованный текст}
+        """
+        if shifts is None:
+            shifts = range(1, self.standard_alphabet.size)
+        if key:
+            text = self._normalize(text)
+        return self._process_shifts(text, key, list(shifts), 1)
+
+    def decrypt_shifts(self, text: str, key: str, shifts=None) -> dict:
+        """
+        Расшифровка сразу для нескольких сдвигов
 
         Args:
             text: зашифрованный текст
             key: ключевое слово
+            shifts: список сдвигов (по умолчанию все сдвиги 1 - size-1)
 
         Returns:
-            Расшифрованный текст
+            Словарь {сдвиг: расшифрованный текст}
         """
+        if shifts is None:
+            shifts = range(1, self.standard_alphabet.size)
+        return self._process_shifts(text, key, list(shifts), -1)
+
+    def _process_shifts(self, text: str, key: str, shifts: list, sign: int,
+                        chunk_size: int = 4096) -> dict:
+        """Один проход по расписанию для всех сдвигов"""
         if not key:
-            return text
+            return {shift: text for shift in shifts}
+
+        text = text.upper()
+        alphabet = self.standard_alphabet
+        if not KeySchedule.supports(key, alphabet):
+            return {shift: self._process_reference(text, key, sign * shift)[0] for shift in shifts}
+
+        schedule = get_key_schedule(key, alphabet)
+        codes = alphabet.char_to_val
+        symbols = alphabet.symbols
+        size = alphabet.size
+        data = schedule.data
+        inverse = schedule.inverse()
+        symbol_data = schedule.symbol_data()
+        end = len(data)
+        loop_base = schedule.mu * size
+
+        # Для каждой позиции строится столбец из size символов: столбец[s] -
+        # результат при сдвиге s. Транспонирование столбцов через zip даёт
+        # сразу все варианты текста.
+        parts = [[] for _ in range(size)]
+        columns = []
+        base = 0
+        current = None  # None - таблица совпадает с расписанием
+
+        for char in text:
+            c = codes.get(char)
+
+            if c is None:
+                if current is None:
+                    current = bytes(data[base:base + size])
+                columns.append(char * size)
+            elif current is None:
+                pos = inverse[base + c]
+                columns.append(symbol_data[base + pos:base + size] + symbol_data[base:base + pos])
+            else:
+                pos = current.index(c)
+                row = ''.join(symbols[code] for code in current)
+                columns.append(row[pos:] + row[:pos])
+                current = schedule.step(current, base // size)
+
+            base += size
+            if base == end:
+                base = loop_base
+
+            if current is not None and c is not None and current == data[base:base + size]:
+                current = None
+
+            if len(columns) == chunk_size:
+                for part, variant in zip(parts, zip(*columns)):
+                    part.append(''.join(variant))
+                columns = []
+
+        if columns:
+            for part, variant in zip(parts, zip(*columns)):
+                part.append(''.join(variant))
+
+        return {shift: ''.join(parts[(sign * shift) % size]) for shift in shifts}
+
+    def checkpoints(self, text: str, key: str, chunk_size: int) -> list:
+        """
+        Состояния таблицы на границах блоков текста
+
+        Таблица меняется только на допустимых символах, поэтому для
+        расчёта контрольных точек достаточно пройти по расписанию ключа,
+        не шифруя сами символы. Участки пропусков находятся одним
+        регулярным выражением; между ними, пока таблица совпадает
+        с расписанием, границы берутся из KeySchedule.table_at без прохода
+        по символам. Пошагово таблица ведётся только после пропуска и до
+        повторного совпадения с расписанием (обычно несколько десятков
+        символов), так что на тексте с редкими пропусками расчёт почти
+        не зависит от длины текста. При частых пропусках (пробелы между
+        словами) таблица почти всё время ведётся вручную, и параллельный
+        режим выигрывает меньше; нормализация пробелов в '_' это устраняет.
 
-        # Строим начальную таблицу
-        poly_alpha = PolyAlphabet(key)
+        Args:
+            text: текст в верхнем регистре
+            key: ключевое слово
+            chunk_size: длина блока
+
+        Returns:
+            Список таблиц: i-я таблица действует перед позицией i * chunk_size
+        """
+        alphabet = self.standard_alphabet
+        if not KeySchedule.supports(key, alphabet):
+            return self._checkpoints_reference(text, key, chunk_size)
+
+        schedule = get_key_schedule(key, alphabet)
+        other = re.compile('[^' + re.escape(''.join(alphabet.symbols)) + ']+')
+        length = len(text)
+
+        tables = []
+        boundary = 0    # Следующая граница блока
+        position = 0    # Позиция, перед которой известна таблица
+        current = None  # None - таблица совпадает с расписанием
+
+        for match in chain(other.finditer(text), [None]):
+            run_start, run_end = (length, length) if match is None else match.span()
+
+            # Символы алфавита до участка пропусков: вручную до совпадения
+            while current is not None and position < run_start:
+                if position == boundary:
+                    tables.append(current)
+                    boundary += chunk_size
+                current = schedule.step(current, position)
+                position += 1
+                if current == schedule.table_at(position):
+                    current = None
+            if current is None:
+                while boundary < run_start:
+                    tables.append(schedule.table_at(boundary))
+                    boundary += chunk_size
+            if match is None:
+                break
+
+            # На пропусках таблица стоит, а позиция сдвигается
+            if current is None:
+                current = schedule.table_at(run_start)
+            while boundary < run_end:
+                tables.append(current)
+                boundary += chunk_size
+            position = run_end
+
+        symbols = alphabet.symbols
+        return [[symbols[code] for code in table] for table in tables]
+
+    def _checkpoints_reference(self, text: str, key: str, chunk_size: int) -> list:
+        """Эталонный расчёт контрольных точек через PolyAlphabet.shift_table"""
+        poly_alpha = PolyAlphabet(key, self.standard_alphabet)
         table = poly_alpha.custom_symbols.copy()
         key_array = list(key.upper())
         key_len = len(key_array)
+        size = self.standard_alphabet.size
 
         result = []
 
-        for i, char in enumerate(text.upper()):
-            if not self.standard_alphabet.is_valid_char(char):
-                result.append(char)
-                continue
+        for i, char in enumerate(text):
+            if i % chunk_size == 0:
+                result.append(table)
 
-            # Расшифровываем символ
-            try:
-                pos = table.index(char)
-            except ValueError:
-                # Символ не найден в таблице
-                result.append(char)
-                continue
+            if self.standard_alphabet.is_valid_char(char):
+                table = poly_alpha.shift_table(table, key_array[i % key_len], (key_len + i) % size)
 
-            decrypted_pos = (pos - self.shift) % 32
-            csym = table[decrypted_pos]
-            result.append(csym)
+        return result
 
-            # Обновляем таблицу для следующего символа
-            k = i % key_len
-            b = (key_len + i) % 32
-            table = poly_alpha.shift_table(table, key_array[k], b)
+    def encrypt_parallel(self, text: str, key: str, workers: int = None,
+                         chunk_size: int = 65536) -> str:
+        """
+        Параллельное полиалфавитное шифрование
+
+        Текст делится на блоки, для каждого блока заранее вычисляется
+        состояние таблицы, после чего блоки шифруются в пуле процессов.
+        Результат совпадает с encrypt() посимвольно.
+
+        Args:
+            text: исходный текст
+            key: ключевое слово
+            workers: число процессов (по умолчанию по числу ядер)
+            chunk_size: длина блока
+
+        Returns:
+            Зашифрованный текст
+        """
+        if key:
+            text = self._normalize(text)
+        return self._process_parallel(text, key, self.shift, workers, chunk_size)
+
+    def decrypt_parallel(self, text: str, key: str, workers: int = None,
+                         chunk_size: int = 65536) -> str:
+        """
+        Параллельная расшифровка полиалфавитного шифра
+
+        Args:
+            text: зашифрованный текст
+            key: ключевое слово
+            workers: число процессов (по умолчанию по числу ядер)
+            chunk_size: длина блока
+
+        Returns:
+            Расшифрованный текст
+        """
+        return self._process_parallel(text, key, -self.shift, workers, chunk_size)
+
+    def _process_parallel(self, text, key, shift, workers, chunk_size):
+        """Разбиение на блоки и обработка в пуле процессов"""
+        if not key:
+            return text
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size должен быть положительным")
+
+        text = text.upper()
+        if len(text) <= chunk_size:
+            return self._process(text, key, shift)
+
+        tables = self.checkpoints(text, key, chunk_size)
+        symbols = self.standard_alphabet.symbols
+        # Процессам пула передаётся строка символов нестандартного алфавита
+        symbols = None if symbols == get_standard_alphabet().symbols else ''.join(symbols)
+        jobs = [
+            (text[n * chunk_size:(n + 1) * chunk_size], key, shift, table, n * chunk_size, symbols)
+            for n, table in enumerate(tables)
+        ]
+
+        # Общая память поддерживается только для телеграфного алфавита
+        if symbols is not None or not KeySchedule.supports(key):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return ''.join(pool.map(_process_chunk, jobs))
+
+        # Расписание ключа публикуется в общей памяти, процессы пула
+        # подключаются к нему вместо построения своих копий
+        with SharedKeyTables(shifts=(shift,)) as shared_tables:
+            shared_tables.publish(key)
+            initializer, initargs = shared_tables.initializer()
+            with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                     initargs=initargs) as pool:
+                return ''.join(pool.map(_process_chunk, jobs))
+
+
+def _process_chunk(job) -> str:
+    """Обработка одного блока в процессе пула"""
+    chunk, key, shift, table, start, symbols = job
+    alphabet = None if symbols is None else get_standard_alphabet(symbols)
+    return get_poly_cipher(alphabet=alphabet)._process(chunk, key, shift, table, start)
+
+
+@lru_cache(maxsize=64)
+def _cached_poly_cipher(shift: int, symbols: str) -> PolyTritemiusCipher:
+    return PolyTritemiusCipher(shift, None if symbols is None else get_standard_alphabet(symbols))
+
+
+register_cache('poly_cipher', _cached_poly_cipher)
+
+
+def get_poly_cipher(shift: int = 8, alphabet: TelegraphAlphabet = None) -> PolyTritemiusCipher:
+    """
+    Получить (кэшированный) полиалфавитный шифр
+
+    Шифр неизменяем, поэтому один экземпляр на сдвиг и алфавит
+    используется всеми вызывающими, в том числе из разных потоков.
 
-        return ''.join(result)
+    Args:
+        shift: сдвиг
+        alphabet: базовый алфавит (по умолчанию телеграфный)
+    """
+    if alphabet is None or alphabet.symbols == get_standard_alphabet().symbols:
+        return _cached_poly_cipher(shift, None)
+    return _cached_poly_cipher(shift, ''.join(alphabet.symbols))
 
 
 # Дополнительные методы для работы с алфавитом
@@ -0,0 +1,6 @@
+"""Модули пакета лежат в src и импортируются напрямую (как в src/test.py)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
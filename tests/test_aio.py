@@ -0,0 +1,86 @@
+"""Асинхронный интерфейс: совпадение с синхронным и предел кусков в исполнителе"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aio import AsyncCryptoSystem
+from sblocks import EnhancedCryptoSystem
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+TEXT = 'ПРИВЕТ, МИР! ДЛИННОЕ СООБЩЕНИЕ ДЛЯ РАЗБИЕНИЯ НА КУСКИ. ' * 40
+
+CASES = [
+    ('encrypt_simple', 'КЛЮЧ', ()),
+    ('decrypt_polyalphabetic', 'ПАРОЛЬ', ()),
+    ('encrypt_polyalphabetic', 'ПАРОЛЬ', (5,)),
+    ('encrypt_s_blocks', KEY16, ()),
+    ('decrypt_ctr', KEY16, (3, 10)),
+    ('encrypt_enhanced_sblocks', 'КЛЮЧИК', (3,)),
+]
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Пул потоков, запоминающий наибольшее число одновременных задач"""
+
+    def __init__(self, workers):
+        super().__init__(workers)
+        self.lock = threading.Lock()
+        self.running = self.peak = 0
+
+    def submit(self, fn, *args):
+        def task():
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            time.sleep(0.002)
+            try:
+                return fn(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+        return super().submit(task)
+
+
+@pytest.mark.parametrize('executor', [None, 'threads'])
+@pytest.mark.parametrize('method, key, args', CASES)
+def test_matches_sync(method, key, args, executor):
+    pool = ThreadPoolExecutor(2) if executor else None
+    crypto = AsyncCryptoSystem(executor=pool, inline_limit=100, chunk_size=64)
+    expected = getattr(EnhancedCryptoSystem(), method)(TEXT, key, *args)
+    assert asyncio.run(getattr(crypto, method)(TEXT, key, *args)) == expected
+    if pool:
+        pool.shutdown()
+
+
+def test_max_in_flight_limits_executor():
+    pool = CountingExecutor(8)
+    crypto = AsyncCryptoSystem(executor=pool, inline_limit=100, chunk_size=64,
+                               max_in_flight=2)
+
+    async def many():
+        return await asyncio.gather(*(crypto.encrypt_ctr(TEXT, KEY16) for _ in range(6)))
+
+    results = asyncio.run(many())
+    assert set(results) == {EnhancedCryptoSystem().encrypt_ctr(TEXT, KEY16)}
+    assert pool.peak <= 2
+    pool.shutdown()
+
+
+def test_instance_outlives_event_loop():
+    # Экземпляр создан вне цикла и используется в двух разных циклах
+    pool = CountingExecutor(2)
+    crypto = AsyncCryptoSystem(executor=pool, inline_limit=100, chunk_size=64,
+                               max_in_flight=1)
+    expected = EnhancedCryptoSystem().encrypt_ctr(TEXT, KEY16)
+
+    async def twice():
+        return await asyncio.gather(*(crypto.encrypt_ctr(TEXT, KEY16) for _ in range(2)))
+
+    assert asyncio.run(twice()) == [expected, expected]
+    assert asyncio.run(twice()) == [expected, expected]
+    assert pool.peak <= 1
+    pool.shutdown()
@@ -0,0 +1,85 @@
+"""Компактные алфавиты: совпадение с исходными классами, неизменяемость, pickle"""
+
+import pickle
+
+import pytest
+
+from alphabet import (CompactAlphabet, CustomAlphabet, Modulus, PolyAlphabet,
+                      get_custom_alphabet, get_standard_alphabet)
+
+LATIN = get_standard_alphabet('ABCDEFGHIJKLMNOPQRSTUVWXYZ.')
+
+
+def assert_same(compact, source):
+    size = source.size
+    assert compact.size == size
+    assert compact.symbols == source.custom_symbols
+    assert dict(compact.char_to_val) == source.char_to_val
+    assert dict(compact.val_to_char) == source.val_to_char
+    for value in range(-3, size + 3):
+        assert compact.get_char(value) == source.val_to_char[value % size]
+    for char in source.custom_symbols:
+        assert compact.get_value(char.lower()) == source.char_to_val[char]
+    assert compact.get_value('?') == 0
+    assert not compact.is_valid_char('?')
+
+
+@pytest.mark.parametrize('key', ['КЛЮЧ', 'ШИФРОВАНИЕ', 'КЛЮЧ 2024!', ''])
+def test_custom_alphabet_parity(key):
+    source = CustomAlphabet(key)
+    assert_same(source.compact(), source)
+    assert get_custom_alphabet(key.lower()) == source.compact()
+
+
+@pytest.mark.parametrize('key', ['КЛЮЧ', 'ААААББББ'])
+def test_poly_alphabet_parity(key):
+    source = PolyAlphabet(key)
+    compact = source.compact()
+    assert compact.custom_symbols == source.custom_symbols
+    assert dict(compact.char_to_val) == source.char_to_val
+
+
+def test_custom_base_alphabet():
+    source = CustomAlphabet('CIPHER', LATIN)
+    compact = get_custom_alphabet('cipher', LATIN)
+    assert compact.symbols == source.custom_symbols
+    assert compact.standard_alphabet is LATIN
+    assert compact != get_custom_alphabet('CIPHER')
+
+
+def test_immutable_and_pickle():
+    for compact in (get_custom_alphabet('КЛЮЧ'), get_custom_alphabet('CIPHER', LATIN)):
+        with pytest.raises(AttributeError):
+            compact.key = 'ДРУГОЙ'
+        with pytest.raises(AttributeError):
+            del compact.key
+        copy = pickle.loads(pickle.dumps(compact))
+        assert copy == compact and hash(copy) == hash(compact)
+        assert copy.symbols == compact.symbols
+
+
+def test_bad_permutation():
+    with pytest.raises(ValueError):
+        CompactAlphabet(bytes(31))
+    with pytest.raises(ValueError):
+        CompactAlphabet.from_symbols('ABC')
+
+
+@pytest.mark.parametrize('size', [2, 27, 32, 44, 256])
+def test_modulus(size):
+    modulus = Modulus(size)
+    assert (modulus.mask is not None) == (size in (2, 32, 256))
+    for value in (-size - 1, -1, 0, 5, size, 3 * size + 1):
+        assert modulus.reduce(value) == value % size
+        assert modulus.add(value, 7) == (value + 7) % size
+        assert modulus.sub(value, 7) == (value - 7) % size
+    for shift in (0, 1, size - 1, size + 3, -2):
+        assert list(modulus.shift_table(shift)) == [(v + shift) % size for v in range(size)]
+
+
+def test_bad_alphabets():
+    for size in (1, 257):
+        with pytest.raises(ValueError):
+            Modulus(size)
+    with pytest.raises(ValueError):
+        get_standard_alphabet('ABCA')
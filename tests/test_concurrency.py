@@ -0,0 +1,69 @@
+"""Неизменяемые шифры: запрет изменения и одинаковый результат в нескольких потоках"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from concurrency import MODES, make_messages, run_benchmark
+from sblocks import CounterMode, EnhancedCryptoSystem, EnhancedSBlock, SBlock
+from schedule import KeySchedule
+from tritemius import PolyTritemiusCipher, TextCipher, TritemiusCipher
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+
+
+@pytest.mark.parametrize('engine, name', [
+    (TritemiusCipher(8), 'shift'),
+    (TextCipher(TritemiusCipher(8)), 'cipher'),
+    (PolyTritemiusCipher(8), 'shift'),
+    (SBlock(), 'alphabet'),
+    (CounterMode(KEY16), 'nonce'),
+    (EnhancedSBlock('КЛЮЧ'), 'rounds'),
+    (EnhancedCryptoSystem(), 'poly_cipher'),
+])
+def test_engines_are_immutable(engine, name):
+    assert hasattr(engine, name)
+    with pytest.raises(AttributeError):
+        setattr(engine, name, None)
+    with pytest.raises(AttributeError):
+        delattr(engine, name)
+    with pytest.raises(AttributeError):
+        engine.extra = 1
+
+
+def test_shared_system_matches_serial():
+    system = EnhancedCryptoSystem()
+    texts = make_messages(16, 3000, seed=7)
+    # Ключи, которых ещё нет в кэшах: ленивые таблицы строятся из разных потоков
+    calls = [
+        lambda text: system.encrypt_polyalphabetic(text, 'ПОТОКОВЫЙ_КЛЮЧ', 11),
+        lambda text: system.encrypt_polyalphabetic_shifts(text, 'ПОТОКОВЫЙ_КЛЮЧ', [3, 29]),
+        lambda text: system.encrypt_ctr(text, 'ПОТОКИ_БЕЗ_GIL__', 9),
+        lambda text: system.encrypt_enhanced_sblocks(text, 'ПОТОКОВЫЙ', 3),
+    ]
+    barrier = threading.Barrier(4)
+
+    def run(job):
+        call, text = job
+        barrier.wait()
+        return call(text)
+
+    jobs = [(call, text) for text in texts[:4] for call in calls]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(run, jobs))
+    assert results == [call(text) for call, text in jobs]
+
+    schedule = KeySchedule('ПОТОКОВЫЙ_КЛЮЧ')
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        rows = list(pool.map(lambda _: schedule.rows(5), range(8)))
+    assert all(row is rows[0] for row in rows)
+
+
+@pytest.mark.parametrize('mode', list(MODES))
+def test_benchmark_checks_results(mode):
+    report = run_benchmark(mode, threads=(1, 2), messages=4, length=500, repeat=1)
+    assert [row['threads'] for row in report] == [1, 2]
+    assert report[0]['speedup'] == 1.0
+    with pytest.raises(ValueError):
+        run_benchmark('sblocks')
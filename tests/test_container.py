@@ -0,0 +1,101 @@
+"""Контейнер сообщений: дозапись, чтение по номеру, пакетная расшифровка"""
+
+import os
+
+import pytest
+
+from container import _ENTRY, _HEADER, _SEGMENT, ContainerReader, ContainerWriter, Message
+from sblocks import EnhancedCryptoSystem
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+SYSTEM = EnhancedCryptoSystem()
+
+PLAIN = {
+    ('алиса', 'simple'): ['ПРИВЕТ', 'КАК_ДЕЛА?'],
+    ('боб', 'poly'): ['ВСТРЕЧА_В_ПОЛДЕНЬ', 'ОТМЕНА'],
+    (KEY16, 'sblocks'): ['ШИФР', 'БЛОК_ТЕКСТ__'],
+    ('ева', 'enhanced'): ['СЕКРЕТ'],
+}
+ENCRYPT = {
+    'simple': SYSTEM.encrypt_simple,
+    'poly': SYSTEM.encrypt_polyalphabetic,
+    'sblocks': SYSTEM.encrypt_s_blocks,
+    'enhanced': SYSTEM.encrypt_enhanced_sblocks,
+}
+KEYS = {'id-' + key: key for key, _ in PLAIN}
+
+
+@pytest.fixture
+def container(tmp_path):
+    path = str(tmp_path / 'messages.trc')
+    expected = {}
+    # Вторая половина дописывается после повторного открытия
+    for half in (0, 1):
+        with ContainerWriter(path) as writer:
+            for (key, mode), texts in PLAIN.items():
+                for text in texts[half::2]:
+                    message_id = writer.append(ENCRYPT[mode](text, key), 'id-' + key, mode)
+                    expected[message_id] = text
+    return path, expected
+
+
+def test_decrypt_all(container):
+    path, expected = container
+    with ContainerReader(path) as reader:
+        assert len(reader) == len(expected)
+        assert reader.decrypt(list(expected), KEYS) == expected
+
+
+def test_message_by_id(container):
+    path, expected = container
+    with ContainerReader(path) as reader:
+        for message_id, text in expected.items():
+            message = reader.message(message_id)
+            key = KEYS[message.key_id]
+            assert message == Message(ENCRYPT[message.mode](text, key), message.key_id,
+                                      message.mode)
+
+
+def test_missing_key_and_message(container):
+    path, expected = container
+    with ContainerReader(path) as reader:
+        with pytest.raises(KeyError):
+            reader.decrypt(list(expected), {'id-алиса': 'алиса'})
+        with pytest.raises(IndexError):
+            reader.message(len(expected))
+
+
+def test_flush_writes_only_new_entries(tmp_path):
+    path = str(tmp_path / 'messages.trc')
+    data = 0
+    for _ in range(50):
+        with ContainerWriter(path) as writer:
+            writer.append('СООБЩЕНИЕ', 'id')
+            writer.flush()
+            writer.flush()
+        data += len('СООБЩЕНИЕ'.encode('utf-8'))
+
+    # Один сегмент на открытие: ключ записан один раз, индекс не копируется
+    expected = _HEADER.size + data + 50 * (_SEGMENT.size + _ENTRY.size) + 2 + len(b'id')
+    assert os.path.getsize(path) == expected
+    with ContainerReader(path) as reader:
+        assert len(reader) == 50
+        assert reader.key_ids == ['id']
+        assert reader.decrypt([0, 49], {'id': 'КЛЮЧ'}) == {
+            0: SYSTEM.decrypt_simple('СООБЩЕНИЕ', 'КЛЮЧ'),
+            49: SYSTEM.decrypt_simple('СООБЩЕНИЕ', 'КЛЮЧ'),
+        }
+
+
+def test_bad_input(tmp_path):
+    path = tmp_path / 'messages.trc'
+    with ContainerWriter(str(path)) as writer:
+        with pytest.raises(ValueError):
+            writer.append('ТРИ', 'id', 'sblocks')
+        with pytest.raises(ValueError):
+            writer.append('ТЕКСТ', 'id', 'ctr')
+
+    other = tmp_path / 'other.bin'
+    other.write_bytes(b'NOT A CONTAINER')
+    with pytest.raises(ValueError):
+        ContainerReader(str(other))
@@ -0,0 +1,84 @@
+"""Адаптивный выбор реализации: совпадение результатов и профиль"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from dispatch import AdaptiveCryptoSystem
+from sblocks import EnhancedCryptoSystem
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+TEXT = 'ПРИВЕТ, МИР! ВЫБОР РЕАЛИЗАЦИИ ПО ДЛИНЕ.' * 12
+
+CALLS = [
+    ('simple', 'encrypt_simple', 'decrypt_simple', 'КЛЮЧ', {}),
+    ('poly', 'encrypt_polyalphabetic', 'decrypt_polyalphabetic', 'ПАРОЛЬ', {'shift': 5}),
+    ('sblocks', 'encrypt_s_blocks', 'decrypt_s_blocks', KEY16, {}),
+    ('ctr', 'encrypt_ctr', 'decrypt_ctr', KEY16, {'nonce': 3}),
+    ('enhanced', 'encrypt_enhanced_sblocks', 'decrypt_enhanced_sblocks', 'КЛЮЧИК',
+     {'rounds': 2}),
+]
+
+
+def force(crypto, mode, backend):
+    crypto.profile['modes'][mode] = {'routes': [[None, backend]], 'timings': {}}
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(2) as executor:
+        yield executor
+
+
+@pytest.mark.parametrize('backend', ['inline', 'codes', 'executor'])
+@pytest.mark.parametrize('mode, encrypt, decrypt, key, params', CALLS)
+def test_backends_match_system(executor, backend, mode, encrypt, decrypt, key, params):
+    crypto = AdaptiveCryptoSystem(executor=executor, workers=3)
+    if backend not in crypto.backends(mode):
+        pytest.skip(f"{backend} недоступен для {mode}")
+    force(crypto, mode, backend)
+
+    expected = getattr(EnhancedCryptoSystem(), encrypt)(TEXT, key, **params)
+    result = getattr(crypto, encrypt)(TEXT, key, **params)
+    assert result == expected
+    assert getattr(crypto, decrypt)(result, key, **params) == TEXT.upper()
+    assert crypto.decisions() == {mode: {backend: 2}}
+
+
+def test_ineligible_calls_fall_back_to_inline():
+    crypto = AdaptiveCryptoSystem()
+    force(crypto, 'sblocks', 'codes')
+    force(crypto, 'ctr', 'codes')
+
+    system = EnhancedCryptoSystem()
+    assert crypto.encrypt_s_blocks('ТРИ', KEY16) == system.encrypt_s_blocks('ТРИ', KEY16)
+    assert (crypto.encrypt_ctr(TEXT, KEY16, offset=7)
+            == system.encrypt_ctr(TEXT, KEY16, offset=7))
+    assert crypto.decisions() == {'sblocks': {'inline': 1}, 'ctr': {'inline': 1}}
+
+
+def test_profile_is_saved_and_reused(tmp_path):
+    path = tmp_path / 'profile.json'
+    crypto = AdaptiveCryptoSystem(profile_path=str(path))
+    routes = crypto.calibrate('simple', sizes=(64, 256))
+    assert routes['routes'][-1][0] is None
+    assert crypto.route('simple', 10) in crypto.backends('simple')
+
+    loaded = AdaptiveCryptoSystem(profile_path=str(path))
+    assert loaded.profile['modes'] == {'simple': routes}
+
+
+def test_foreign_profile_is_ignored(tmp_path):
+    path = tmp_path / 'profile.json'
+    AdaptiveCryptoSystem(profile_path=str(path)).calibrate('simple', sizes=(64,))
+
+    profile = json.loads(path.read_text(encoding='utf-8'))
+    profile['fingerprint']['cpus'] = -1
+    path.write_text(json.dumps(profile), encoding='utf-8')
+    assert AdaptiveCryptoSystem(profile_path=str(path)).profile['modes'] == {}
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        AdaptiveCryptoSystem().backends('unknown')
@@ -0,0 +1,77 @@
+"""Шифрование однобайтовых файлов через mmap: совпадение с методами системы"""
+
+import pytest
+
+from fileio import decrypt_file, encrypt_file
+from sblocks import EnhancedCryptoSystem
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+TEXT = 'ПРИВЕТ, МИР! ШИФРОВАНИЕ ФАЙЛА 2024' * 30
+
+
+def encrypt_text(mode, text, key):
+    system = EnhancedCryptoSystem()
+    if mode == 'simple':
+        return system.encrypt_simple(text, key)
+    if mode == 'sblocks':
+        return system.encrypt_s_blocks(text, key)
+    return system.encrypt_ctr(text, key)
+
+
+@pytest.mark.parametrize('encoding', ['cp1251', 'koi8-r'])
+@pytest.mark.parametrize('mode, key', [
+    ('simple', 'КЛЮЧ'),
+    ('sblocks', KEY16),
+    ('ctr', KEY16),
+])
+def test_matches_system_and_round_trips(tmp_path, encoding, mode, key):
+    path = tmp_path / 'plain.txt'
+    path.write_bytes(TEXT.encode(encoding))
+
+    # Маленькое окно: проверяется стык окон и позиция гаммы ctr
+    encrypt_file(str(path), key, mode, encoding=encoding, window=18)
+    assert path.read_bytes().decode(encoding) == encrypt_text(mode, TEXT, key)
+
+    decrypt_file(str(path), key, mode, encoding=encoding, window=18)
+    assert path.read_bytes().decode(encoding) == TEXT
+
+
+@pytest.mark.parametrize('key', ['klyuchklyuchklyu', 'КЛЮЧ КЛЮЧ КЛЮЧИ!'])
+def test_sblocks_key_outside_alphabet(tmp_path, key):
+    path = tmp_path / 'plain.txt'
+    path.write_bytes(TEXT.encode('cp1251'))
+    expected = EnhancedCryptoSystem().encrypt_s_blocks(TEXT, key)
+
+    encrypt_file(str(path), key, 'sblocks', window=18)
+    assert path.read_bytes().decode('cp1251') == expected
+
+    decrypt_file(str(path), key, 'sblocks', window=18)
+    assert path.read_bytes().decode('cp1251') == EnhancedCryptoSystem().decrypt_s_blocks(
+        expected, key)
+
+
+def test_output_file_leaves_source(tmp_path):
+    path = tmp_path / 'plain.txt'
+    path.write_bytes(TEXT.encode('cp1251'))
+    output = tmp_path / 'cipher.txt'
+    encrypt_file(str(path), 'КЛЮЧ', output=str(output))
+    assert path.read_bytes() == TEXT.encode('cp1251')
+    assert output.read_bytes().decode('cp1251') == encrypt_text('simple', TEXT, 'КЛЮЧ')
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    encrypt_file(str(path), 'КЛЮЧ')
+    assert path.read_bytes() == b''
+
+
+def test_bad_input(tmp_path):
+    path = tmp_path / 'plain.txt'
+    path.write_bytes('ТРИ'.encode('cp1251'))
+    with pytest.raises(ValueError):
+        encrypt_file(str(path), KEY16, 'sblocks')
+    with pytest.raises(ValueError):
+        encrypt_file(str(path), 'КОРОТКИЙ', 'ctr')
+    with pytest.raises(ValueError):
+        encrypt_file(str(path), 'КЛЮЧ', 'poly')
@@ -0,0 +1,72 @@
+"""Конвейер чтение / шифрование / запись: совпадение с stream_file"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from filepipe import FilePipeline
+from metrics import MetricsRegistry
+from streams import stream_file
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+TEXT = 'ПРИВЕТ, МИР! ШИФРОВАНИЕ ФАЙЛА ПО ЧАСТЯМ.\n' * 40
+
+
+def reference(tmp_path, mode, key, encoding='utf-8'):
+    source = tmp_path / 'plain.txt'
+    source.write_text(TEXT, encoding=encoding)
+    stream_file(str(source), str(tmp_path / 'reference.enc'), mode, key, encoding=encoding)
+    return source, (tmp_path / 'reference.enc').read_bytes()
+
+
+@pytest.mark.parametrize('mode, key', [
+    ('simple', 'КЛЮЧ'),
+    ('poly', 'ПАРОЛЬ'),
+    ('sblocks', KEY16),
+    ('ctr', KEY16),
+    ('enhanced', 'КЛЮЧИК'),
+])
+def test_matches_stream_file(tmp_path, mode, key):
+    source, expected = reference(tmp_path, mode, key)
+    target = tmp_path / 'pipe.enc'
+    stats = FilePipeline(mode, key, chunk_size=61, depth=2).run(str(source), str(target))
+    assert target.read_bytes() == expected
+    assert stats['chars'] == len(TEXT)
+
+
+def test_process_pool_and_round_trip(tmp_path):
+    source, expected = reference(tmp_path, 'ctr', KEY16)
+    target = tmp_path / 'pipe.enc'
+    with ProcessPoolExecutor(2) as executor:
+        FilePipeline('ctr', KEY16, chunk_size=97, executor=executor).run(str(source), str(target))
+    assert target.read_bytes() == expected
+
+    back = tmp_path / 'back.txt'
+    FilePipeline('ctr', KEY16, decrypt=True, chunk_size=97).run(str(target), str(back))
+    assert back.read_text(encoding='utf-8') == TEXT
+
+
+def test_utf16_writes_single_bom(tmp_path):
+    source, expected = reference(tmp_path, 'poly', 'ПАРОЛЬ', encoding='utf-16')
+    target = tmp_path / 'pipe.enc'
+    FilePipeline('poly', 'ПАРОЛЬ', encoding='utf-16', chunk_size=33).run(str(source),
+                                                                          str(target))
+    assert target.read_bytes() == expected
+
+
+def test_error_is_raised_and_recorded(tmp_path):
+    source = tmp_path / 'plain.txt'
+    source.write_text('ТРИ', encoding='utf-8')
+    metrics = MetricsRegistry()
+    with pytest.raises(ValueError):
+        FilePipeline('sblocks', KEY16, metrics=metrics).run(str(source),
+                                                             str(tmp_path / 'out.enc'))
+    [row] = metrics.to_dict()['operations']
+    assert (row['mode'], row['calls'], row['errors']) == ('sblocks', 1, 1)
+
+
+def test_bad_settings():
+    with pytest.raises(ValueError):
+        FilePipeline('simple', 'КЛЮЧ', chunk_size=2)
+    with pytest.raises(ValueError):
+        FilePipeline('unknown', 'КЛЮЧ')
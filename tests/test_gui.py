@@ -0,0 +1,61 @@
+"""Живой просмотр GUI совпадает с результатом кнопок шифрования (без окна)"""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from gui import CryptoApp
+from sblocks import EnhancedCryptoSystem
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+
+
+class FakeText:
+    """Текстовое поле с индексами вида "1.0 + N chars" и "end"/"end-1c" """
+
+    def __init__(self, text=''):
+        self.text = text
+
+    def _offset(self, index):
+        if index in ('1.0', '1.0 + 0 chars'):
+            return 0
+        if index.startswith('end'):
+            return len(self.text)
+        return int(re.fullmatch(r'1\.0 \+ (\d+) chars', index).group(1))
+
+    def get(self, start, end):
+        # Поле tk.Text всегда заканчивается переводом строки
+        return self.text + '\n' if end == 'end' else self.text
+
+    def insert(self, index, text):
+        offset = self._offset(index)
+        self.text = self.text[:offset] + text + self.text[offset:]
+
+    def delete(self, start, end):
+        self.text = self.text[:self._offset(start)] + self.text[self._offset(end):]
+
+
+def live_app(tab, params):
+    state = {'input': FakeText(), 'result': FakeText(), 'after': None,
+             'enabled': SimpleNamespace(get=lambda: True), 'cipher': None, 'params': None}
+    return SimpleNamespace(live={tab: state}, _live_params=lambda tab: params,
+                           status_bar=SimpleNamespace(config=lambda **kwargs: None))
+
+
+@pytest.mark.parametrize('tab, params, button', [
+    (1, ('КЛЮЧ', 'simple', 8), lambda system, text: system.encrypt_simple(text, 'КЛЮЧ')),
+    (2, ('ПАРОЛЬ', 'poly', 5),
+     lambda system, text: system.encrypt_polyalphabetic(text, 'ПАРОЛЬ', 5)),
+    (3, (KEY16, 'sblocks', 8), lambda system, text: system.encrypt_s_blocks(text, KEY16)),
+])
+def test_live_preview_matches_button(tab, params, button):
+    system = EnhancedCryptoSystem()
+    app = live_app(tab, params)
+    state = app.live[tab]
+
+    # Длины без краёв кратны 4, чтобы кнопка S-блоков не вернула ошибку
+    for raw in ('  ПРИВЕТ_МИР__\n', '\tПРИВЕТ_МИР_ДРУГ_ \n\n', 'ПРИВЕТ_МИР_ДРУГ_ЕЩЁ_'):
+        state['input'].text = raw
+        CryptoApp._live_update(app, tab)
+        assert state['result'].text == button(system, raw.strip())
@@ -0,0 +1,70 @@
+"""Инкрементальное перешифрование: совпадение с полным шифрованием после правок"""
+
+import random
+
+import pytest
+
+from alphabet import get_standard_alphabet
+from incremental import IncrementalCipher
+from sblocks import EnhancedCryptoSystem
+
+SYMBOLS = ''.join(get_standard_alphabet().symbols)
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+SYSTEM = EnhancedCryptoSystem()
+
+
+def full(mode, text, key, decrypt):
+    """Результат полного шифрования текста"""
+    if mode == 'simple':
+        method = SYSTEM.decrypt_simple if decrypt else SYSTEM.encrypt_simple
+        return method(text, key)
+    if mode == 'poly':
+        method = SYSTEM.decrypt_polyalphabetic if decrypt else SYSTEM.encrypt_polyalphabetic
+        return method(text, key)
+    blocks = text[:len(text) - len(text) % 4]
+    method = SYSTEM.decrypt_s_blocks if decrypt else SYSTEM.encrypt_s_blocks
+    return method(blocks, key) if blocks else ''
+
+
+def random_text(rng, length):
+    return ''.join(rng.choice(SYMBOLS + ', 1') for _ in range(length))
+
+
+@pytest.mark.parametrize('decrypt', [False, True])
+@pytest.mark.parametrize('mode, key', [('simple', 'КЛЮЧ'), ('poly', 'ПАРОЛЬ'),
+                                       ('sblocks', KEY16)])
+def test_edits_match_full_encryption(mode, key, decrypt):
+    rng = random.Random(4)
+    text = random_text(rng, 600)
+    cipher = IncrementalCipher(key, mode, decrypt=decrypt, checkpoint_every=50)
+    assert cipher.set_text(text) == full(mode, text, key, decrypt)
+
+    for _ in range(40):
+        offset = rng.randint(0, len(text))
+        deleted = rng.randint(0, min(8, len(text) - offset))
+        # Каждая вторая правка не меняет длину текста
+        length = deleted if rng.random() < 0.5 else rng.randint(0, 8)
+        inserted = random_text(rng, length)
+        text = text[:offset] + inserted + text[offset + deleted:]
+        assert cipher.edit(offset, deleted, inserted.lower()) == full(mode, text, key, decrypt)
+
+
+def test_same_length_edit_keeps_checkpoints():
+    text = random_text(random.Random(5), 2000)
+    cipher = IncrementalCipher('ПАРОЛЬ', checkpoint_every=100)
+    cipher.set_text(text)
+    before = list(cipher.checkpoints)
+    cipher.edit(1000, 1, 'Я' if text[1000] != 'Я' else 'Ю')
+    assert len(cipher.checkpoints) == len(before)
+    assert cipher.checkpoints[:11] == before[:11]
+
+
+def test_bad_input():
+    with pytest.raises(ValueError):
+        IncrementalCipher('КЛЮЧ', 'ctr')
+    with pytest.raises(ValueError):
+        IncrementalCipher('КЛЮЧ', 'sblocks')
+    cipher = IncrementalCipher('КЛЮЧ')
+    cipher.set_text('ПРИВЕТ')
+    with pytest.raises(ValueError):
+        cipher.edit(4, 5, '')
@@ -0,0 +1,74 @@
+"""Пакетная обработка каталогов: манифест, ошибки, повторный запуск"""
+
+import json
+import os
+
+import pytest
+
+from jobs import JobRunner
+from sblocks import EnhancedCryptoSystem
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+
+
+@pytest.fixture
+def tree(tmp_path):
+    source = tmp_path / 'src'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.txt').write_text('ПРИВЕТ МИР!!', encoding='utf-8')
+    (source / 'sub' / 'b.txt').write_text('ТЕКСТ', encoding='utf-8')
+    return source, tmp_path / 'out'
+
+
+def manifest(target):
+    with open(target / '.manifest.jsonl', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_encrypts_tree_and_skips_on_rerun(tree):
+    source, target = tree
+    report = JobRunner(str(source), str(target), 'КЛЮЧ', mode='poly', workers=1).run()
+    assert (report['processed'], report['failed']) == (2, 0)
+
+    expected = EnhancedCryptoSystem().encrypt_polyalphabetic('ТЕКСТ', 'КЛЮЧ')
+    assert (target / 'sub' / 'b.txt').read_text(encoding='utf-8') == expected
+
+    report = JobRunner(str(source), str(target), 'КЛЮЧ', mode='poly', workers=1).run()
+    assert (report['processed'], report['skipped']) == (0, 2)
+
+
+@pytest.mark.parametrize('change', [
+    {'key': 'ДРУГОЙ'},
+    {'decrypt': True},
+    {'shift': 3},
+    {'mode': 'simple'},
+])
+def test_changed_settings_reprocess(tree, change):
+    source, target = tree
+    JobRunner(str(source), str(target), 'КЛЮЧ', mode='poly', workers=1).run()
+    params = dict({'key': 'КЛЮЧ', 'mode': 'poly'}, **change)
+    report = JobRunner(str(source), str(target), workers=1, **params).run()
+    assert report['processed'] == 2
+
+
+def test_bad_input_is_recorded_not_written(tree):
+    source, target = tree
+    # a.txt - 12 символов (кратно 4), b.txt - 5 символов
+    report = JobRunner(str(source), str(target), KEY16, mode='sblocks', workers=1).run()
+    assert (report['processed'], report['failed']) == (1, 1)
+    assert not (target / 'sub' / 'b.txt').exists()
+
+    entries = {entry['path']: entry for entry in manifest(target)}
+    assert 'кратен 4' in entries[os.path.join('sub', 'b.txt')]['error']
+    assert 'error' not in entries['a.txt']
+
+    # Файл с ошибкой повторяется, готовый пропускается
+    report = JobRunner(str(source), str(target), KEY16, mode='sblocks', workers=1).run()
+    assert (report['skipped'], report['failed']) == (1, 1)
+
+
+def test_short_ctr_key_fails_every_file(tree):
+    source, target = tree
+    report = JobRunner(str(source), str(target), 'КОРОТКИЙ', mode='ctr', workers=1).run()
+    assert (report['processed'], report['failed']) == (0, 2)
+    assert all('16 символов' in entry['error'] for entry in manifest(target))
@@ -0,0 +1,87 @@
+"""Метрики: учёт вызовов на всех путях шифрования"""
+
+import asyncio
+import json
+
+import pytest
+
+from aio import AsyncCryptoSystem
+from dispatch import AdaptiveCryptoSystem
+from filepipe import FilePipeline
+from jobs import JobRunner
+from metrics import MetricsRegistry
+from sblocks import EnhancedCryptoSystem
+from streams import open_stream, stream_file
+
+TEXT = 'ПРИВЕТ МИР ' * 100
+
+
+def calls(metrics, mode='poly', op='encrypt'):
+    for row in metrics.to_dict()['operations']:
+        if (row['mode'], row['op']) == (mode, op):
+            return row['calls'], row['chars'], row['errors']
+    return 0, 0, 0
+
+
+@pytest.fixture
+def metrics():
+    return MetricsRegistry()
+
+
+def test_system_method(metrics):
+    system = EnhancedCryptoSystem(metrics=metrics)
+    system.encrypt_polyalphabetic(TEXT, 'КЛЮЧ')
+    assert calls(metrics) == (1, len(TEXT), 0)
+    system.encrypt_s_blocks('АБВГ', 'КОРОТКИЙ')
+    assert calls(metrics, 'sblocks') == (1, 4, 0)
+
+
+def test_stream_counts_whole_text(metrics):
+    stream = open_stream('poly', 'КЛЮЧ', metrics=metrics)
+    for i in range(0, len(TEXT), 100):
+        stream.update(TEXT[i:i + 100])
+    stream.finalize()
+    assert calls(metrics) == (1, len(TEXT), 0)
+
+
+def test_stream_error(metrics):
+    stream = open_stream('sblocks', 'АБВГДЕЖЗИЙКЛМНОП', metrics=metrics)
+    stream.update('АБВГД')
+    with pytest.raises(ValueError):
+        stream.finalize()
+    assert calls(metrics, 'sblocks') == (1, 5, 1)
+
+
+def test_stream_file_and_file_pipeline(metrics, tmp_path):
+    source = tmp_path / 'in.txt'
+    source.write_text(TEXT, encoding='utf-8')
+    stream_file(source, tmp_path / 'a.txt', 'poly', 'КЛЮЧ', metrics=metrics)
+    FilePipeline('poly', 'КЛЮЧ', chunk_size=64, metrics=metrics).run(source, tmp_path / 'b.txt')
+    assert calls(metrics) == (2, 2 * len(TEXT), 0)
+
+
+def test_async_long_text_counts_once(metrics):
+    crypto = AsyncCryptoSystem(EnhancedCryptoSystem(metrics=metrics), inline_limit=100,
+                               chunk_size=64)
+    asyncio.run(crypto.encrypt_polyalphabetic(TEXT, 'КЛЮЧ'))
+    assert calls(metrics) == (1, len(TEXT), 0)
+
+
+def test_dispatcher_counts_once_without_calibration(metrics, tmp_path):
+    crypto = AdaptiveCryptoSystem(EnhancedCryptoSystem(metrics=metrics))
+    crypto.encrypt_polyalphabetic(TEXT, 'КЛЮЧ')
+    assert calls(metrics) == (1, len(TEXT), 0)
+
+
+def test_job_runner(metrics, tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'a.txt').write_text(TEXT, encoding='utf-8')
+    JobRunner(str(source), str(tmp_path / 'out'), 'КЛЮЧ', workers=1, metrics=metrics).run()
+    assert calls(metrics) == (1, len(TEXT), 0)
+
+
+def test_exports(metrics):
+    EnhancedCryptoSystem(metrics=metrics).encrypt_simple('АБВ', 'КЛЮЧ')
+    assert json.loads(metrics.to_json())['operations'][0]['mode'] == 'simple'
+    assert 'cipher_calls_total{mode="simple",op="encrypt"} 1' in metrics.to_prometheus()
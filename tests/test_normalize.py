@@ -0,0 +1,119 @@
+"""Нормализация текста и её подключение к шифрам и потокам"""
+
+import asyncio
+
+import pytest
+
+from aio import AsyncCryptoSystem
+from dispatch import AdaptiveCryptoSystem
+from metrics import cache_stats
+from normalize import Normalizer, _fold, get_normalizer, normalize, restore
+from sblocks import EnhancedCryptoSystem
+from streams import open_stream
+from tritemius import PolyTritemiusCipher, TextCipher, TritemiusCipher
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+# Длина после нормализации в режиме 'drop' кратна 4
+RAW = 'Ёлка, ёж и подъезд: COKE! ' * 8
+
+ENCRYPT_CALLS = [
+    ('encrypt_simple', 'КЛЮЧ', {}),
+    ('encrypt_polyalphabetic', 'ПАРОЛЬ', {'shift': 5}),
+    ('encrypt_polyalphabetic_shifts', 'ПАРОЛЬ', {'shifts': [1, 9]}),
+    ('encrypt_s_blocks', KEY16, {}),
+    ('encrypt_ctr', KEY16, {'nonce': 2}),
+    ('encrypt_enhanced_sblocks', 'КЛЮЧИК', {'rounds': 2}),
+]
+
+
+def test_default_replacements():
+    assert normalize('Ёлка и ёж') == 'ЕЛКА_И_ЕЖ'
+    assert normalize('подъезд') == 'ПОДЬЕЗД'
+
+
+def test_latin_lookalikes():
+    assert normalize('COKE') == 'СОКЕ'
+    assert Normalizer(latin=False).normalize('COKE') == 'COKE'
+
+
+def test_drop_and_restore():
+    normalizer = Normalizer(other='drop')
+    clean, runs = normalizer.split('ПРИВЕТ, МИР!')
+    assert clean == 'ПРИВЕТ_МИР'
+    assert restore(clean, runs) == 'ПРИВЕТ,_МИР!'
+
+
+def test_bad_settings():
+    with pytest.raises(ValueError):
+        Normalizer(other='skip')
+    with pytest.raises(ValueError):
+        Normalizer(replacements={'Q': '!'})
+
+
+def test_translation_does_not_grow():
+    normalizer = Normalizer()
+    size = len(normalizer._keep)
+    normalizer.normalize(''.join(chr(code) for code in range(0x4E00, 0x5E00)))
+    assert len(normalizer._keep) == size
+    assert _fold.cache_info().maxsize is not None
+    assert 'normalize_fold' in cache_stats()
+
+
+def test_text_cipher_normalizes():
+    cipher = TritemiusCipher(8)
+    plain = TextCipher(cipher).encrypt_text('ЁЖ И ЁЛКА', 'КЛЮЧ')
+    normalized = TextCipher(cipher, normalizer=get_normalizer()).encrypt_text('ЁЖ И ЁЛКА', 'КЛЮЧ')
+    assert normalized == TextCipher(cipher).encrypt_text('ЕЖ_И_ЕЛКА', 'КЛЮЧ')
+    assert normalized != plain
+
+
+@pytest.mark.parametrize('mode', ['simple', 'poly'])
+def test_stream_normalizes_before_encryption(mode):
+    text = 'Ёлка и ёж. ' * 10
+    stream = open_stream(mode, 'ПАРОЛЬ', normalizer=get_normalizer())
+    result = ''.join(stream.update(text[i:i + 7]) for i in range(0, len(text), 7))
+    result += stream.finalize()
+
+    expected = open_stream(mode, 'ПАРОЛЬ')
+    assert result == expected.update(normalize(text)) + expected.finalize()
+
+    back = open_stream(mode, 'ПАРОЛЬ', decrypt=True, normalizer=get_normalizer())
+    assert back.update(result) + back.finalize() == normalize(text)
+
+
+@pytest.mark.parametrize('other', ['keep', 'drop'])
+def test_poly_cipher_normalizes(other):
+    normalizer = get_normalizer(other=other)
+    cipher = PolyTritemiusCipher(8, normalizer=normalizer)
+    expected = PolyTritemiusCipher(8).encrypt(normalizer.normalize(RAW), 'ПАРОЛЬ')
+    assert cipher.encrypt(RAW, 'ПАРОЛЬ') == expected
+    assert cipher.encrypt_shifts(RAW, 'ПАРОЛЬ', [8]) == {8: expected}
+    assert cipher.encrypt_parallel(RAW, 'ПАРОЛЬ', workers=1, chunk_size=50) == expected
+    assert cipher.decrypt(expected, 'ПАРОЛЬ') == normalizer.normalize(RAW)
+
+
+@pytest.mark.parametrize('method, key, params', ENCRYPT_CALLS)
+def test_system_normalizes_before_encryption(method, key, params):
+    normalizer = Normalizer(other='drop')
+    clean = normalizer.normalize(RAW)
+    assert len(clean) % 4 == 0
+    expected = getattr(EnhancedCryptoSystem(), method)(clean, key, **params)
+    system = EnhancedCryptoSystem(normalizer=normalizer)
+    assert getattr(system, method)(RAW, key, **params) == expected
+
+
+@pytest.mark.parametrize('backend', ['inline', 'codes'])
+def test_dispatcher_normalizes_every_backend(backend):
+    normalizer = get_normalizer(other='drop')
+    crypto = AdaptiveCryptoSystem(EnhancedCryptoSystem(normalizer=normalizer))
+    crypto.profile['modes']['sblocks'] = {'routes': [[None, backend]], 'timings': {}}
+    expected = EnhancedCryptoSystem().encrypt_s_blocks(normalize(RAW, 'drop'), KEY16)
+    assert crypto.encrypt_s_blocks(RAW, KEY16) == expected
+    assert crypto.decisions() == {'sblocks': {backend: 1}}
+
+
+def test_async_chunks_are_normalized():
+    system = EnhancedCryptoSystem(normalizer=get_normalizer())
+    crypto = AsyncCryptoSystem(system, inline_limit=10, chunk_size=7)
+    result = asyncio.run(crypto.encrypt_polyalphabetic(RAW, 'ПАРОЛЬ'))
+    assert result == EnhancedCryptoSystem().encrypt_polyalphabetic(normalize(RAW), 'ПАРОЛЬ')
@@ -0,0 +1,41 @@
+"""Упаковка шифротекста по 5 бит на символ"""
+
+import pytest
+
+from packing import PackedText, pack, pack_codes, unpack, unpack_codes
+from sblocks import EnhancedCryptoSystem
+
+
+@pytest.mark.parametrize('count', [0, 1, 2, 7, 8, 33])
+def test_codes_round_trip(count):
+    codes = bytes(code % 32 for code in range(7, 7 + count))
+    data = pack_codes(codes)
+    assert len(data) == (5 * count + 7) // 8
+    assert unpack_codes(data, count) == codes
+
+
+def test_unpack_codes_short_data():
+    with pytest.raises(ValueError):
+        unpack_codes(b'\x00', 2)
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'ПРИВЕТ_МИР',
+    'Привет, мир! 123 ЁЖ',
+    ' В НАЧАЛЕ И В КОНЦЕ ',
+])
+def test_text_round_trip(text):
+    assert unpack(pack(text, 'poly', 8)) == PackedText(text, 'poly', 8)
+
+
+def test_ciphertext_is_smaller_than_utf8():
+    cipher = EnhancedCryptoSystem().encrypt_polyalphabetic('ШИФРОВАНИЕ_ТЕКСТА_' * 50, 'КЛЮЧ')
+    assert len(pack(cipher, 'poly')) < len(cipher.encode('utf-8')) // 2
+
+
+def test_bad_input():
+    with pytest.raises(ValueError):
+        pack('ТЕКСТ', 'unknown')
+    with pytest.raises(ValueError):
+        unpack(b'XXX' + pack('ТЕКСТ')[3:])
@@ -0,0 +1,59 @@
+"""Каскады шифров: совпадение с последовательными вызовами"""
+
+import pytest
+
+from pipeline import Pipeline, Stage
+from sblocks import EnhancedCryptoSystem
+from tritemius import TextCipher, TritemiusCipher
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+TEXT = 'ПРИВЕТ, МИР! КАСКАД ШИФРОВ.' * 8
+
+
+def sequential(text, key_simple='КЛЮЧ', key_poly='ПАРОЛЬ'):
+    system = EnhancedCryptoSystem()
+    text = TextCipher(TritemiusCipher(3)).encrypt_text(text, key_simple)
+    text = system.decrypt_simple(text, 'ВТОРОЙ')
+    text = system.encrypt_polyalphabetic(text, key_poly)
+    text = system.encrypt_ctr(text, KEY16, nonce=5)
+    text = system.encrypt_s_blocks(text, KEY16)
+    return system.encrypt_enhanced_sblocks(text, 'КЛЮЧИК', rounds=2)
+
+
+def cascade(key_simple='КЛЮЧ', key_poly='ПАРОЛЬ'):
+    return Pipeline([
+        Stage('simple', key_simple, shift=3),
+        Stage('simple', 'ВТОРОЙ', decrypt=True),
+        Stage('poly', key_poly),
+        Stage('ctr', KEY16, nonce=5),
+        Stage('sblocks', KEY16),
+        Stage('enhanced', 'КЛЮЧИК', rounds=2),
+    ])
+
+
+def test_matches_sequential_calls():
+    pipeline = cascade()
+    # Два моноалфавитных этапа сливаются в перекодировку текста
+    assert pipeline.passes == 4
+    result = pipeline.run(TEXT)
+    assert result == sequential(TEXT)
+    assert pipeline.inverse().run(result) == TEXT
+
+
+def test_foreign_key_runs_sequentially():
+    pipeline = cascade(key_poly='PAROL 1')
+    assert pipeline.passes is None
+    assert pipeline.run(TEXT) == sequential(TEXT, key_poly='PAROL 1')
+
+
+def test_empty_keys_keep_text():
+    assert Pipeline([Stage('simple', ''), Stage('poly', '')]).run(TEXT) == TEXT
+
+
+def test_bad_stages():
+    with pytest.raises(ValueError):
+        Pipeline([Stage('unknown', 'КЛЮЧ')])
+    with pytest.raises(ValueError):
+        Pipeline([Stage('sblocks', 'КОРОТКИЙ')])
+    with pytest.raises(ValueError):
+        Pipeline([Stage('sblocks', KEY16)]).run('ТРИ')
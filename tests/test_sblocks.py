@@ -0,0 +1,117 @@
+"""Криптосистема S-блоков: режимы, ошибки параметров"""
+
+import asyncio
+
+import pytest
+
+from aio import AsyncCryptoSystem
+from alphabet import EXTENDED_SYMBOLS, LATIN_SYMBOLS, get_standard_alphabet
+from dispatch import AdaptiveCryptoSystem
+from sblocks import CounterMode, EnhancedCryptoSystem, SBlock
+
+TEXT = 'ПРИВЕТ, МИР! УСИЛЕННЫЕ S-БЛОКИ.' * 4
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+LATIN = get_standard_alphabet('ABCDEFGHIJKLMNOPQRSTUVWXYZ.')
+
+
+@pytest.mark.parametrize('key, rounds', [('123 !', 4), ('KEY', 4), ('КЛЮЧ', 0)])
+def test_enhanced_bad_key_returns_error(key, rounds):
+    system = EnhancedCryptoSystem()
+    for method in (system.encrypt_enhanced_sblocks, system.decrypt_enhanced_sblocks):
+        assert method(TEXT, key, rounds).startswith("Ошибка: ")
+
+    crypto = AdaptiveCryptoSystem()
+    crypto.profile['modes']['enhanced'] = {'routes': [[None, 'codes']], 'timings': {}}
+    assert crypto.encrypt_enhanced_sblocks(TEXT, key, rounds) == system.encrypt_enhanced_sblocks(
+        TEXT, key, rounds)
+
+    aio = AsyncCryptoSystem(inline_limit=10, chunk_size=16)
+    result = asyncio.run(aio.encrypt_enhanced_sblocks(TEXT, key, rounds))
+    assert result == system.encrypt_enhanced_sblocks(TEXT, key, rounds)
+
+
+def reference_keystream(key, nonce, length, alphabet):
+    """Гамма по определению: цифры счётчика с накоплением через S-блок"""
+    size = alphabet.size
+    symbols = alphabet.symbols
+    sblock = SBlock(alphabet)
+    stream = []
+    for j in range((length + 3) // 4):
+        value = (nonce + j) % size ** 4
+        digits = [value // size ** power % size for power in (3, 2, 1, 0)]
+        for q in (2, 1, 0):
+            digits[q] = (digits[q] + digits[q + 1]) % size
+        block = sblock.encrypt_s_block(''.join(symbols[d] for d in digits), key)
+        stream.extend(alphabet.get_value(char) for char in block)
+    return bytes(stream[:length])
+
+
+@pytest.mark.parametrize('key, alphabet, nonce', [
+    (KEY16, None, 0),
+    (KEY16, None, 32 ** 4 - 3),
+    ('CIPHERKEYSTREAMS', LATIN, 5),
+])
+def test_counter_keystream_and_round_trip(key, alphabet, nonce):
+    base = alphabet or get_standard_alphabet()
+    mode = CounterMode(key, nonce, alphabet)
+    assert mode.keystream(0, 41) == reference_keystream(key, nonce, 41, base)
+
+    text = ''.join(base.symbols) * 5 + ' 123!'
+    encrypted = mode.encrypt(text)
+    assert encrypted != text
+    assert mode.decrypt(encrypted) == text
+    assert encrypted[-5:] == ' 123!'
+
+
+def test_counter_offsets_and_chunks():
+    mode = CounterMode(KEY16, 7)
+    encrypted = mode.encrypt(TEXT)
+    for offset in (1, 3, 4, 50):
+        assert mode.keystream(offset, 9) == mode.keystream(0, offset + 9)[offset:]
+        assert mode.encrypt(TEXT[offset:], offset) == encrypted[offset:]
+    pieces = [mode.encrypt(TEXT[start:start + 13], start) for start in range(0, len(TEXT), 13)]
+    assert ''.join(pieces) == encrypted
+    assert mode.encrypt_parallel(TEXT, workers=2, chunk_size=30) == encrypted
+    assert mode.decrypt_parallel(encrypted, workers=2, chunk_size=30) == TEXT.upper()
+
+    system = EnhancedCryptoSystem()
+    assert system.encrypt_ctr(TEXT, KEY16, 7) == encrypted
+    assert system.decrypt_ctr(encrypted[10:], KEY16, 7, 10) == TEXT[10:]
+    assert system.encrypt_ctr(TEXT, 'КОРОТКИЙ').startswith("Ошибка: ")
+
+
+@pytest.mark.parametrize('symbols, key, key16, text', [
+    (LATIN_SYMBOLS, 'CIPHER', 'SIXTEENSYMBOLKEY', 'HELLO_WORLD, THIS IS A TEST_'),
+    (EXTENDED_SYMBOLS, 'КЛЮЧ_2024', 'ЁЖИК_В_ТУМАНЕ_42', 'ЁЛКА_И_ЁЖ: ПРОВЕРКА 44 СИМВОЛОВ'),
+])
+def test_custom_alphabet_round_trips(symbols, key, key16, text):
+    alphabet = get_standard_alphabet(symbols)
+    system = EnhancedCryptoSystem(alphabet=alphabet)
+    text = text * 4
+    blocks = text[:len(text) - len(text) % 4]
+    calls = [
+        ('simple', text, key, ()),
+        ('polyalphabetic', text, key, (5,)),
+        ('s_blocks', blocks, key16, ()),
+        ('ctr', text, key16, (3,)),
+        ('enhanced_sblocks', text, key, (2,)),
+    ]
+    for mode, plain, mode_key, params in calls:
+        encrypted = getattr(system, 'encrypt_' + mode)(plain, mode_key, *params)
+        assert encrypted != plain
+        assert not encrypted.startswith("Ошибка")
+        assert set(encrypted) <= set(symbols) | set(plain)
+        assert getattr(system, 'decrypt_' + mode)(encrypted, mode_key, *params) == plain
+
+    shifts = system.encrypt_polyalphabetic_shifts(text, key, [1, len(symbols) - 1])
+    assert shifts[1] == system.encrypt_polyalphabetic(text, key, 1)
+
+
+def test_default_alphabet_passed_explicitly():
+    explicit = EnhancedCryptoSystem(alphabet=get_standard_alphabet())
+    default = EnhancedCryptoSystem()
+    assert explicit.encrypt_polyalphabetic(TEXT, 'ПАРОЛЬ') == default.encrypt_polyalphabetic(
+        TEXT, 'ПАРОЛЬ')
+    assert explicit.encrypt_ctr(TEXT, KEY16) == default.encrypt_ctr(TEXT, KEY16)
+    assert explicit.encrypt_enhanced_sblocks(TEXT, 'КЛЮЧ') == default.encrypt_enhanced_sblocks(
+        TEXT, 'КЛЮЧ')
@@ -0,0 +1,70 @@
+"""Расписание ключа и пакетное построение таблиц"""
+
+import random
+
+import pytest
+
+from alphabet import PolyAlphabet, get_standard_alphabet
+from schedule import KeySchedule, batch_tables
+
+ALPHABETS = [None, get_standard_alphabet('ABCDEFGHIJKLMNOPQRSTUVWXYZ.')]
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_batch_tables_match_key_schedule(alphabet):
+    symbols = ''.join((alphabet or get_standard_alphabet()).symbols)
+    rng = random.Random(1)
+    keys = [''.join(rng.choice(symbols) for _ in range(rng.randint(1, 40))) for _ in range(30)]
+    steps = 70
+    size = len(symbols)
+
+    for key, data in zip(keys, batch_tables(keys, steps, alphabet)):
+        schedule = KeySchedule(key, alphabet)
+        assert len(data) == (steps + 1) * size
+        for j in range(steps + 1):
+            assert data[j * size:(j + 1) * size] == schedule.table_at(j)
+
+
+def test_batch_tables_initial_table_and_duplicates():
+    codes = get_standard_alphabet().char_to_val
+    first, again, lower = batch_tables(['КЛЮЧ', 'КЛЮЧ', 'ключ'], 0)
+    expected = bytes(codes[char] for char in PolyAlphabet('КЛЮЧ').custom_symbols)
+    assert first == again == lower == expected
+
+
+def test_batch_tables_rejects_foreign_keys():
+    with pytest.raises(ValueError):
+        batch_tables(['КЛЮЧ', 'KEY'], 3)
+
+
+@pytest.mark.parametrize('key', ['КЛЮЧ', 'ПАРОЛЬ', 'А', 'ШИФРОВАНИЕ_ТЕКСТА'])
+def test_schedule_matches_shift_table_walk(key):
+    alphabet = get_standard_alphabet()
+    codes = alphabet.char_to_val
+    poly_alpha = PolyAlphabet(key)
+    schedule = KeySchedule(key)
+    key_len = len(key)
+
+    # Обход эталонным shift_table за пределы предпериода и двух периодов
+    table = poly_alpha.custom_symbols.copy()
+    for i in range(schedule.mu + 2 * schedule.lam + 5):
+        assert schedule.table_at(i) == bytes(codes[char] for char in table)
+        table = poly_alpha.shift_table(table, key[i % key_len], (key_len + i) % alphabet.size)
+
+    assert len(schedule) == schedule.mu + schedule.lam
+    assert schedule.lam % schedule.phase_period == 0
+    assert schedule.table(schedule.mu) == schedule.table_at(schedule.mu + schedule.lam)
+
+
+def test_from_buffer_and_foreign_keys():
+    schedule = KeySchedule('ПАРОЛЬ')
+    copy = KeySchedule.from_buffer('ПАРОЛЬ', schedule.mu, schedule.lam, bytearray(schedule.data))
+    assert [copy.table_at(i) for i in range(300)] == [schedule.table_at(i) for i in range(300)]
+    assert copy.rows(5) == schedule.rows(5)
+    assert copy.inverse() == schedule.inverse()
+
+    with pytest.raises(ValueError):
+        KeySchedule.from_buffer('ПАРОЛЬ', schedule.mu, schedule.lam, schedule.data[1:])
+    with pytest.raises(ValueError):
+        KeySchedule('KEY')
+    assert not KeySchedule.supports('')
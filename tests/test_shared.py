@@ -0,0 +1,47 @@
+"""Расписания ключей в общей памяти"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import shared
+from alphabet import get_standard_alphabet
+from schedule import KeySchedule, get_key_schedule
+from shared import SharedKeyTables, attach, detach
+from tritemius import get_poly_cipher
+
+LATIN = get_standard_alphabet('ABCDEFGHIJKLMNOPQRSTUVWXYZ.')
+
+
+def _encrypt_in_worker(text, key, symbols):
+    alphabet = None if symbols is None else get_standard_alphabet(symbols)
+    return get_poly_cipher(8, alphabet).encrypt(text, key)
+
+
+@pytest.mark.parametrize('alphabet, key', [(None, 'КЛЮЧ'), (LATIN, 'SECRET')])
+def test_attach_matches_built_schedule(alphabet, key):
+    with SharedKeyTables(shifts=(8, -8), alphabet=alphabet) as tables:
+        name = tables.publish(key)
+        schedule = attach(name)
+        try:
+            expected = KeySchedule(key, alphabet)
+            assert schedule.size == expected.size
+            assert (schedule.mu, schedule.lam) == (expected.mu, expected.lam)
+            assert bytes(schedule.data) == expected.data
+            assert bytes(schedule.rows(8)) == bytes(expected.rows(8))
+            assert get_key_schedule(key, alphabet) is schedule
+        finally:
+            detach(name)
+
+    assert name not in shared._attached
+    assert get_key_schedule(key, alphabet) is not schedule
+
+
+def test_pool_workers_use_published_tables():
+    text = 'ATTACK AT DAWN. ' * 200
+    with SharedKeyTables(shifts=(8,), alphabet=LATIN) as tables:
+        tables.publish('SECRET')
+        initializer, initargs = tables.initializer()
+        with ProcessPoolExecutor(1, initializer=initializer, initargs=initargs) as pool:
+            result = pool.submit(_encrypt_in_worker, text, 'SECRET', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ.')
+            assert result.result() == get_poly_cipher(8, LATIN).encrypt(text, 'SECRET')
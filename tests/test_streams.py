@@ -0,0 +1,60 @@
+"""Потоки: совпадение с методами системы и снимки состояния"""
+
+import pytest
+
+from sblocks import EnhancedCryptoSystem
+from streams import CounterStream, PolyStream, open_stream
+
+KEY16 = 'АБВГДЕЖЗИЙКЛМНОП'
+TEXT = 'ПРИВЕТ, МИР! ШИФРОВАНИЕ ПОТОКА ПО ЧАСТЯМ. ' * 5
+
+
+def run_chunks(stream, text, size=7):
+    parts = [stream.update(text[i:i + size]) for i in range(0, len(text), size)]
+    return ''.join(parts) + stream.finalize()
+
+
+@pytest.mark.parametrize('mode, key, method', [
+    ('simple', 'КЛЮЧ', 'encrypt_simple'),
+    ('poly', 'ПАРОЛЬ', 'encrypt_polyalphabetic'),
+    ('ctr', KEY16, 'encrypt_ctr'),
+    ('enhanced', 'КЛЮЧИК', 'encrypt_enhanced_sblocks'),
+])
+def test_stream_matches_system(mode, key, method):
+    expected = getattr(EnhancedCryptoSystem(), method)(TEXT, key)
+    assert run_chunks(open_stream(mode, key), TEXT) == expected
+
+
+@pytest.mark.parametrize('key', ['ПАРОЛЬ', 'КЛЮЧ С ПРОБЕЛОМ'])
+@pytest.mark.parametrize('decrypt', [False, True])
+def test_poly_snapshot_resume(key, decrypt):
+    expected = run_chunks(PolyStream(key, decrypt=decrypt), TEXT)
+
+    stream = PolyStream(key, decrypt=decrypt)
+    head = stream.update(TEXT[:50])
+    resumed = PolyStream.restore(key, stream.snapshot())
+    assert head + resumed.update(TEXT[50:]) == expected
+
+
+@pytest.mark.parametrize('decrypt', [False, True])
+def test_counter_snapshot_resume(decrypt):
+    expected = run_chunks(CounterStream(KEY16, nonce=5, decrypt=decrypt), TEXT)
+
+    stream = CounterStream(KEY16, nonce=5, decrypt=decrypt)
+    head = stream.update(TEXT[:50])
+    resumed = CounterStream.restore(KEY16, stream.snapshot())
+    assert resumed.counter.nonce == 5
+    assert head + resumed.update(TEXT[50:]) == expected
+
+
+@pytest.mark.parametrize('stream, cls', [
+    (PolyStream('ПАРОЛЬ'), PolyStream),
+    (CounterStream(KEY16), CounterStream),
+])
+def test_snapshot_rejects_wrong_key_and_damage(stream, cls):
+    stream.update('ТЕКСТ')
+    snapshot = stream.snapshot()
+    with pytest.raises(ValueError):
+        cls.restore('ЖЗИЙКЛМНОПАБВГДЕ', snapshot)
+    with pytest.raises(ValueError):
+        cls.restore(stream.key, snapshot[:5])
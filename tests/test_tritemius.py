@@ -0,0 +1,91 @@
+"""Полиалфавитный шифр: параллельный режим и контрольные точки"""
+
+import random
+
+import pytest
+
+from alphabet import get_standard_alphabet
+from concurrency import run_parallel_benchmark
+from tritemius import PolyTritemiusCipher
+
+SYMBOLS = ''.join(get_standard_alphabet().symbols)
+
+
+def make_text(length, density, seed=0):
+    rng = random.Random(seed)
+    return ''.join(rng.choice(' ,!1') if rng.random() < density else rng.choice(SYMBOLS)
+                   for _ in range(length))
+
+
+def walk_tables(cipher, text, key, chunk_size):
+    """Контрольные точки прямым проходом по блокам"""
+    tables = []
+    table = None
+    for start in range(0, len(text), chunk_size):
+        if table is None:
+            table = cipher.process_from('', key, cipher.shift)[1]
+        tables.append(table)
+        table = cipher.process_from(text[start:start + chunk_size], key, cipher.shift,
+                                    table, start)[1]
+    return tables
+
+
+@pytest.mark.parametrize('key', ['КЛЮЧ', 'ДЛИННЫЙ_КЛЮЧ_ШИФРА', 'KEY 1'])
+@pytest.mark.parametrize('density', [0, 0.001, 0.05, 0.5])
+def test_checkpoints_match_walk(key, density):
+    cipher = PolyTritemiusCipher(8)
+    text = make_text(3000, density)
+    for chunk_size in (1, 97, 1000):
+        assert cipher.checkpoints(text, key, chunk_size) == walk_tables(cipher, text, key,
+                                                                        chunk_size)
+
+
+# Таблицы ключа с посторонними символами содержат эти символы,
+# поэтому такой шифротекст расшифровывается неоднозначно
+@pytest.mark.parametrize('key, invertible', [('КЛЮЧ', True), ('KEY 1', False)])
+@pytest.mark.parametrize('density', [0, 0.01, 0.3])
+def test_parallel_matches_serial(key, invertible, density):
+    cipher = PolyTritemiusCipher(5)
+    text = make_text(5000, density, seed=1)
+    encrypted = cipher.encrypt_parallel(text, key, workers=2, chunk_size=700)
+    assert encrypted == cipher.encrypt(text, key)
+    decrypted = cipher.decrypt_parallel(encrypted, key, workers=2, chunk_size=700)
+    assert decrypted == cipher.decrypt(encrypted, key)
+    assert (decrypted == text) == invertible
+
+
+def test_checkpoints_do_not_walk_clean_text():
+    # Без пропусков границы берутся из расписания: расчёт на порядок
+    # быстрее последовательного шифрования того же текста
+    report = run_parallel_benchmark(workers=2, length=200000, chunk_size=20000, repeat=2)
+    assert report['checkpoint_seconds'] * 10 < report['serial_seconds']
+
+
+@pytest.mark.parametrize('key', ['КЛЮЧ', 'ДЛИННЫЙ_КЛЮЧ_ШИФРА'])
+@pytest.mark.parametrize('density', [0, 0.02, 0.5])
+def test_schedule_matches_reference_loop(key, density):
+    # Расписание с пропусками и возвратом на него совпадает с эталонным циклом
+    cipher = PolyTritemiusCipher(7)
+    text = make_text(2000, density, seed=2)
+    for shift in (7, -7):
+        assert cipher.process_from(text, key, shift) == cipher._process_reference(text, key,
+                                                                                   shift)
+    assert cipher.decrypt(cipher.encrypt(text, key), key) == text
+
+
+@pytest.mark.parametrize('key', ['ПАРОЛЬ', 'KEY 1'])
+@pytest.mark.parametrize('density', [0, 0.1])
+def test_shifts_match_single_shift(key, density):
+    text = make_text(1500, density, seed=3)
+    cipher = PolyTritemiusCipher()
+    encrypted = cipher.encrypt_shifts(text, key)
+    assert sorted(encrypted) == list(range(1, 32))
+    for shift, result in encrypted.items():
+        assert result == PolyTritemiusCipher(shift).encrypt(text, key)
+
+    cipher_text = PolyTritemiusCipher(9).encrypt(text, key)
+    decrypted = cipher.decrypt_shifts(cipher_text, key, [3, 9, 40])
+    for shift in (3, 9, 40):
+        assert decrypted[shift] == PolyTritemiusCipher(shift).decrypt(cipher_text, key)
+    if key == 'ПАРОЛЬ':
+        assert decrypted[9] == text